@@ -1,5 +1,7 @@
+from django import forms
 from django.contrib import admin
 
+from .history import record_revision
 from .models import Tag, Article, ArticleLike, Comment, CommentVote
 
 
@@ -16,11 +18,58 @@ class CommentInlineAdmin(admin.StackedInline):
         return False
 
 
+class ArticleAdminForm(forms.ModelForm):
+    """
+    Edits the body through Article.content, so that saving the article
+    recomputes the excerpt, word count & reading time with it.
+    """
+    content = forms.CharField(widget=forms.Textarea)
+
+    class Meta:
+        model = Article
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if self.instance.pk:
+            self.initial['content'] = self.instance.content
+
+    def save(self, commit=True):
+        if 'content' in self.changed_data:
+            self.instance.content = self.cleaned_data['content']
+
+        return super().save(commit)
+
+
 class ArticleAdmin(admin.ModelAdmin):
+    form = ArticleAdminForm
     readonly_fields = ('likes_count', 'special_likes_count',
                        'saved_count', 'comments_count', 'slug')
     inlines = [CommentInlineAdmin]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('body')
+
+    def save_model(self, request, obj, form, change):
+        """ Records a revision of published content like ArticleViewSet.perform_update. """
+        content_changed = 'content' in form.changed_data
+
+        if change and content_changed:
+            # Autosaves made against the old content must not be applied to the new one.
+            obj.revision += 1
+
+        super().save_model(request, obj, form, change)
+
+        if obj.draft:
+            return
+
+        if not change or form.initial.get('draft'):
+            record_revision(obj)
+
+        elif content_changed:
+            record_revision(obj, form.initial['content'])
+
 
 class CommentAdmin(admin.ModelAdmin):
     readonly_fields = ('score',)
@@ -0,0 +1,99 @@
+"""
+Autosaving of drafts with text patches.
+
+An autosave only stores the edit as a DraftPatch row and bumps the article's
+revision, so its cost grows with the size of the edit instead of the draft.
+Pending patches are folded into the content once enough of them pile up or the
+oldest one gets old, and whenever the draft is read back in full.
+
+A patch is a list of operations ``{'start': int, 'end': int, 'text': str}``,
+each replacing ``content[start:end]`` with ``text`` in the content as left by
+the previous operation. Offsets past the end of the content are clamped.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Count, Min
+from django.utils import timezone
+
+from .models import Article, ArticleBody, DraftPatch
+
+
+# Pending patches are folded after FOLD_AFTER_PATCHES autosaves
+# or when the oldest one is FOLD_INTERVAL old, whichever comes first.
+FOLD_AFTER_PATCHES = 50
+FOLD_INTERVAL = timedelta(seconds=30)
+
+
+class RevisionConflict(Exception):
+    """ The patch was made against another revision than the article's current one. """
+
+    def __init__(self, revision):
+        super().__init__(f'The current revision is {revision}.')
+        self.revision = revision
+
+
+def apply_operations(content, operations):
+    for operation in operations:
+        content = content[:operation['start']] + operation['text'] + content[operation['end']:]
+
+    return content
+
+
+def fold_patches(article_id):
+    """
+    Applies the pending patches of the article to its content.
+    Uses queryset updates so that neither updated_at nor the slug are touched.
+    Returns the folded content or None if there was nothing to fold.
+    """
+    with transaction.atomic():
+        body = ArticleBody.objects.select_for_update().get(article_id=article_id)
+        patches = list(DraftPatch.objects.filter(article_id=article_id).order_by('revision'))
+
+        if not patches:
+            return None
+
+        content = body.content
+        for patch in patches:
+            content = apply_operations(content, patch.operations)
+
+        ArticleBody.objects.filter(article_id=article_id).update(content=content)
+        Article._all_articles.filter(pk=article_id).update(**Article.content_stats(content))
+        DraftPatch.objects.filter(pk__in=[patch.pk for patch in patches]).delete()
+
+    return content
+
+
+def autosave(article, revision, operations):
+    """
+    Stores a patch made against the given revision of the draft.
+    Returns the new revision, raises RevisionConflict if the draft has moved on.
+    """
+    with transaction.atomic():
+        current = Article._all_articles.select_for_update().only('id', 'revision').get(
+            pk=article.pk
+        )
+
+        if current.revision != revision:
+            raise RevisionConflict(current.revision)
+
+        DraftPatch.objects.create(article_id=article.pk, revision=revision + 1,
+                                  operations=operations)
+        Article._all_articles.filter(pk=article.pk).update(revision=F('revision') + 1)
+
+        pending = DraftPatch.objects.filter(article_id=article.pk).aggregate(
+            count=Count('id'),
+            oldest=Min('created_at')
+        )
+
+        fold = (
+            pending['count'] >= FOLD_AFTER_PATCHES
+            or pending['oldest'] <= timezone.now() - FOLD_INTERVAL
+        )
+
+    if fold:
+        fold_patches(article.pk)
+
+    article.revision = revision + 1
+
+    return article.revision
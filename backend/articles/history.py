@@ -0,0 +1,173 @@
+"""
+Compressed revision history of published articles.
+
+Every published edit is stored as a line delta against the previous revision,
+every SNAPSHOT_EVERY revisions the full content is stored instead so that
+rebuilding a revision never replays more than SNAPSHOT_EVERY - 1 deltas.
+Both kinds are zlib compressed.
+
+A delta is a list of operations on the previous revision's lines:
+``['=', n]`` keeps the next n lines, ``['-', n]`` skips them and
+``['+', [lines]]`` inserts new lines.
+"""
+import difflib
+import json
+import zlib
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Article, ArticleRevision
+
+
+SNAPSHOT_EVERY = 20
+
+
+def compress(value):
+    return zlib.compress(json.dumps(value).encode('utf-8'))
+
+
+def decompress(data):
+    return json.loads(zlib.decompress(bytes(data)).decode('utf-8'))
+
+
+def make_delta(old, new):
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+
+    delta = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append(['=', i2 - i1])
+            continue
+
+        if i2 > i1:
+            delta.append(['-', i2 - i1])
+
+        if j2 > j1:
+            delta.append(['+', new_lines[j1:j2]])
+
+    return delta
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    lines = []
+    i = 0
+
+    for op, value in delta:
+        if op == '=':
+            lines.extend(old_lines[i:i + value])
+            i += value
+
+        elif op == '-':
+            i += value
+
+        else:
+            lines.extend(value)
+
+    return ''.join(lines)
+
+
+def record_revision(article, previous_content=None):
+    """
+    Stores the article's current content as a new revision.\n
+
+    -- Params --
+    article: The published article.
+    previous_content: The content before the edit, None if there's none to diff against.
+    """
+    with transaction.atomic():
+        # Serializes the revisions of an article so that numbers & deltas line up.
+        Article._all_articles.select_for_update().only('id').get(pk=article.pk)
+
+        latest = article.revisions.aggregate(
+            last=Max('number'),
+            snapshot=Max('number', filter=Q(is_snapshot=True))
+        )
+
+        number = latest['last']
+
+        if number is None and previous_content is not None:
+            # Published before revisions were recorded, the old content becomes the first one.
+            number = 1
+            ArticleRevision.objects.create(article=article, number=number, is_snapshot=True,
+                                           data=compress(previous_content))
+            latest['snapshot'] = number
+
+        if (number is None or previous_content is None or latest['snapshot'] is None
+                or number + 1 - latest['snapshot'] >= SNAPSHOT_EVERY):
+            return ArticleRevision.objects.create(
+                article=article,
+                number=(number or 0) + 1,
+                is_snapshot=True,
+                data=compress(article.content)
+            )
+
+        # The delta is made against what the history rebuilds rather than previous_content,
+        # the body may have been changed without a revision (e.g. by the importer).
+        base = get_revision_content(article.pk, number)
+
+        return ArticleRevision.objects.create(
+            article=article,
+            number=number + 1,
+            data=compress(make_delta(base, article.content))
+        )
+
+
+def get_revision_content(article, number):
+    """ Rebuilds the content of the given revision, raises ArticleRevision.DoesNotExist. """
+    revisions = ArticleRevision.objects.filter(article=article)
+
+    if not revisions.filter(number=number).exists():
+        raise ArticleRevision.DoesNotExist
+
+    snapshot = revisions.filter(number__lte=number, is_snapshot=True).latest('number')
+    content = decompress(snapshot.data)
+
+    deltas = revisions.filter(number__gt=snapshot.number, number__lte=number)
+    for data in deltas.order_by('number').values_list('data', flat=True):
+        content = apply_delta(content, decompress(data))
+
+    return content
+
+
+def compact_revisions(retention, stdout=None):
+    """
+    Drops the revisions older than the retention window, except for the first one
+    and the newest one before the window, which is turned into a snapshot since
+    the revisions inside the window are deltas against it.
+    Returns the number of revisions deleted.
+    """
+    cutoff = timezone.now() - retention
+    deleted = 0
+
+    article_ids = ArticleRevision.objects.filter(created_at__lt=cutoff).order_by('article_id')
+    article_ids = list(article_ids.values_list('article_id', flat=True).distinct())
+
+    for article_id in article_ids:
+        old = ArticleRevision.objects.filter(article_id=article_id, created_at__lt=cutoff)
+        numbers = list(old.order_by('number').values_list('number', flat=True))
+
+        if len(numbers) <= 2:
+            continue
+
+        with transaction.atomic():
+            Article._all_articles.select_for_update().only('id').get(pk=article_id)
+
+            last = old.get(number=numbers[-1])
+            if not last.is_snapshot:
+                last.data = compress(get_revision_content(last.article_id, last.number))
+                last.is_snapshot = True
+                last.save(update_fields=('data', 'is_snapshot'))
+
+            count, _ = old.filter(number__gt=numbers[0], number__lt=numbers[-1]).delete()
+            deleted += count
+
+        if stdout:
+            stdout.write(f'Article {article_id}: {count} revisions deleted.')
+
+    return deleted
@@ -0,0 +1,76 @@
+"""
+HyperLogLog cardinality sketches.
+
+A sketch estimates the number of distinct keys added to it with a standard
+error of about 1.04 / sqrt(2 ** PRECISION), 1.6% here, in 2 ** PRECISION
+one byte registers whatever the number of keys. Sketches of the same
+precision merge losslessly by taking the maximum of every register, the
+merged sketch estimates the distinct keys of the union.
+"""
+import hashlib
+import math
+import zlib
+
+
+PRECISION = 12
+
+
+def hash_key(key):
+    digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def position(key, precision=PRECISION):
+    """ Returns the register of the key & the rank of its remaining hash bits. """
+    value = hash_key(key)
+    bits = 64 - precision
+
+    index = value >> bits
+    rest = value & ((1 << bits) - 1)
+
+    # The position of the leftmost 1 bit, bits + 1 if they're all zeros.
+    return index, bits - rest.bit_length() + 1
+
+
+class HyperLogLog:
+    def __init__(self, registers=None, precision=PRECISION):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers or self.size)
+
+        if len(self.registers) != self.size:
+            raise ValueError(f'Expected {self.size} registers, got {len(self.registers)}.')
+
+    def add(self, key):
+        index, rank = position(key, self.precision)
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError('Only sketches of the same precision can be merged.')
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small cardinalities are estimated better by linear counting.
+            estimate = m * math.log(m / zeros)
+
+        return round(estimate)
+
+    def to_bytes(self):
+        # Sketches of rarely read articles are mostly zeros and compress very well.
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data, precision=PRECISION):
+        return cls(zlib.decompress(bytes(data)), precision)
@@ -0,0 +1,254 @@
+"""
+Bulk import of articles from NDJSON, one article per line:
+
+    {"title": "...", "content": "...", "tags": ["python"], "draft": false}
+
+Lines are validated one by one and written in batches: the slugs of a whole
+batch are allocated with a couple of queries, then the articles, bodies,
+tag links & first revisions are inserted with one bulk_create each.
+No model signals are sent, the related article lists of the imported
+articles are computed by the rebuild_related_articles command.
+"""
+import json
+
+from django.db import transaction, IntegrityError
+
+from autoslug.utils import crop_slug, generate_unique_slug
+
+from .history import compress
+from .models import Tag, Article, ArticleBody, ArticleRevision
+from .serializers.article_serializers import ImportArticleSerializer
+
+
+BATCH_SIZE = 500
+
+# Only the first MAX_REPORTED_ERRORS invalid lines are reported in detail.
+MAX_REPORTED_ERRORS = 1000
+
+
+class SlugAllocator:
+    """
+    Hands out unique article slugs the way AutoSlugField does (title, title-2, ...),
+    but looks up the taken slugs for a whole batch of titles at once and
+    remembers the next free suffix of every title it has seen.
+    """
+
+    def __init__(self):
+        self.field = Article._meta.get_field('slug')
+        self.next_index = {}
+        # Everything handed out so far, "Hello" can take "hello-2" before "Hello 2" is seen.
+        self.used = set()
+
+    def base_slug(self, title):
+        return crop_slug(self.field, self.field.slugify(title)) or Article._meta.model_name
+
+    def with_index(self, base, index):
+        if index == 1:
+            return base
+
+        tail = f'{self.field.index_sep}{index}'
+        return f'{base[:self.field.max_length - len(tail)]}{tail}'
+
+    def load(self, bases):
+        unknown = set(bases) - set(self.next_index)
+        if not unknown:
+            return
+
+        taken = set(Article._all_articles.filter(slug__in=unknown).values_list('slug', flat=True))
+
+        for base in unknown:
+            if base not in taken:
+                self.next_index[base] = 1
+                continue
+
+            # Only titles that are already taken need the more expensive prefix lookup.
+            prefix = f'{base}{self.field.index_sep}'
+            slugs = Article._all_articles.filter(slug__startswith=prefix)
+            indexes = [
+                int(slug[len(prefix):]) for slug in slugs.values_list('slug', flat=True)
+                if slug[len(prefix):].isdigit()
+            ]
+
+            self.next_index[base] = max(indexes, default=1) + 1
+
+    def allocate(self, titles):
+        """ Returns a unique slug for every title. """
+        bases = [self.base_slug(title) for title in titles]
+        self.load(bases)
+
+        slugs = []
+        for base in bases:
+            slug = None
+
+            while slug is None or slug in self.used:
+                slug = self.with_index(base, self.next_index[base])
+                self.next_index[base] += 1
+
+            self.used.add(slug)
+            slugs.append(slug)
+
+        return slugs
+
+    def allocate_one(self, title):
+        """ Returns a unique slug for the title, checked one by one like AutoSlugField does. """
+        slug = generate_unique_slug(self.field, Article(), self.base_slug(title),
+                                    Article._all_articles)
+        self.used.add(slug)
+
+        return slug
+
+
+class ArticleImporter:
+    def __init__(self, user, batch_size=BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+
+        self.slugs = SlugAllocator()
+        self.tag_ids = {}
+
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_number, errors):
+        self.failed += 1
+
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'errors': errors})
+
+    def parse(self, line_number, line):
+        """ Returns the validated data of the line or None if it's invalid. """
+        try:
+            data = json.loads(line)
+        # UnicodeDecodeError is a ValueError too.
+        except ValueError as e:
+            self.add_error(line_number, {'details': f'Invalid JSON: {e}'})
+            return None
+
+        serializer = ImportArticleSerializer(data=data)
+        if not serializer.is_valid():
+            self.add_error(line_number, serializer.errors)
+            return None
+
+        return serializer.validated_data
+
+    def resolve_tags(self, batch):
+        """ Looks up the tag slugs the importer hasn't seen yet, in one query. """
+        slugs = {slug for _, data in batch for slug in data['tags']} - set(self.tag_ids)
+
+        if slugs:
+            found = dict(Tag.objects.filter(slug__in=slugs).values_list('slug', 'id'))
+            self.tag_ids.update({slug: found.get(slug) for slug in slugs})
+
+        valid = []
+        for line_number, data in batch:
+            missing = [slug for slug in data['tags'] if self.tag_ids[slug] is None]
+
+            if missing:
+                self.add_error(line_number, {
+                    'tags': [f'Tags with the slugs {", ".join(missing)} do not exist.']
+                })
+            else:
+                valid.append((line_number, data))
+
+        return valid
+
+    def build(self, data, slug):
+        # The body is inserted separately, bulk_create doesn't call save().
+        return Article(
+            title=data['title'],
+            slug=slug,
+            draft=data['draft'],
+            user=self.user,
+            **Article.content_stats(data['content'])
+        )
+
+    def write(self, batch, slugs):
+        """ Inserts a batch of valid lines, returns the number of created articles. """
+        articles = [self.build(data, slug) for (_, data), slug in zip(batch, slugs)]
+
+        Article._all_articles.bulk_create(articles)
+
+        if any(article.pk is None for article in articles):
+            # Not every database returns the ids of bulk inserted rows.
+            ids = dict(Article._all_articles.filter(slug__in=slugs).values_list('slug', 'id'))
+            for article in articles:
+                article.pk = ids[article.slug]
+
+        ArticleBody.objects.bulk_create([
+            ArticleBody(article_id=article.pk, content=data['content'])
+            for article, (_, data) in zip(articles, batch)
+        ])
+
+        Article.tags.through.objects.bulk_create([
+            Article.tags.through(article_id=article.pk, tag_id=self.tag_ids[slug])
+            for article, (_, data) in zip(articles, batch)
+            for slug in data['tags']
+        ])
+
+        ArticleRevision.objects.bulk_create([
+            ArticleRevision(article_id=article.pk, number=1, is_snapshot=True,
+                            data=compress(data['content']))
+            for article, (_, data) in zip(articles, batch)
+            if not article.draft
+        ])
+
+        return len(articles)
+
+    def flush(self, batch):
+        batch = self.resolve_tags(batch)
+        if not batch:
+            return
+
+        try:
+            with transaction.atomic():
+                slugs = self.slugs.allocate([data['title'] for _, data in batch])
+                self.created += self.write(batch, slugs)
+
+        except IntegrityError:
+            # A slug was taken in the meantime, the batch is retried line by line
+            # with slugs checked one by one so that only conflicting lines can fail.
+            self.slugs = SlugAllocator()
+
+            for line in batch:
+                try:
+                    with transaction.atomic():
+                        slug = self.slugs.allocate_one(line[1]['title'])
+                        self.created += self.write([line], [slug])
+
+                except IntegrityError as e:
+                    self.add_error(line[0], {'details': str(e)})
+
+    def run(self, lines):
+        """
+        Imports the articles from an iterable of NDJSON lines (str or bytes).
+        Returns a summary with the number of created & failed articles and the errors.
+        """
+        batch = []
+
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+
+            data = self.parse(line_number, line)
+            if data is None:
+                continue
+
+            batch.append((line_number, data))
+
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+
+        if batch:
+            self.flush(batch)
+
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+        }
+
+
+def import_articles(lines, user, batch_size=BATCH_SIZE):
+    return ArticleImporter(user, batch_size).run(lines)
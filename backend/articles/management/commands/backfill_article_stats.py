@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article
+
+
+class Command(BaseCommand):
+    help = 'Computes the excerpt, word count & reading time of every article.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ('excerpt', 'word_count', 'reading_time')
+
+        articles = Article._all_articles.select_related('body').order_by('id')
+        last_id = 0
+        count = 0
+
+        while True:
+            batch = list(articles.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            for article in batch:
+                for field, value in Article.content_stats(article.content).items():
+                    setattr(article, field, value)
+
+            # bulk_update doesn't call save(), so neither updated_at nor the slug change.
+            Article._all_articles.bulk_update(batch, fields)
+
+            last_id = batch[-1].id
+            count += len(batch)
+            self.stdout.write(f'{count} articles processed.')
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {count} articles.'))
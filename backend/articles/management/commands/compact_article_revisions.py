@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from articles.history import compact_revisions
+
+
+class Command(BaseCommand):
+    help = 'Drops the intermediate article revisions older than the retention window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90,
+                            help='Revisions newer than this are all kept.')
+
+    def handle(self, *args, **options):
+        deleted = compact_revisions(timedelta(days=options['days']), stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} revisions.'))
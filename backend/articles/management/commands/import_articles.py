@@ -0,0 +1,37 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from articles.importer import import_articles, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Imports articles from an NDJSON file, one article per line.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The NDJSON file, - reads from stdin.')
+        parser.add_argument('--user', required=True, help='Username of the author.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["user"]} does not exist.')
+
+        if options['path'] == '-':
+            summary = import_articles(sys.stdin.buffer, user, options['batch_size'])
+        else:
+            with open(options['path'], 'rb') as lines:
+                summary = import_articles(lines, user, options['batch_size'])
+
+        for error in summary['errors']:
+            self.stderr.write(json.dumps(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {summary["created"]} articles, {summary["failed"]} lines failed.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from articles.trending import rebase_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves the trending epoch to now and scales the trending scores down. '
+        'Should run periodically (e.g. daily) to keep the scores from overflowing.'
+    )
+
+    def handle(self, *args, **options):
+        epoch = rebase_scores()
+        self.stdout.write(self.style.SUCCESS(f'Rebased the trending scores ({epoch}).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from articles.related import rebuild_related_articles
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the related articles lists of all published articles.'
+
+    def handle(self, *args, **options):
+        rebuild_related_articles(stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Rebuilt the related articles.'))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from articles.stats import reconcile_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily article & author stats of the last days from the event tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2,
+                            help='Number of days to rebuild, today included.')
+
+    def handle(self, *args, **options):
+        end = timezone.localdate()
+        start = end - timedelta(days=options['days'] - 1)
+
+        reconcile_stats(start, end, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the stats from {start} to {end}.'))
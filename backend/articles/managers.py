@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Count, F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
 
 
 class ArticleManager(models.Manager):
@@ -17,4 +20,54 @@ class ArticleSlugsManager(models.Manager):
     supposed to be used anywhere else.
     """
     def get_queryset(self):
-        return super().get_queryset().all()
\ No newline at end of file
+        return super().get_queryset().all()
+
+
+class CommentQuerySet(models.QuerySet):
+    BEST = 'best'
+    NEW = 'new'
+    TOP = 'top'
+
+    def sort_expressions(self, sort=None):
+        """
+        Orders the comments by:
+            best - Wilson score lower bound of the votes (default)\n
+            new - newest to oldest\n
+            top - upvotes - downvotes
+        """
+        if sort == self.NEW:
+            return [F('created_at').desc(), F('id').desc()]
+
+        if sort == self.TOP:
+            score = F('upvotes_count') - F('downvotes_count')
+            return [score.desc(), F('id').desc()]
+
+        # Ties are broken by id like the thread pagination, see CommentThreadPagination.
+        return [F('rank').desc(), F('id').desc()]
+
+    def sorted(self, sort=None):
+        """ See sort_expressions. """
+        return self.order_by(*self.sort_expressions(sort))
+
+    def with_reply_count(self):
+        return self.annotate(reply_count=Count('children'))
+
+    def first_replies(self, parent_ids, limit, sort=None):
+        """
+        Returns the first `limit` replies of every given comment, sorted, in one query.
+        The replies are numbered per parent with ROW_NUMBER() in a subquery, so
+        the rest of a long thread is never read.
+        """
+        ranked = self.model.objects.filter(parent_id__in=parent_ids).annotate(
+            reply_rank=Window(
+                RowNumber(),
+                partition_by=[F('parent_id')],
+                order_by=self.sort_expressions(sort)
+            )
+        )
+        sql, params = ranked.values('pk', 'reply_rank').query.sql_with_params()
+
+        first = RawSQL(f'SELECT ranked.id FROM ({sql}) ranked WHERE ranked.reply_rank <= %s',
+                       (*params, limit))
+
+        return self.filter(pk__in=first).with_reply_count().sorted(sort)
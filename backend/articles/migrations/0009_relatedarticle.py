@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_auto_20210228_2253'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedArticle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_articles', to='articles.article')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='articles.article')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='relatedarticle',
+            index=models.Index(fields=['article', '-score'], name='related_article_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='relatedarticle',
+            constraint=models.UniqueConstraint(fields=('article', 'related'), name='unique_related_article'),
+        ),
+    ]
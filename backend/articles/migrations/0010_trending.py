@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_relatedarticle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEpoch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending_score', serialize=False, to='articles.article')),
+                ('score', models.FloatField(db_index=True, default=0)),
+                ('generation', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:33
+
+import math
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+# A copy of articles.ranking.wilson_lower_bound as it was when the migration was written.
+def wilson_lower_bound(upvotes, downvotes, z=1.281551565545):
+    total = upvotes + downvotes
+    if not total:
+        return 0
+
+    ratio = upvotes / total
+
+    return (
+        ratio + z * z / (2 * total)
+        - z * math.sqrt((ratio * (1 - ratio) + z * z / (4 * total)) / total)
+    ) / (1 + z * z / total)
+
+
+def backfill_vote_tallies(apps, schema_editor):
+    Comment = apps.get_model('articles', 'Comment')
+
+    comments = Comment.objects.filter(comment_votes__isnull=False).annotate(
+        upvotes=Count('comment_votes', filter=Q(comment_votes__downvote=False)),
+        downvotes=Count('comment_votes', filter=Q(comment_votes__downvote=True))
+    )
+
+    for comment in comments.iterator():
+        Comment.objects.filter(pk=comment.pk).update(
+            upvotes_count=comment.upvotes,
+            downvotes_count=comment.downvotes,
+            rank=wilson_lower_bound(comment.upvotes, comment.downvotes)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_trending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='downvotes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='rank',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='upvotes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_tallies, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', 'parent', '-rank'], name='comment_rank_idx'),
+        ),
+    ]
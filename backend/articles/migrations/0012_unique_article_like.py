@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:35
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_likes(apps, schema_editor):
+    ArticleLike = apps.get_model('articles', 'ArticleLike')
+
+    duplicates = ArticleLike.objects.values('user', 'article', 'special_like')
+    duplicates = duplicates.annotate(count=Count('id'), first_id=Min('id')).filter(count__gt=1)
+
+    for duplicate in duplicates:
+        ArticleLike.objects.filter(
+            user=duplicate['user'],
+            article=duplicate['article'],
+            special_like=duplicate['special_like']
+        ).exclude(pk=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0011_comment_rank'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='articlelike',
+            constraint=models.UniqueConstraint(fields=('user', 'article', 'special_like'), name='unique_article_like'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:37
+
+import math
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+# A copy of articles.ranking.wilson_lower_bound as it was when the migration was written.
+def wilson_lower_bound(upvotes, downvotes, z=1.281551565545):
+    total = upvotes + downvotes
+    if not total:
+        return 0
+
+    ratio = upvotes / total
+
+    return (
+        ratio + z * z / (2 * total)
+        - z * math.sqrt((ratio * (1 - ratio) + z * z / (4 * total)) / total)
+    ) / (1 + z * z / total)
+
+
+def delete_duplicate_votes(apps, schema_editor):
+    """ Keeps the latest vote of every user and recounts the affected comments. """
+    Comment = apps.get_model('articles', 'Comment')
+    CommentVote = apps.get_model('articles', 'CommentVote')
+
+    duplicates = CommentVote.objects.values('user', 'comment')
+    duplicates = duplicates.annotate(count=Count('id'), last_id=Max('id')).filter(count__gt=1)
+
+    comment_ids = set()
+    for duplicate in duplicates:
+        CommentVote.objects.filter(
+            user=duplicate['user'],
+            comment=duplicate['comment']
+        ).exclude(pk=duplicate['last_id']).delete()
+
+        comment_ids.add(duplicate['comment'])
+
+    for comment_id in comment_ids:
+        votes = CommentVote.objects.filter(comment=comment_id)
+        upvotes = votes.filter(downvote=False).count()
+        downvotes = votes.filter(downvote=True).count()
+
+        Comment.objects.filter(pk=comment_id).update(
+            upvotes_count=upvotes,
+            downvotes_count=downvotes,
+            rank=wilson_lower_bound(upvotes, downvotes)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0012_unique_article_like'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='commentvote',
+            constraint=models.UniqueConstraint(fields=('user', 'comment'), name='unique_comment_vote'),
+        ),
+    ]
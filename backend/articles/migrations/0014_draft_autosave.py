@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_unique_comment_vote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='DraftPatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveIntegerField()),
+                ('operations', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patches', to='articles.article')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='draftpatch',
+            constraint=models.UniqueConstraint(fields=('article', 'revision'), name='unique_draft_patch'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0014_draft_autosave'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='articles.article')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='articlerevision',
+            constraint=models.UniqueConstraint(fields=('article', 'number'), name='unique_article_revision'),
+        ),
+    ]
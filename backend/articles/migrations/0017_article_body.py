@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_bodies(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    ArticleBody = apps.get_model('articles', 'ArticleBody')
+
+    articles = Article._default_manager.values_list('id', 'content').order_by('id')
+    batch = []
+
+    for article_id, content in articles.iterator(chunk_size=1000):
+        batch.append(ArticleBody(article_id=article_id, content=content))
+
+        if len(batch) == 1000:
+            ArticleBody.objects.bulk_create(batch)
+            batch = []
+
+    ArticleBody.objects.bulk_create(batch)
+
+
+def restore_contents(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    ArticleBody = apps.get_model('articles', 'ArticleBody')
+
+    for article_id, content in ArticleBody.objects.values_list('article_id', 'content').iterator():
+        Article._default_manager.filter(pk=article_id).update(content=content)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0016_article_content_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleBody',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='articles.article')),
+                ('content', models.TextField()),
+            ],
+        ),
+        migrations.RunPython(copy_bodies, restore_contents),
+        migrations.RemoveField(
+            model_name='article',
+            name='content',
+        ),
+    ]
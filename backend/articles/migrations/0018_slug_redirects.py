@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:00
+
+import cod.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0017_article_body'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='slug',
+            field=cod.fields.SourceSlugField(default=None, editable=False, null=True, populate_from='title', unique=True),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=cod.fields.SourceSlugField(default=None, editable=False, null=True, populate_from='name', unique=True),
+        ),
+        migrations.CreateModel(
+            name='ArticleSlugRedirect',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_slug', models.SlugField(max_length=60, unique=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slug_redirects', to='articles.article')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0018_slug_redirects'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0019_article_views_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleReaderSketch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sketch', models.BinaryField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reader_sketches', to='articles.article')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='articlereadersketch',
+            constraint=models.UniqueConstraint(fields=('article', 'day'), name='unique_article_reader_sketch'),
+        ),
+    ]
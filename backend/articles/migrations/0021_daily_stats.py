@@ -0,0 +1,72 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('articles', '0020_article_reader_sketches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('likes', models.IntegerField(default=0)),
+                ('special_likes', models.IntegerField(default=0)),
+                ('comments', models.IntegerField(default=0)),
+                ('saves', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuthorDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('likes', models.IntegerField(default=0)),
+                ('special_likes', models.IntegerField(default=0)),
+                ('comments', models.IntegerField(default=0)),
+                ('saves', models.IntegerField(default=0)),
+            ],
+        ),
+        # The existing likes are left without a time rather than all dated
+        # to the migration, auto_now_add would fill them in when adding it.
+        migrations.AddField(
+            model_name='articlelike',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='articlelike',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at'], name='comment_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='authordailystats',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='articledailystats',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='articles.article'),
+        ),
+        migrations.AddConstraint(
+            model_name='authordailystats',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='unique_author_daily_stats'),
+        ),
+        migrations.AddConstraint(
+            model_name='articledailystats',
+            constraint=models.UniqueConstraint(fields=('article', 'day'), name='unique_article_daily_stats'),
+        ),
+    ]
@@ -1,22 +1,26 @@
-from django.db import models
+import math
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, Q
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils.text import Truncator
 
-from autoslug import AutoSlugField
+from cod.fields import SourceSlugField
 
-from .managers import ArticleManager, ArticleDraftsManager, ArticleSlugsManager
+from .managers import ArticleManager, ArticleDraftsManager, ArticleSlugsManager, CommentQuerySet
+from .ranking import wilson_lower_bound
 
 
 class Tag(models.Model):
     name = models.CharField(max_length=20)
     description = models.CharField(max_length=200, blank=True, null=True)
 
-    slug = AutoSlugField(
+    slug = SourceSlugField(
         null=True,
         default=None,
         unique=True,
-        populate_from='name',
-        always_update=True
+        populate_from='name'
     )
 
     followers = models.ManyToManyField('users.User', related_name='followed_tags',
@@ -27,19 +31,26 @@ class Tag(models.Model):
 
 
 class Article(models.Model):
+    EXCERPT_WORDS = 40
+    WORDS_PER_MINUTE = 200
+    MAX_TAGS = 5
+
     title = models.CharField(max_length=50)
-    content = models.TextField()
+
+    # Derived from the content on save, so that lists of articles never have to load it.
+    excerpt = models.TextField(blank=True, default='', editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False)
     draft = models.BooleanField(default=False)
     thumbnail = models.ImageField(upload_to='uploads/thumbnails', blank=True, null=True)
 
     _all_articles = ArticleSlugsManager()
-    slug = AutoSlugField(
+    slug = SourceSlugField(
         null=True,
         default=None,
         unique=True,
         populate_from='title',
-        manager=_all_articles,
-        always_update=True
+        manager=_all_articles
     )
 
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='articles')
@@ -48,12 +59,116 @@ class Article(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Bumped by every content change, autosave patches are made against a revision.
+    revision = models.PositiveIntegerField(default=0)
+
+    # Written in batches by articles.view_counts, lags behind by a few seconds.
+    views_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = ArticleManager()
     drafts = ArticleDraftsManager()
 
     def __str__(self):
         return f'{self.title[:20]}...'
 
+    # Set by the content setter, the body is only written when it has changed.
+    _content_changed = False
+
+    @property
+    def content(self):
+        """ The body lives in ArticleBody, use select_related('body') when it's needed. """
+        try:
+            return self.body.content
+        except ArticleBody.DoesNotExist:
+            return ''
+
+    @content.setter
+    def content(self, value):
+        try:
+            self.body.content = value
+        except ArticleBody.DoesNotExist:
+            self.body = ArticleBody(article=self, content=value)
+
+        self._content_changed = True
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the body too when the content has been set.
+        'content' can be passed in update_fields like a regular field.
+        """
+        update_fields = kwargs.get('update_fields')
+        save_body = self._content_changed
+
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            save_body = save_body and 'content' in update_fields
+            update_fields.discard('content')
+
+        if save_body:
+            stats = self.content_stats(self.body.content)
+            for field, value in stats.items():
+                setattr(self, field, value)
+
+            if update_fields is not None:
+                update_fields.update(stats)
+
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+
+        adding = self._state.adding
+        old_slug = self.slug
+
+        super(Article, self).save(*args, **kwargs)
+
+        if old_slug and old_slug != self.slug:
+            # Keeps the old URLs working, see ArticleViewSet.retrieve.
+            ArticleSlugRedirect.objects.update_or_create(old_slug=old_slug,
+                                                         defaults={'article': self})
+
+        if adding or old_slug != self.slug:
+            # The slug can't redirect anymore once an article has it again.
+            ArticleSlugRedirect.objects.filter(old_slug=self.slug).delete()
+
+        if save_body:
+            self.body.article = self
+            self.body.save(force_insert=adding)
+            self._content_changed = False
+
+    def set_tags(self, tags):
+        """
+        Replaces the article's tags with bulk writes to the through table.
+        Unlike tags.set() no m2m_changed signals are sent, the caller refreshes
+        the related articles. Returns whether the tags changed.
+        """
+        ArticleTags = Article.tags.through
+
+        tag_ids = {tag.pk for tag in tags}
+        current = set(ArticleTags.objects.filter(article=self).values_list('tag_id', flat=True))
+
+        removed = current - tag_ids
+        added = tag_ids - current
+
+        if removed:
+            ArticleTags.objects.filter(article=self, tag_id__in=removed).delete()
+
+        if added:
+            ArticleTags.objects.bulk_create([
+                ArticleTags(article=self, tag_id=tag_id) for tag_id in added
+            ])
+
+        return bool(removed or added)
+
+    @classmethod
+    def content_stats(cls, content):
+        """ Returns the excerpt, word count & reading time (in minutes) of the content. """
+        word_count = len(content.split())
+
+        return {
+            'excerpt': Truncator(content).words(cls.EXCERPT_WORDS),
+            'word_count': word_count,
+            'reading_time': max(math.ceil(word_count / cls.WORDS_PER_MINUTE), 1),
+        }
+
     @property
     def likes_count(self):
         likes = self.likes.all()
@@ -64,6 +179,13 @@ class Article(models.Model):
         likes = self.likes.all()
         return likes.filter(article=self, special_like=True).count()
 
+    def get_like_counts(self):
+        """ Returns both like counts in a single query. """
+        return self.likes.aggregate(
+            likes_count=Count('id', filter=Q(special_like=False)),
+            special_likes_count=Count('id', filter=Q(special_like=True))
+        )
+
     @property
     def comments_count(self):
         return Comment.objects.filter(article=self).count()
@@ -80,6 +202,191 @@ class Article(models.Model):
         return reverse('article-detail', kwargs={'slug': self.slug})
 
 
+class ArticleSlugRedirect(models.Model):
+    """ A slug the article had before its title changed. """
+    old_slug = models.SlugField(max_length=60, unique=True)
+    article = models.ForeignKey('Article', on_delete=models.CASCADE,
+                                related_name='slug_redirects')
+
+    def __str__(self):
+        return f'{self.old_slug} -> {self.article_id}'
+
+
+class ArticleBody(models.Model):
+    """
+    The content of an article. Kept out of the Article row so that list queries
+    & counter updates don't have to read or rewrite large bodies.
+    """
+    article = models.OneToOneField('Article', on_delete=models.CASCADE, primary_key=True,
+                                   related_name='body')
+    content = models.TextField()
+
+    def __str__(self):
+        return f'Body of {self.article_id}'
+
+
+class DraftPatch(models.Model):
+    """
+    An autosaved edit of a draft that hasn't been folded into its content yet.
+    Applying the patches in revision order to the content gives the latest draft
+    (see articles.autosave).
+    """
+    article = models.ForeignKey('Article', on_delete=models.CASCADE, related_name='patches')
+    revision = models.PositiveIntegerField()
+    operations = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'revision'],
+                name='unique_draft_patch'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.article} revision {self.revision}'
+
+
+class ArticleRevision(models.Model):
+    """
+    A published version of an article's content, zlib compressed.
+    Either a full snapshot or a line delta against the previous revision
+    (see articles.history).
+    """
+    article = models.ForeignKey('Article', on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'number'],
+                name='unique_article_revision'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.article} revision {self.number}'
+
+
+class ArticleReaderSketch(models.Model):
+    """ HyperLogLog sketch of the distinct readers of an article on a day, see articles.readers. """
+    article = models.ForeignKey('Article', on_delete=models.CASCADE, related_name='reader_sketches')
+    day = models.DateField()
+    sketch = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'day'],
+                name='unique_article_reader_sketch'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.article} readers on {self.day}'
+
+
+class DailyStats(models.Model):
+    """
+    Engagement counters of a day, maintained by the engagement signals and
+    rebuilt by the reconcile_daily_stats command, see articles.stats.
+    Each event counts on the day it happened, undoing it (unliking, unsaving)
+    takes it off that day.
+    """
+    day = models.DateField()
+
+    likes = models.IntegerField(default=0)
+    special_likes = models.IntegerField(default=0)
+    comments = models.IntegerField(default=0)
+    saves = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class ArticleDailyStats(DailyStats):
+    article = models.ForeignKey('Article', on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'day'],
+                name='unique_article_daily_stats'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.article} on {self.day}'
+
+
+class AuthorDailyStats(DailyStats):
+    """ The totals of all the articles of an author. """
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE,
+                             related_name='daily_stats')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day'],
+                name='unique_author_daily_stats'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} on {self.day}'
+
+
+class RelatedArticle(models.Model):
+    """
+    A precomputed entry in an article's "related articles" list.
+    Maintained by articles.related when tags change.
+    """
+    article = models.ForeignKey('Article', on_delete=models.CASCADE,
+                                related_name='related_articles')
+    related = models.ForeignKey('Article', on_delete=models.CASCADE, related_name='related_from')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'related'],
+                name='unique_related_article'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['article', '-score'], name='related_article_rank_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.related} is related to {self.article}'
+
+
+class TrendingEpoch(models.Model):
+    """
+    The reference time the trending scores are relative to (see articles.trending).
+    There's only ever one row, the generation is bumped every time the scores are rebased.
+    """
+    generation = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'Trending epoch {self.generation} ({self.started_at})'
+
+
+class TrendingScore(models.Model):
+    article = models.OneToOneField('Article', on_delete=models.CASCADE, primary_key=True,
+                                   related_name='trending_score')
+    score = models.FloatField(default=0, db_index=True)
+    generation = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.article} ({self.score})'
+
+
 class ArticleLike(models.Model):
     special_like = models.BooleanField(default=False)
 
@@ -89,6 +396,17 @@ class ArticleLike(models.Model):
 
     article = models.ForeignKey('Article', on_delete=models.CASCADE, related_name='likes')
 
+    # Null for the likes made before it was recorded, they're left out of the daily stats.
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'article', 'special_like'],
+                name='unique_article_like'
+            )
+        ]
+
     def __str__(self):
         if not self.special_like:
             return f'{self.user.username} liked {self.article.title[:20]}...'
@@ -116,6 +434,19 @@ class Comment(models.Model):
 
     deleted = models.BooleanField(default=False)
 
+    # Vote tallies & the "best" ranking value, kept up to date by update_vote_tally().
+    upvotes_count = models.PositiveIntegerField(default=0)
+    downvotes_count = models.PositiveIntegerField(default=0)
+    rank = models.FloatField(default=0)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['article', 'parent', '-rank'], name='comment_rank_idx'),
+            models.Index(fields=['created_at'], name='comment_created_idx')
+        ]
+
     def __str__(self):
         return f'{self.body[:20]}...'
 
@@ -129,16 +460,68 @@ class Comment(models.Model):
     def delete(self):
         self.deleted = True
         self.comment_votes.all().delete()
+
+        self.upvotes_count = 0
+        self.downvotes_count = 0
+        self.rank = 0
         self.save()
 
+    def update_vote_tally(self):
+        """
+        Recounts the votes and stores the tallies & rank.
+        Uses a queryset update so that neither updated_at nor the save signals are triggered.
+        """
+        tally = self.comment_votes.aggregate(
+            upvotes=Count('id', filter=Q(downvote=False)),
+            downvotes=Count('id', filter=Q(downvote=True))
+        )
+
+        self.upvotes_count = tally['upvotes']
+        self.downvotes_count = tally['downvotes']
+        self.rank = wilson_lower_bound(self.upvotes_count, self.downvotes_count)
+
+        Comment.objects.filter(pk=self.pk).update(
+            upvotes_count=self.upvotes_count,
+            downvotes_count=self.downvotes_count,
+            rank=self.rank
+        )
+
+    def set_vote(self, user, downvote):
+        """
+        Sets the user's vote on the comment and updates the tallies in the same transaction.\n
+
+        -- Params --
+        user: The voting user.
+        downvote: True for a downvote, False for an upvote & None to remove the vote.
+        """
+        with transaction.atomic():
+            # Votes on the same comment are serialized so that the tallies can't miss a vote.
+            Comment.objects.select_for_update().only('id').get(pk=self.pk)
+
+            votes = CommentVote.objects.filter(comment=self, user=user)
+
+            if downvote is None:
+                # The tallies are updated by the post_delete signal.
+                votes.delete()
+                self.refresh_from_db(fields=('upvotes_count', 'downvotes_count', 'rank'))
+                return
+
+            if not votes.update(downvote=downvote):
+                try:
+                    with transaction.atomic():
+                        CommentVote.objects.bulk_create([
+                            CommentVote(comment=self, user=user, downvote=downvote)
+                        ])
+
+                except IntegrityError:
+                    votes.update(downvote=downvote)
+
+            self.update_vote_tally()
+
     @property
     def score(self):
         if not self.deleted:
-            votes = self.comment_votes.all()
-            if votes:
-                return votes.filter(downvote=False).count() - votes.filter(downvote=True).count()
-
-            return 0
+            return self.upvotes_count - self.downvotes_count
 
         else:
             return None
@@ -162,6 +545,14 @@ class CommentVote(models.Model):
                                 on_delete=models.CASCADE,
                                 related_name='comment_votes')
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'comment'],
+                name='unique_comment_vote'
+            )
+        ]
+
     def __str__(self):
         if not self.downvote:
             return f'{self.user.username} upvoted {self.comment.body[:20]}...'
@@ -1,7 +1,27 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 
 
 class FeedPagination(PageNumberPagination):
     page_size = 30
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+
+class CommentThreadPagination(CursorPagination):
+    """ Follows the comment sort, "top" needs the vote_score annotation (see CommentThreadView). """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    orderings = {
+        'best': ('-rank', '-id',),
+        'new': ('-created_at', '-id',),
+        'top': ('-vote_score', '-id',),
+    }
+
+    @classmethod
+    def ordering_for(cls, sort):
+        return cls.orderings.get(sort, cls.orderings['best'])
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering_for(request.query_params.get('sort'))
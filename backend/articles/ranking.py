@@ -0,0 +1,27 @@
+"""
+Comment ranking helpers.
+"""
+import math
+
+
+# z-score for an 80% confidence interval.
+CONFIDENCE_Z = 1.281551565545
+
+
+def wilson_lower_bound(upvotes, downvotes, z=CONFIDENCE_Z):
+    """
+    Returns the lower bound of the Wilson score interval for the upvote ratio.
+
+    Unlike up - down or up / total this accounts for how many votes there are,
+    a comment with 1 upvote & 0 downvotes ranks below one with 90 & 10.
+    """
+    total = upvotes + downvotes
+    if not total:
+        return 0
+
+    ratio = upvotes / total
+
+    return (
+        ratio + z * z / (2 * total)
+        - z * math.sqrt((ratio * (1 - ratio) + z * z / (4 * total)) / total)
+    ) / (1 + z * z / total)
@@ -0,0 +1,151 @@
+"""
+Distinct reader estimates of articles, one HyperLogLog sketch per article per day.
+
+Readers are added to in-process sketches from the article detail path and
+merged into the stored sketches in batches, like the view counts (see
+articles.view_counts). Merging is idempotent, so readers counted by several
+processes or seen twice are never counted twice.
+
+Flushes lock the stored sketches in (article, day) order, so concurrent
+flushes can't deadlock. A flush that fails puts its registers back in the
+buffer for the next one.
+"""
+import atexit
+import threading
+import time
+
+from django.db import transaction, DatabaseError
+from django.utils import timezone
+
+from .hyperloglog import HyperLogLog, position
+from .models import Article, ArticleReaderSketch
+from .view_counts import viewer_key
+
+
+FLUSH_INTERVAL = 30
+FLUSH_MAX_SKETCHES = 200
+
+# Longest range the readers endpoint merges.
+MAX_DAYS = 366
+
+
+class ReaderBuffer:
+    def __init__(self):
+        # (article id, day) -> {register index: rank}
+        self.sketches = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def add(self, article_id, key, day=None):
+        day = day or timezone.now().date()
+        index, rank = position(key)
+
+        with self.lock:
+            registers = self.sketches.setdefault((article_id, day), {})
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+
+        if (time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+                or len(self.sketches) >= FLUSH_MAX_SKETCHES):
+            self.flush()
+
+    def flush(self):
+        """ Merges the buffered registers into the stored sketches, returns how many changed. """
+        with self.lock:
+            pending, self.sketches = self.sketches, {}
+            self.last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        try:
+            return self.write(pending)
+
+        except DatabaseError:
+            self.restore(pending)
+            return 0
+
+    def restore(self, pending):
+        """ Puts back the registers of a failed flush, they're retried by the next one. """
+        with self.lock:
+            for key, registers in pending.items():
+                buffered = self.sketches.setdefault(key, {})
+
+                for index, rank in registers.items():
+                    if rank > buffered.get(index, 0):
+                        buffered[index] = rank
+
+    def write(self, pending):
+        # Articles deleted since they were read are skipped.
+        article_ids = set(Article._all_articles.filter(
+            pk__in={article_id for article_id, _ in pending}
+        ).values_list('pk', flat=True))
+        pending = {key: value for key, value in pending.items() if key[0] in article_ids}
+        days = {day for _, day in pending}
+
+        empty = HyperLogLog().to_bytes()
+
+        with transaction.atomic():
+            # Every sketch exists before they're locked, so that concurrent flushes
+            # of a new article-day merge into the same row instead of racing inserts.
+            ArticleReaderSketch.objects.bulk_create([
+                ArticleReaderSketch(article_id=article_id, day=day, sketch=empty)
+                for article_id, day in sorted(pending)
+            ], ignore_conflicts=True)
+
+            stored = ArticleReaderSketch.objects.select_for_update().filter(
+                article_id__in=article_ids,
+                day__in=days
+            ).order_by('article_id', 'day')
+
+            changed = []
+            for sketch in stored:
+                registers = pending.get((sketch.article_id, sketch.day))
+                if registers is None:
+                    continue
+
+                hll = HyperLogLog.from_bytes(sketch.sketch)
+                updated = False
+
+                for index, rank in registers.items():
+                    if rank > hll.registers[index]:
+                        hll.registers[index] = rank
+                        updated = True
+
+                if updated:
+                    sketch.sketch = hll.to_bytes()
+                    changed.append(sketch)
+
+            ArticleReaderSketch.objects.bulk_update(changed, ['sketch'])
+
+        return len(changed)
+
+
+buffer = ReaderBuffer()
+
+
+@atexit.register
+def flush_at_exit():
+    try:
+        buffer.flush()
+    except DatabaseError:
+        pass
+
+
+def record_reader(article, request):
+    buffer.add(article.pk, viewer_key(request))
+
+
+def estimate_readers(article, start, end):
+    """ Returns the estimated distinct readers of every day in [start, end] & of the range. """
+    sketches = ArticleReaderSketch.objects.filter(article=article, day__range=(start, end))
+
+    total = HyperLogLog()
+    days = []
+
+    for day, data in sketches.order_by('day').values_list('day', 'sketch'):
+        hll = HyperLogLog.from_bytes(data)
+        total.merge(hll)
+        days.append({'day': day, 'readers': hll.count()})
+
+    return {'start': start, 'end': end, 'readers': total.count(), 'days': days}
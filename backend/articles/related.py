@@ -0,0 +1,214 @@
+"""
+Precomputed "related articles" lists.
+
+Two articles are scored by the weighted Jaccard similarity of their tag sets,
+where every tag is weighted by how rare it is (sharing a niche tag says more
+than sharing a popular one). Newer articles get a small boost on top.
+"""
+import math
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Article, RelatedArticle
+
+
+# Length of the stored list per article.
+TOP_N = 5
+
+# Only the newest MAX_CANDIDATES_PER_TAG articles of every tag are considered.
+MAX_CANDIDATES_PER_TAG = 200
+
+# A brand new article scores up to RECENCY_BOOST higher,
+# the boost halves every RECENCY_HALF_LIFE_DAYS.
+RECENCY_BOOST = 0.25
+RECENCY_HALF_LIFE_DAYS = 30
+
+# Relative score changes below this don't rewrite a list entry.
+SCORE_TOLERANCE = 0.01
+
+
+ArticleTags = Article.tags.through
+
+
+def tag_weights(tag_ids):
+    """ Returns the inverse document frequency weight of the given tags. """
+    total = Article.objects.count() or 1
+
+    counts = ArticleTags.objects.filter(tag_id__in=tag_ids, article__draft=False)
+    counts = counts.values('tag_id').annotate(count=Count('id')).values_list('tag_id', 'count')
+    counts = dict(counts)
+
+    return {tag_id: math.log(1 + total / (counts.get(tag_id) or 1)) for tag_id in tag_ids}
+
+
+def recency_boost(created_at, now):
+    age_days = max((now - created_at).total_seconds() / 86400, 0)
+    return 1 + RECENCY_BOOST * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def weighted_jaccard(tags, other_tags, weights):
+    union = sum(weights[tag] for tag in tags | other_tags)
+    if not union:
+        return 0
+
+    return sum(weights[tag] for tag in tags & other_tags) / union
+
+
+def score_candidates(article):
+    """
+    Scores every published article sharing a tag with the given article.
+    Returns a list of (score, similarity, article_id), best first.
+    The score is the similarity with the candidate's recency boost applied.
+    """
+    tags = set(ArticleTags.objects.filter(article=article).values_list('tag_id', flat=True))
+    if not tags:
+        return []
+
+    candidate_ids = set()
+    for tag_id in tags:
+        newest = ArticleTags.objects.filter(tag_id=tag_id, article__draft=False)
+        newest = newest.exclude(article=article).order_by('-article_id')
+
+        candidate_ids.update(newest.values_list('article_id', flat=True)[:MAX_CANDIDATES_PER_TAG])
+
+    rows = ArticleTags.objects.filter(article_id__in=candidate_ids)
+    rows = rows.values_list('article_id', 'tag_id', 'article__created_at')
+
+    candidates = {}
+    created = {}
+    for article_id, tag_id, created_at in rows:
+        candidates.setdefault(article_id, set()).add(tag_id)
+        created[article_id] = created_at
+
+    weights = tag_weights(tags.union(*candidates.values()))
+    now = timezone.now()
+
+    scored = []
+    for article_id, other_tags in candidates.items():
+        similarity = weighted_jaccard(tags, other_tags, weights)
+        score = similarity * recency_boost(created[article_id], now)
+        scored.append((score, similarity, article_id))
+
+    scored.sort(reverse=True)
+
+    return scored
+
+
+def score_changed(old, new):
+    # Scores drift a little with the recency boost, that alone isn't worth a write.
+    return not math.isclose(old, new, rel_tol=SCORE_TOLERANCE)
+
+
+def set_related_articles(article_id, entries):
+    """
+    Makes the related list of the article hold the given (related id, score) entries,
+    only the entries that are added, removed or rescored are written.
+    """
+    entries = dict(entries)
+    rows = RelatedArticle.objects.filter(article_id=article_id)
+    existing = dict(rows.values_list('related_id', 'score'))
+
+    removed = set(existing) - set(entries)
+    if removed:
+        rows.filter(related_id__in=removed).delete()
+
+    for related_id, score in entries.items():
+        if related_id in existing and score_changed(existing[related_id], score):
+            rows.filter(related_id=related_id).update(score=score)
+
+    RelatedArticle.objects.bulk_create([
+        RelatedArticle(article_id=article_id, related_id=related_id, score=score)
+        for related_id, score in entries.items()
+        if related_id not in existing
+    ])
+
+
+def recompute_related_articles(article):
+    top = score_candidates(article)[:TOP_N] if not article.draft else []
+    set_related_articles(article.pk, [(related_id, score) for score, _, related_id in top])
+
+    return top
+
+
+def refresh_related_articles(article):
+    """
+    Recomputes the related list of the given article and updates its place in the
+    lists of the other articles. A list the article drops out of, or falls in,
+    is recomputed so that it's refilled from its candidates.
+    """
+    scored = score_candidates(article) if not article.draft else []
+
+    # The similarity is symmetric, only the recency boost differs.
+    boost = recency_boost(article.created_at, timezone.now())
+    scores = {article_id: similarity * boost for _, similarity, article_id in scored}
+
+    with transaction.atomic():
+        set_related_articles(article.pk, [
+            (article_id, score) for score, _, article_id in scored[:TOP_N]
+        ])
+
+        holders = dict(
+            RelatedArticle.objects.filter(related=article).values_list('article_id', 'score')
+        )
+
+        refill = []
+        for article_id, old_score in holders.items():
+            score = scores.get(article_id)
+
+            if score is None or (score < old_score and score_changed(old_score, score)):
+                # Another candidate may now be a better match than the article.
+                refill.append(article_id)
+
+            elif score_changed(old_score, score):
+                RelatedArticle.objects.filter(article_id=article_id, related=article).update(
+                    score=score
+                )
+
+        for holder in Article._all_articles.filter(pk__in=refill).only('id', 'draft'):
+            recompute_related_articles(holder)
+
+        # The article joins the lists it now ranks in.
+        others = set(scores) - set(holders)
+        rows = RelatedArticle.objects.filter(article_id__in=others)
+
+        existing = {}
+        for pk, article_id, score in rows.values_list('pk', 'article_id', 'score'):
+            existing.setdefault(article_id, []).append((score, pk))
+
+        new_entries = []
+        evicted = []
+        for article_id in others:
+            score = scores[article_id]
+            entries = sorted(existing.get(article_id, []))
+
+            if len(entries) < TOP_N:
+                new_entries.append(RelatedArticle(article_id=article_id, related=article,
+                                                  score=score))
+
+            elif entries[0][0] < score:
+                evicted.append(entries[0][1])
+                new_entries.append(RelatedArticle(article_id=article_id, related=article,
+                                                  score=score))
+
+        RelatedArticle.objects.filter(pk__in=evicted).delete()
+        RelatedArticle.objects.bulk_create(new_entries)
+
+
+def rebuild_related_articles(stdout=None):
+    """ Recomputes the related lists of all published articles. """
+    articles = Article.objects.only('id').order_by('id')
+
+    for count, article in enumerate(articles.iterator(), start=1):
+        top = score_candidates(article)[:TOP_N]
+
+        with transaction.atomic():
+            RelatedArticle.objects.filter(article=article).delete()
+            RelatedArticle.objects.bulk_create([
+                RelatedArticle(article=article, related_id=related_id, score=score)
+                for score, _, related_id in top
+            ])
+
+        if stdout and count % 1000 == 0:
+            stdout.write(f'{count} articles processed.')
@@ -1,20 +1,19 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.urls import reverse
+from django.utils.http import urlencode
 
 from rest_framework import serializers
 from rest_framework.validators import ValidationError
 
-from ..models import Tag, Article, Comment
+from ..models import Tag, Article, Comment, ArticleRevision
+from ..related import refresh_related_articles
+from ..view_counts import live_views_count
 
 
 User = get_user_model()
 
 
-class RecursiveCommentSerializer(serializers.Serializer):
-    def to_representation(self, value):
-        serializer = self.parent.parent.__class__(value, context=self.context)
-        return serializer.data
-
-
 class UserInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -23,7 +22,7 @@ class UserInfoSerializer(serializers.ModelSerializer):
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    children = RecursiveCommentSerializer(many=True, read_only=True)
+    children = serializers.SerializerMethodField()
     user = UserInfoSerializer(read_only=True)
 
     class Meta:
@@ -31,6 +30,11 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'body', 'user', 'article', 'parent', 'score', 'children', 'created_at',)
         read_only_fields = ('user',)
 
+    def get_children(self, obj):
+        """ Replies are sorted the same way as the thread (see CommentQuerySet.sorted). """
+        children = obj.children.sorted(self.context.get('sort'))
+        return CommentSerializer(children, many=True, context=self.context).data
+
     def validate(self, data):
         if data.get('parent'):
             if not data['article'].id == data['parent'].article.id:
@@ -46,14 +50,81 @@ class CommentSerializer(serializers.ModelSerializer):
         return comment
 
 
+class CommentThreadSerializer(serializers.ModelSerializer):
+    """
+    A comment with its number of replies & the first few of them (see CommentThreadView).
+    The replies are looked up in context['replies'], comment id -> list of replies.
+    """
+    user = UserInfoSerializer(read_only=True)
+    reply_count = serializers.IntegerField(read_only=True)
+    replies = serializers.SerializerMethodField()
+    has_more = serializers.SerializerMethodField()
+    more_replies = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'body', 'user', 'article', 'parent', 'score', 'created_at',
+                  'reply_count', 'has_more', 'more_replies', 'replies',)
+
+    def get_replies(self, obj):
+        replies = self.context.get('replies', {}).get(obj.pk, [])
+        context = {**self.context, 'replies': {}}
+
+        return CommentThreadSerializer(replies, many=True, context=context).data
+
+    def get_has_more(self, obj):
+        """ True if some replies aren't included, they're loaded with comment-replies. """
+        return obj.reply_count > len(self.context.get('replies', {}).get(obj.pk, []))
+
+    def get_more_replies(self, obj):
+        """ The comment-replies URL continuing after the included replies, if there are more. """
+        if not self.get_has_more(obj):
+            return None
+
+        request = self.context.get('request')
+        params = {}
+
+        if request and request.query_params.get('sort'):
+            params['sort'] = request.query_params['sort']
+
+        replies = self.context.get('replies', {}).get(obj.pk)
+        if replies:
+            params['after'] = replies[-1].pk
+
+        url = reverse('comment-replies', kwargs={'pk': obj.pk})
+        if params:
+            url = f'{url}?{urlencode(params)}'
+
+        return request.build_absolute_uri(url) if request else url
+
+
+class TagSlugsField(serializers.ListField):
+    """
+    The tags as a list of slugs.
+    All of the slugs are resolved in one query, SlugRelatedField does one per slug.
+    """
+    child = serializers.SlugField()
+
+    def to_representation(self, value):
+        return [tag.slug for tag in value.all()]
+
+    def to_internal_value(self, data):
+        slugs = list(dict.fromkeys(super().to_internal_value(data)))
+
+        tags = {tag.slug: tag for tag in Tag.objects.filter(slug__in=slugs)}
+        missing = [slug for slug in slugs if slug not in tags]
+
+        if missing:
+            raise ValidationError(f'Tags with the slugs {", ".join(missing)} do not exist.')
+
+        return [tags[slug] for slug in slugs]
+
+
 class ArticleSerializer(serializers.ModelSerializer):
     user = UserInfoSerializer(read_only=True)
-    tags = serializers.SlugRelatedField(
-        many=True,
-        required=False,
-        slug_field='slug',
-        queryset=Tag.objects.all()
-    )
+    # Stored in ArticleBody, see Article.content.
+    content = serializers.CharField()
+    tags = TagSlugsField(required=False)
 
     comments = CommentSerializer(many=True, read_only=True)
 
@@ -61,21 +132,106 @@ class ArticleSerializer(serializers.ModelSerializer):
     special_likes_count = serializers.ReadOnlyField()
     saved_count = serializers.ReadOnlyField()
     comments_count = serializers.ReadOnlyField()
+    views_count = serializers.SerializerMethodField()
+
+    viewer = serializers.SerializerMethodField()
 
     class Meta:
         model = Article
         fields = '__all__'
-        read_only_fields = ('user', 'slug',)
+        read_only_fields = ('user', 'slug', 'revision',)
         lookup_field = 'slug'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # The whole discussion is only embedded with ?include=comments,
+        # clients page through it with the article-comments endpoint instead.
+        request = self.context.get('request')
+        include = request.query_params.get('include', '').split(',') if request else []
+
+        if 'comments' not in include:
+            self.fields.pop('comments')
+
+    def get_views_count(self, obj):
+        return live_views_count(obj)
+
+    def get_viewer(self, obj):
+        """ See ArticleFeedSerializer.get_viewer. """
+        return self.context.get('viewer_state', {}).get(obj.pk)
+
+    def validate_tags(self, tags):
+        if len(tags) > Article.MAX_TAGS:
+            raise ValidationError('You can\'t assign more than five tags')
+
+        return tags
+
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         tags = validated_data.pop('tags', None)
 
-        article = Article.objects.create(**validated_data)
+        with transaction.atomic():
+            article = Article.objects.create(**validated_data)
+
+            if tags:
+                article.set_tags(tags)
 
         if tags:
-            for tag in tags:
-                article.tags.add(tag)
+            refresh_related_articles(article)
 
         return article
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        was_draft = instance.draft
+
+        with transaction.atomic():
+            article = super().update(instance, validated_data)
+            tags_changed = tags is not None and article.set_tags(tags)
+
+        # Publishing adds the article to the related lists, unpublishing removes it.
+        if tags_changed or article.draft != was_draft:
+            refresh_related_articles(article)
+
+        return article
+
+
+class ArticleListSerializer(ArticleSerializer):
+    """ Lists carry the precomputed excerpt as the content, the body isn't loaded for them. """
+    content = serializers.ReadOnlyField(source='excerpt')
+
+
+class PatchOperationSerializer(serializers.Serializer):
+    start = serializers.IntegerField(min_value=0)
+    end = serializers.IntegerField(min_value=0)
+    text = serializers.CharField(allow_blank=True, trim_whitespace=False)
+
+    def validate(self, data):
+        if data['start'] > data['end']:
+            raise ValidationError("start can't be after end")
+
+        return data
+
+
+class AutosaveSerializer(serializers.Serializer):
+    """ A patch of a draft, see articles.autosave. """
+    revision = serializers.IntegerField(min_value=0)
+    operations = PatchOperationSerializer(many=True, allow_empty=False)
+
+
+class ArticleRevisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArticleRevision
+        fields = ('number', 'created_at',)
+
+
+class ImportArticleSerializer(serializers.Serializer):
+    """ A line of an NDJSON article import, see articles.importer. """
+    title = serializers.CharField(max_length=50)
+    content = serializers.CharField()
+    draft = serializers.BooleanField(default=False)
+    tags = serializers.ListField(child=serializers.SlugField(), max_length=Article.MAX_TAGS,
+                                 default=list)
+
+    def validate_tags(self, tags):
+        return list(dict.fromkeys(tags))
@@ -1,5 +1,4 @@
 from django.contrib.auth import get_user_model
-from django.utils.text import Truncator
 
 from rest_framework import serializers
 
@@ -23,7 +22,8 @@ class ArticleUserFeedSerializer(serializers.ModelSerializer):
 
 class ArticleFeedSerializer(serializers.ModelSerializer):
     user = ArticleUserFeedSerializer()
-    content = serializers.SerializerMethodField()
+    # The first Article.EXCERPT_WORDS words of the content followed by '...'.
+    content = serializers.ReadOnlyField(source='excerpt')
 
     tags = serializers.SlugRelatedField(
         many=True,
@@ -32,17 +32,21 @@ class ArticleFeedSerializer(serializers.ModelSerializer):
         queryset=Tag.objects.all()
     )
 
+    viewer = serializers.SerializerMethodField()
+
     class Meta:
         model = Article
         fields = ('title', 'slug', 'tags', 'content', 'likes_count', 'created_at',
-                  'special_likes_count', 'comments_count', 'user', 'thumbnail')
+                  'special_likes_count', 'comments_count', 'user', 'thumbnail', 'viewer',
+                  'word_count', 'reading_time', 'views_count')
 
-    def get_content(self, obj):
+    def get_viewer(self, obj):
         """
-        Truncates the content to 40 words
-        and then adds '...' to the end.
+        The requesting user's liked, special_liked, saved & is_owner state.
+        Only set for lists of articles for logged in users asking for it with
+        ?include=viewer (see ViewerStateMixin).
         """
-        return Truncator(obj.content).words(40)
+        return self.context.get('viewer_state', {}).get(obj.pk)
 
 
 class FollowedTagsSerializer(serializers.Serializer):
@@ -1,24 +1,62 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.utils import timezone
 from django.dispatch import receiver
 from rest_framework.exceptions import ValidationError
 from rest_framework.status import HTTP_400_BAD_REQUEST
 
 from notifications.models import Notification
+from users.models import SavedArticle
 
-from .models import Article, ArticleLike, Comment
+from .models import Article, ArticleLike, Comment, CommentVote
+from .related import refresh_related_articles
+from . import trending, stats
 
 
 @receiver(m2m_changed, sender=Article.tags.through)
-def tags_changed(sender, **kwargs):
-    if kwargs['instance'].tags.count() > 5:
+def tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Guards article.tags.add(), the API checks the limit in ArticleSerializer. """
+    if action != 'pre_add' or reverse:
+        return
+
+    # pk_set only contains the tags the article doesn't have yet.
+    if instance.tags.count() + len(pk_set) > Article.MAX_TAGS:
         raise ValidationError(
             {'details': 'You can\'t assign more than five tags'},
             code=HTTP_400_BAD_REQUEST
         )
 
 
+@receiver(m2m_changed, sender=Article.tags.through)
+def refresh_related_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # post_clear has no pk_set, the tag's articles are remembered before they're gone.
+        instance._cleared_article_ids = list(
+            sender.objects.filter(tag=instance).values_list('article_id', flat=True)
+        )
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    # tag.articles.add(...) etc. sends the tag as the instance.
+    if reverse:
+        if action == 'post_clear':
+            pk_set = instance.__dict__.pop('_cleared_article_ids', ())
+
+        articles = Article._all_articles.filter(pk__in=pk_set or ())
+    else:
+        articles = [instance]
+
+    for article in articles:
+        refresh_related_articles(article)
+
+
 @receiver(post_save, sender=ArticleLike)
-def send_like_notification(sender, instance, **kwargs):
+def send_like_notification(sender, instance, created, **kwargs):
+    if not created:
+        return
+
     if instance.special_like:
         Notification.objects.create(
             sender=instance.user,
@@ -36,6 +74,33 @@ def send_like_notification(sender, instance, **kwargs):
         )
 
 
+@receiver(post_save, sender=ArticleLike)
+def add_like_to_trending(sender, instance, created, **kwargs):
+    if created:
+        if instance.special_like:
+            trending.record_event(instance.article_id, trending.SPECIAL_LIKE_WEIGHT)
+        else:
+            trending.record_event(instance.article_id, trending.LIKE_WEIGHT)
+
+
+@receiver(post_save, sender=Comment)
+def add_comment_to_trending(sender, instance, created, **kwargs):
+    if created:
+        trending.record_event(instance.article_id, trending.COMMENT_WEIGHT)
+
+
+@receiver(m2m_changed, sender=get_user_model().saved_articles.through)
+def add_save_to_trending(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add':
+        return
+
+    # user.saved_articles.add(article) sends the user as the instance.
+    article_ids = pk_set if not reverse else [instance.pk]
+
+    for article_id in article_ids:
+        trending.record_event(article_id, trending.SAVE_WEIGHT)
+
+
 @receiver(post_save, sender=Comment)
 def send_comment_notification(sender, instance, **kwargs):
     # If the comment isn't deleted.
@@ -52,3 +117,51 @@ def send_comment_notification(sender, instance, **kwargs):
             action=Notification.COMMENT,
             comment=instance
         )
+
+
+@receiver(post_save, sender=CommentVote)
+@receiver(post_delete, sender=CommentVote)
+def update_comment_vote_tally(sender, instance, **kwargs):
+    instance.comment.update_vote_tally()
+
+
+@receiver(post_save, sender=ArticleLike)
+def add_like_to_stats(sender, instance, created, **kwargs):
+    if created:
+        field = 'special_likes' if instance.special_like else 'likes'
+        stats.record(instance.article_id, instance.created_at, field)
+
+
+@receiver(post_delete, sender=ArticleLike)
+def remove_like_from_stats(sender, instance, **kwargs):
+    field = 'special_likes' if instance.special_like else 'likes'
+    stats.record(instance.article_id, instance.created_at, field, -1)
+
+
+@receiver(post_save, sender=Comment)
+def add_comment_to_stats(sender, instance, created, **kwargs):
+    if created:
+        stats.record(instance.article_id, instance.created_at, 'comments')
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_stats(sender, instance, **kwargs):
+    stats.record(instance.article_id, instance.created_at, 'comments', -1)
+
+
+@receiver(m2m_changed, sender=SavedArticle)
+def add_save_to_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add':
+        return
+
+    # Saves are added with bulk_create, which doesn't send post_save.
+    article_ids = pk_set if not reverse else [instance.pk]
+    now = timezone.now()
+
+    for article_id in article_ids:
+        stats.record(article_id, now, 'saves')
+
+
+@receiver(post_delete, sender=SavedArticle)
+def remove_save_from_stats(sender, instance, **kwargs):
+    stats.record(instance.article_id, instance.saved_at, 'saves', -1)
@@ -0,0 +1,157 @@
+"""
+Daily engagement rollups of articles and authors.
+
+The engagement signals (see articles.signals) add every like, comment & save
+to the ArticleDailyStats row of the article and the AuthorDailyStats row of
+its author for the day the event happened, and take it off again when it's
+undone. reconcile_stats rebuilds the rows of a range of days from the event
+tables, fixing whatever drift the incremental updates accumulated.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from users.models import SavedArticle
+
+from .models import Article, ArticleLike, Comment, ArticleDailyStats, AuthorDailyStats
+
+
+COUNTERS = ('likes', 'special_likes', 'comments', 'saves')
+
+
+def increment(queryset, field, delta, create):
+    """ Adds delta to the field of the row, creating it (with create()) for the first event. """
+    if queryset.update(**{field: F(field) + delta}) or delta < 0:
+        # Events undone after their row was deleted are left to the reconciliation.
+        return
+
+    instance = create()
+    if instance is None:
+        return
+
+    queryset.model.objects.bulk_create([instance], ignore_conflicts=True)
+    queryset.update(**{field: F(field) + delta})
+
+
+def record(article_id, when, field, delta=1):
+    """
+    Adds delta to the field of the article's & author's stats of the day of when.
+    Events without a time (made before it was recorded) aren't part of the stats.
+    """
+    if when is None:
+        return
+
+    day = timezone.localdate(when)
+
+    increment(
+        ArticleDailyStats.objects.filter(article_id=article_id, day=day), field, delta,
+        lambda: ArticleDailyStats(article_id=article_id, day=day)
+    )
+
+    def create_author_stats():
+        user_id = Article._all_articles.filter(pk=article_id).values_list('user_id', flat=True)
+        user_id = user_id.first()
+
+        return user_id and AuthorDailyStats(user_id=user_id, day=day)
+
+    # Filtered through the article so that the author isn't looked up for every event.
+    increment(
+        AuthorDailyStats.objects.filter(user__articles=article_id, day=day), field, delta,
+        create_author_stats
+    )
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def count_events(day):
+    """ Returns the counters of every article engaged with on the day, from the event tables. """
+    start, end = day_bounds(day)
+
+    sources = (
+        (ArticleLike.objects, 'created_at', {
+            'likes': Count('id', filter=Q(special_like=False)),
+            'special_likes': Count('id', filter=Q(special_like=True)),
+        }),
+        (Comment.objects, 'created_at', {'comments': Count('id')}),
+        (SavedArticle.objects, 'saved_at', {'saves': Count('id')}),
+    )
+
+    counts = defaultdict(Counter)
+    for queryset, field, aggregates in sources:
+        rows = queryset.filter(**{f'{field}__gte': start, f'{field}__lt': end})
+        rows = rows.order_by().values('article_id').annotate(**aggregates)
+
+        for row in rows:
+            counts[row.pop('article_id')].update(row)
+
+    return counts
+
+
+def reconcile_day(day):
+    """ Rebuilds the article & author stats of the day, returns the number of article rows. """
+    counts = count_events(day)
+
+    authors = dict(
+        Article._all_articles.filter(pk__in=counts).values_list('pk', 'user_id')
+    )
+
+    author_counts = defaultdict(Counter)
+    for article_id, counters in counts.items():
+        author_counts[authors[article_id]].update(counters)
+
+    with transaction.atomic():
+        ArticleDailyStats.objects.filter(day=day).delete()
+        AuthorDailyStats.objects.filter(day=day).delete()
+
+        ArticleDailyStats.objects.bulk_create([
+            ArticleDailyStats(article_id=article_id, day=day, **counters)
+            for article_id, counters in counts.items()
+        ])
+        AuthorDailyStats.objects.bulk_create([
+            AuthorDailyStats(user_id=user_id, day=day, **counters)
+            for user_id, counters in author_counts.items()
+        ])
+
+    return len(counts)
+
+
+def reconcile_stats(start, end, stdout=None):
+    """ Rebuilds the stats of every day from start to end, inclusive. """
+    day = start
+
+    while day <= end:
+        count = reconcile_day(day)
+
+        if stdout:
+            stdout.write(f'{day}: stats of {count} articles rebuilt.')
+
+        day += timedelta(days=1)
+
+
+def get_series(queryset, start, end):
+    """
+    Returns the counters of every day from start to end (zeros for days
+    without a row) and their totals, read with a single query.
+    """
+    rows = queryset.filter(day__range=(start, end)).values('day', *COUNTERS)
+    rows = {row.pop('day'): row for row in rows}
+
+    empty = dict.fromkeys(COUNTERS, 0)
+    totals = Counter(empty)
+    days = []
+
+    day = start
+    while day <= end:
+        counters = rows.get(day, empty)
+        totals.update(counters)
+        days.append({'day': day, **counters})
+
+        day += timedelta(days=1)
+
+    return {'start': start, 'end': end, 'totals': dict(totals), 'days': days}
@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import autosave
+from ..models import Article, DraftPatch
+
+
+User = get_user_model()
+
+
+class AutosaveTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.user_2 = User.objects.create_user(
+            username='User2',
+            email='user2@gmail.com',
+            password='12345'
+        )
+
+        self.draft = Article.objects.create(title='draft', content='Hello world',
+                                            user=self.user, draft=True)
+
+        self.url = reverse('article-autosave', kwargs={'slug': self.draft.slug})
+
+    def test_autosave(self):
+        """ Stores the patch without rewriting the content, slug or updated_at. """
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(self.url, {
+            'revision': 0,
+            'operations': [{'start': 6, 'end': 11, 'text': 'there'}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'revision': 1})
+
+        draft = Article._all_articles.get(pk=self.draft.pk)
+        self.assertEqual(draft.content, 'Hello world')
+        self.assertEqual(draft.slug, self.draft.slug)
+        self.assertEqual(draft.updated_at, self.draft.updated_at)
+        self.assertEqual(DraftPatch.objects.filter(article=self.draft).count(), 1)
+
+    def test_patches_folded_on_read(self):
+        """ The owner reads the draft with every autosave applied. """
+        self.client.force_authenticate(self.user)
+        self.client.patch(self.url, {
+            'revision': 0,
+            'operations': [{'start': 6, 'end': 11, 'text': 'there'}]
+        }, format='json')
+        self.client.patch(self.url, {
+            'revision': 1,
+            'operations': [
+                {'start': 11, 'end': 11, 'text': '!'},
+                {'start': 0, 'end': 0, 'text': '> '}
+            ]
+        }, format='json')
+
+        url = reverse('article-detail', kwargs={'slug': self.draft.slug})
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.json()['content'], '> Hello there!')
+        self.assertEqual(response.json()['revision'], 2)
+        self.assertFalse(DraftPatch.objects.filter(article=self.draft).exists())
+
+    def test_patches_folded_after_limit(self):
+        """ Pending patches are folded into the content once enough pile up. """
+        self.client.force_authenticate(self.user)
+
+        with mock.patch.object(autosave, 'FOLD_AFTER_PATCHES', 2):
+            for revision in range(2):
+                self.client.patch(self.url, {
+                    'revision': revision,
+                    'operations': [{'start': 0, 'end': 0, 'text': '#'}]
+                }, format='json')
+
+        self.assertEqual(Article._all_articles.get(pk=self.draft.pk).content, '##Hello world')
+        self.assertFalse(DraftPatch.objects.filter(article=self.draft).exists())
+
+    def test_autosave_stale_revision(self):
+        """ Responds with 409 because the patch was made against an old revision. """
+        self.client.force_authenticate(self.user)
+        self.client.patch(self.url, {
+            'revision': 0,
+            'operations': [{'start': 0, 'end': 0, 'text': 'a'}]
+        }, format='json')
+
+        response = self.client.patch(self.url, {
+            'revision': 0,
+            'operations': [{'start': 0, 'end': 0, 'text': 'b'}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.json()['revision'], 1)
+
+    def test_autosave_invalid_operation(self):
+        """ Responds with 400 because the operation's range is reversed. """
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(self.url, {
+            'revision': 0,
+            'operations': [{'start': 5, 'end': 1, 'text': ''}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autosave_not_owner(self):
+        """ Responds with 404 because only the owner can see the draft. """
+        self.client.force_authenticate(self.user_2)
+        response = self.client.patch(self.url, {
+            'revision': 0,
+            'operations': [{'start': 0, 'end': 0, 'text': 'a'}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
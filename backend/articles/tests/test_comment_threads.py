@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Article, Comment
+
+
+User = get_user_model()
+
+
+class CommentThreadsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.article = Article.objects.create(title='discussed', content='content',
+                                              user=self.user)
+
+        self.threads = [
+            Comment.objects.create(body=f'thread {i}', article=self.article, user=self.user)
+            for i in range(3)
+        ]
+
+        self.replies = [
+            Comment.objects.create(body=f'reply {i}', article=self.article, user=self.user,
+                                   parent=self.threads[0])
+            for i in range(5)
+        ]
+
+        Comment.objects.create(body='nested', article=self.article, user=self.user,
+                               parent=self.replies[0])
+
+        self.url = reverse('article-comments', kwargs={'slug': self.article.slug})
+
+    def test_article_detail_without_comments(self):
+        """ The article detail only embeds the comments when asked to. """
+        url = reverse('article-detail', kwargs={'slug': self.article.slug})
+
+        self.assertNotIn('comments', self.client.get(url).json())
+        self.assertEqual(len(self.client.get(url, {'include': 'comments'}).json()['comments']), 9)
+
+    def test_list_threads(self):
+        """ Top level comments are paginated, each with its first replies and reply count. """
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'sort': 'new', 'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.json()['results']
+        self.assertEqual([c['body'] for c in results], ['thread 2', 'thread 1'])
+        self.assertIsNotNone(response.json()['next'])
+
+        response = self.client.get(response.json()['next'])
+        thread = response.json()['results'][0]
+
+        self.assertEqual(thread['body'], 'thread 0')
+        self.assertEqual(thread['reply_count'], 5)
+        self.assertTrue(thread['has_more'])
+        self.assertEqual([r['body'] for r in thread['replies']], ['reply 4', 'reply 3', 'reply 2'])
+
+    def test_replies_limit(self):
+        response = self.client.get(self.url, {'replies': 10})
+        thread = next(c for c in response.json()['results'] if c['id'] == self.threads[0].pk)
+
+        self.assertEqual(len(thread['replies']), 5)
+        self.assertFalse(thread['has_more'])
+
+        response = self.client.get(self.url, {'replies': 0})
+        self.assertTrue(all(c['replies'] == [] for c in response.json()['results']))
+
+    def test_load_more_replies(self):
+        """ Deeper levels are loaded per comment. """
+        url = reverse('comment-replies', kwargs={'pk': self.threads[0].pk})
+        response = self.client.get(url, {'sort': 'new'})
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 5)
+
+        reply = results[-1]
+        self.assertEqual(reply['body'], 'reply 0')
+        self.assertEqual(reply['reply_count'], 1)
+        self.assertEqual(reply['replies'][0]['body'], 'nested')
+
+    def test_continue_after_embedded_replies(self):
+        """ more_replies continues after the last embedded reply, nothing is sent twice. """
+        for sort in ('best', 'new', 'top'):
+            response = self.client.get(self.url, {'sort': sort, 'replies': 2})
+            thread = next(c for c in response.json()['results'] if c['id'] == self.threads[0].pk)
+
+            embedded = [r['id'] for r in thread['replies']]
+            self.assertIn(f'after={embedded[-1]}', thread['more_replies'])
+
+            rest = [r['id'] for r in self.client.get(thread['more_replies']).json()['results']]
+
+            self.assertEqual(sorted(embedded + rest), sorted(r.pk for r in self.replies))
+
+    def test_replies_invalid_after(self):
+        """ Responds with 400 because after isn't one of the comment's replies. """
+        url = reverse('comment-replies', kwargs={'pk': self.threads[0].pk})
+
+        for after in ('abc', self.threads[1].pk):
+            response = self.client.get(url, {'after': after})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sort_top(self):
+        """ The "top" sort pages by score. """
+        self.threads[1].set_vote(User.objects.create_user(
+            username='User2',
+            email='user2@gmail.com',
+            password='12345'
+        ), downvote=False)
+
+        response = self.client.get(self.url, {'sort': 'top', 'page_size': 1})
+
+        self.assertEqual(response.json()['results'][0]['id'], self.threads[1].pk)
+        self.assertEqual(len(self.client.get(response.json()['next']).json()['results']), 1)
+
+    def test_draft_comments(self):
+        """ Responds with 404 because the article isn't published. """
+        self.article.draft = True
+        self.article.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
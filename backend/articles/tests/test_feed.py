@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -6,7 +8,8 @@ from rest_framework.test import APITestCase
 
 from users.models import UserFollowing
 
-from ..models import Tag, Article
+from ..models import Tag, Article, ArticleLike
+from ..viewer_state import get_viewer_state
 
 
 User = get_user_model()
@@ -105,3 +108,50 @@ class FeedViewTest(APITestCase):
             len(response.json()['results'][2]),
             Article.objects.exclude(user=self.user_2).count()
         )
+
+    def test_feed_viewer_state(self):
+        """ The feed embeds whether the user has liked, special liked & saved each article. """
+        article = Article.objects.filter(user=self.user_2).first()
+        ArticleLike.objects.create(user=self.user, article=article, special_like=True)
+        self.user.saved_articles.add(article)
+
+        url = reverse('article-feed')
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(url, {'include': 'viewer'})
+
+        viewer = {a['slug']: a['viewer'] for a in response.json()['results'][2]}
+
+        self.assertEqual(
+            viewer[article.slug],
+            {'liked': False, 'special_liked': True, 'saved': True, 'is_owner': False}
+        )
+
+    def test_viewer_state_not_requested(self):
+        """ The viewer state is only resolved when the client asks for it. """
+        url = reverse('article-feed')
+
+        self.client.force_authenticate(self.user)
+        with mock.patch('articles.viewer_state.get_viewer_state') as get_viewer_state:
+            response = self.client.get(url)
+
+        get_viewer_state.assert_not_called()
+        self.assertIsNone(response.json()['results'][2][0]['viewer'])
+
+    def test_viewer_state_queries(self):
+        """ The viewer state of any number of articles takes two queries. """
+        articles = list(Article.objects.all())
+
+        with self.assertNumQueries(2):
+            state = get_viewer_state(self.user, articles)
+
+        self.assertEqual(len(state), Article.objects.count())
+        self.assertTrue(state[Article.objects.filter(user=self.user).first().pk]['is_owner'])
+
+    def test_anonymous_viewer_state(self):
+        """ Anonymous users don't get a viewer state. """
+        url = reverse('article-feed')
+
+        response = self.client.get(url, {'include': 'viewer'})
+
+        self.assertIsNone(response.json()['results'][0][0]['viewer'])
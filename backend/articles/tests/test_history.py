@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import history
+from ..admin import ArticleAdmin
+from ..models import Article, ArticleBody, ArticleRevision
+
+
+User = get_user_model()
+
+
+class ArticleHistoryTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('article-list'), {
+            'title': 'article',
+            'content': 'first line\nsecond line'
+        }, format='json')
+
+        self.article = Article.objects.get(slug=response.json()['slug'])
+
+    def edit(self, content):
+        url = reverse('article-detail', kwargs={'slug': self.article.slug})
+        self.client.patch(url, {'content': content}, format='json')
+
+    def test_edits_stored_as_deltas(self):
+        """ The first revision is a snapshot, the following edits are deltas. """
+        self.edit('first line\nchanged line')
+        self.edit('first line\nchanged line\nthird line')
+
+        revisions = self.article.revisions.order_by('number')
+
+        self.assertEqual([r.is_snapshot for r in revisions], [True, False, False])
+        self.assertEqual(
+            history.get_revision_content(self.article, 2),
+            'first line\nchanged line'
+        )
+        self.assertEqual(
+            history.get_revision_content(self.article, 3),
+            'first line\nchanged line\nthird line'
+        )
+
+    def test_body_changed_outside_edits(self):
+        """ Revisions rebuild the published content even if the body was changed directly. """
+        ArticleBody.objects.filter(article=self.article).update(content='first line\nchanged')
+
+        self.edit('new first line\nchanged')
+
+        self.assertEqual(history.get_revision_content(self.article, 2), 'new first line\nchanged')
+
+    def test_periodic_snapshots(self):
+        """ No revision is more than SNAPSHOT_EVERY - 1 deltas away from a snapshot. """
+        for i in range(history.SNAPSHOT_EVERY):
+            self.edit(f'line {i}')
+
+        snapshots = self.article.revisions.filter(is_snapshot=True)
+
+        self.assertEqual(list(snapshots.values_list('number', flat=True)),
+                         [1, history.SNAPSHOT_EVERY + 1])
+        self.assertEqual(
+            history.get_revision_content(self.article, history.SNAPSHOT_EVERY + 1),
+            f'line {history.SNAPSHOT_EVERY - 1}'
+        )
+
+    def test_revision_diff(self):
+        """ Returns a unified diff between two revisions. """
+        self.edit('first line\nchanged line')
+
+        url = reverse('article-revision', kwargs={'slug': self.article.slug, 'number': 2})
+        response = self.client.get(url, {'diff': 1}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('-second line\n+changed line', response.json()['diff'])
+
+    def test_revision_not_found(self):
+        """ Responds with 404 because the revision does not exist. """
+        url = reverse('article-revision', kwargs={'slug': self.article.slug, 'number': 5})
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_compact_revisions(self):
+        """ Keeps the first & the newest old revision, which still rebuild the newer ones. """
+        for i in range(4):
+            self.edit(f'first line\nline {i}')
+
+        old = timezone.now() - timedelta(days=100)
+        self.article.revisions.filter(number__lte=4).update(created_at=old)
+
+        deleted = history.compact_revisions(timedelta(days=90))
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            list(self.article.revisions.order_by('number').values_list('number', 'is_snapshot')),
+            [(1, True), (4, True), (5, False)]
+        )
+        self.assertEqual(history.get_revision_content(self.article, 5), 'first line\nline 3')
+        self.assertEqual(ArticleRevision.objects.count(), 3)
+
+    def test_admin_edit(self):
+        """ Editing the content in the admin updates the stats & records a revision. """
+        model_admin = ArticleAdmin(Article, site)
+        request = RequestFactory().post('/')
+        request.user = self.user
+
+        article = Article.objects.select_related('body').get(pk=self.article.pk)
+        form_class = model_admin.get_form(request, article)
+        data = {
+            'title': article.title,
+            'content': 'an admin edit',
+            'user': self.user.pk,
+            'revision': article.revision,
+            'views_count': article.views_count,
+        }
+        form = form_class(data, instance=article)
+
+        self.assertTrue(form.is_valid(), form.errors)
+        model_admin.save_model(request, form.save(commit=False), form, True)
+
+        article.refresh_from_db()
+        self.assertEqual(article.content, 'an admin edit')
+        self.assertEqual(article.excerpt, 'an admin edit')
+        self.assertEqual(article.word_count, 3)
+        self.assertEqual(history.get_revision_content(article, 2), 'an admin edit')
@@ -0,0 +1,78 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..importer import import_articles
+from ..models import Tag, Article
+
+
+User = get_user_model()
+
+
+def ndjson(*rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+
+class ArticleImportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.python = Tag.objects.create(name='python')
+        self.existing = Article.objects.create(title='Hello', content='a', user=self.user)
+
+        self.url = reverse('article-import')
+
+    def test_import(self):
+        """ Creates the valid lines and reports the invalid ones by line number. """
+        body = ndjson(
+            {'title': 'Hello', 'content': 'First body', 'tags': ['python', 'python']},
+            {'title': 'Hello', 'content': 'Second body', 'draft': True},
+            '{not json',
+            {'title': 'Tagged', 'content': 'a', 'tags': ['missing']},
+            {'title': 'x' * 51, 'content': 'a'},
+            '',
+            {'title': 'Last', 'content': 'Third body'},
+        )
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['created'], 3)
+        self.assertEqual(response.json()['failed'], 3)
+        self.assertEqual([error['line'] for error in response.json()['errors']], [3, 4, 5])
+
+        first = Article.objects.get(slug='hello-2')
+        self.assertEqual(first.content, 'First body')
+        self.assertEqual(list(first.tags.values_list('slug', flat=True)), ['python'])
+        self.assertEqual(first.revisions.count(), 1)
+
+        self.assertTrue(Article.drafts.filter(slug='hello-3').exists())
+        self.assertEqual(Article.objects.get(slug='last').word_count, 2)
+
+    def test_import_batches(self):
+        """ Slugs stay unique across batches. """
+        lines = [json.dumps({'title': 'Same', 'content': 'a'}) for _ in range(5)]
+
+        summary = import_articles(lines, self.user, batch_size=2)
+
+        self.assertEqual(summary['created'], 5)
+        self.assertEqual(
+            sorted(Article.objects.filter(title='Same').values_list('slug', flat=True)),
+            ['same', 'same-2', 'same-3', 'same-4', 'same-5']
+        )
+
+    def test_import_unauthenticated(self):
+        """ Responds with 401 Unauthorized because the user isn't logged in."""
+        response = self.client.post(self.url, ndjson({'title': 'a', 'content': 'a'}),
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
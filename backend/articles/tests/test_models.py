@@ -1,10 +1,13 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.exceptions import ValidationError
 
 import faker
 
-from ..models import Tag, Article, ArticleLike, Comment, CommentVote
+from ..models import Tag, Article, ArticleBody, ArticleLike, Comment, CommentVote
 
 
 fake = faker.Faker('en')
@@ -107,6 +110,57 @@ class ArticleModelTest(TestCase):
 
         self.assertEqual(Article.drafts.count(), 1)
 
+    def test_content_stats(self):
+        """ The excerpt, word count & reading time are computed on save. """
+        self.article.content = ' '.join(['word'] * 450)
+        self.article.save()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.excerpt, ' '.join(['word'] * 40) + '…')
+        self.assertEqual(self.article.word_count, 450)
+        self.assertEqual(self.article.reading_time, 3)
+
+    def test_body_stored_separately(self):
+        """ The content is kept in ArticleBody and only written when it changes. """
+        self.assertEqual(ArticleBody.objects.get(article=self.article).content, 'test 123')
+
+        article = Article.objects.get(pk=self.article.pk)
+        article.draft = True
+
+        # Only the update, the body is neither loaded nor rewritten.
+        with self.assertNumQueries(1):
+            article.save()
+
+        article.content = 'new content'
+        article.save()
+
+        self.assertEqual(ArticleBody.objects.get(article=self.article).content, 'new content')
+        self.assertEqual(Article._all_articles.get(pk=self.article.pk).word_count, 2)
+
+    def test_slug_kept_until_title_changes(self):
+        """ The slug is only regenerated when the title changes, the old one redirects. """
+        old_slug = self.article.slug
+
+        self.article.content = 'edited'
+        self.article.save()
+        self.assertEqual(self.article.slug, old_slug)
+
+        self.article.title = 'Renamed'
+        self.article.save()
+
+        self.assertEqual(self.article.slug, 'renamed')
+        self.assertEqual(self.article.slug_redirects.get().old_slug, old_slug)
+
+    def test_backfill_article_stats(self):
+        """ The backfill command computes the stats of existing articles. """
+        Article.objects.filter(pk=self.article.pk).update(excerpt='', word_count=0)
+
+        call_command('backfill_article_stats', stdout=StringIO())
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.excerpt, 'test 123')
+        self.assertEqual(self.article.word_count, 2)
+
 
 class CommentModelTest(TestCase):
     def setUp(self):
@@ -128,6 +182,18 @@ class CommentModelTest(TestCase):
             article=self.article
         )
 
+        self.user_2 = User.objects.create_user(
+            username='voter',
+            email='voter@gmail.com',
+            password=fake.password()
+        )
+
+        self.user_3 = User.objects.create_user(
+            username='voter_2',
+            email='voter_2@gmail.com',
+            password=fake.password()
+        )
+
         self.upvote = CommentVote.objects.create(
             user=self.user,
             comment=self.comment
@@ -135,11 +201,11 @@ class CommentModelTest(TestCase):
 
         self.downvote = CommentVote.objects.create(
             downvote=True,
-            user=self.user,
+            user=self.user_2,
             comment=self.comment
         )
 
-        CommentVote.objects.create(downvote=True, user=self.user, comment=self.comment)
+        CommentVote.objects.create(downvote=True, user=self.user_3, comment=self.comment)
 
     def test_create_comment(self):
         """ Creates a comment. """
@@ -160,3 +226,43 @@ class CommentModelTest(TestCase):
     def test_score_amount(self):
         """ Returns the total score of a comment (upvotes - downvotes). """
         self.assertEqual(self.comment.score, -1)
+
+    def test_vote_tally(self):
+        """ The vote tallies & rank are stored on the comment. """
+        self.comment.refresh_from_db()
+
+        self.assertEqual(self.comment.upvotes_count, 1)
+        self.assertEqual(self.comment.downvotes_count, 2)
+        self.assertGreater(self.comment.rank, 0)
+
+    def test_sort_comments(self):
+        """ Sorts by the Wilson score, not by upvotes - downvotes. """
+        many_votes = Comment.objects.create(body='a', user=self.user, article=self.article)
+        few_votes = Comment.objects.create(body='b', user=self.user, article=self.article)
+
+        voters = [
+            User.objects.create_user(username=f'many_{i}', email=f'many_{i}@gmail.com')
+            for i in range(14)
+        ]
+
+        for i, voter in enumerate(voters):
+            CommentVote.objects.create(downvote=i >= 10, user=voter, comment=many_votes)
+        CommentVote.objects.create(user=self.user, comment=few_votes)
+
+        comments = Comment.objects.filter(pk__in=[many_votes.pk, few_votes.pk])
+
+        self.assertEqual(list(comments.sorted('best')), [many_votes, few_votes])
+        self.assertEqual(list(comments.sorted('new')), [few_votes, many_votes])
+        self.assertEqual(list(comments.sorted('top')), [many_votes, few_votes])
+
+    def test_set_vote(self):
+        """ Flips a vote in place and removes it, updating the tallies. """
+        self.comment.set_vote(self.user, True)
+
+        self.assertEqual(self.comment.comment_votes.filter(user=self.user).count(), 1)
+        self.assertEqual(self.comment.score, -3)
+
+        self.comment.set_vote(self.user, None)
+
+        self.assertFalse(self.comment.comment_votes.filter(user=self.user).exists())
+        self.assertEqual(self.comment.score, -2)
@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import readers
+from ..hyperloglog import HyperLogLog
+from ..models import Article, ArticleReaderSketch
+
+
+User = get_user_model()
+
+
+class HyperLogLogTest(APITestCase):
+    def test_count(self):
+        """ Estimates the distinct keys within a few percent, duplicates don't count. """
+        hll = HyperLogLog()
+
+        for i in range(20000):
+            hll.add(f'reader-{i % 10000}')
+
+        self.assertAlmostEqual(hll.count(), 10000, delta=500)
+
+    def test_small_count(self):
+        hll = HyperLogLog()
+
+        for i in range(10):
+            hll.add(i)
+
+        self.assertEqual(hll.count(), 10)
+
+    def test_merge(self):
+        """ A merged sketch estimates the union. """
+        first, second = HyperLogLog(), HyperLogLog()
+
+        for i in range(3000):
+            first.add(i)
+        for i in range(2000, 5000):
+            second.add(i)
+
+        self.assertAlmostEqual(first.merge(second).count(), 5000, delta=250)
+
+    def test_bytes(self):
+        hll = HyperLogLog()
+        hll.add('reader')
+
+        data = hll.to_bytes()
+
+        self.assertTrue(len(data) < 100)
+        self.assertEqual(HyperLogLog.from_bytes(data).registers, hll.registers)
+
+
+class ReadersTest(APITestCase):
+    def setUp(self):
+        readers.buffer.flush()
+
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.user_2 = User.objects.create_user(
+            username='User2',
+            email='user2@gmail.com',
+            password='12345'
+        )
+
+        self.article = Article.objects.create(title='read', content='content', user=self.user)
+        self.url = reverse('article-readers', kwargs={'slug': self.article.slug})
+
+    def tearDown(self):
+        readers.buffer.flush()
+
+    def test_record_readers(self):
+        """ Readers of the detail page are merged into the day's sketch on flush. """
+        detail = reverse('article-detail', kwargs={'slug': self.article.slug})
+
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.1'):
+            self.client.get(detail, REMOTE_ADDR=address)
+
+        self.assertFalse(ArticleReaderSketch.objects.exists())
+        self.assertEqual(readers.buffer.flush(), 1)
+
+        sketch = ArticleReaderSketch.objects.get(article=self.article)
+        self.assertEqual(sketch.day, timezone.now().date())
+        self.assertEqual(HyperLogLog.from_bytes(sketch.sketch).count(), 2)
+
+        # Flushing the same readers again changes nothing.
+        readers.buffer.add(self.article.pk, 'ip:10.0.0.1')
+        self.assertEqual(readers.buffer.flush(), 0)
+
+    def test_failed_flush(self):
+        """ A flush that can't write keeps the readers for the next one. """
+        readers.buffer.add(self.article.pk, 'ip:10.0.0.1')
+
+        with mock.patch.object(ArticleReaderSketch.objects, 'bulk_create',
+                               side_effect=DatabaseError):
+            self.assertEqual(readers.buffer.flush(), 0)
+
+        self.assertEqual(readers.buffer.flush(), 1)
+        self.assertTrue(ArticleReaderSketch.objects.filter(article=self.article).exists())
+
+    def test_readers_range(self):
+        """ Merges the daily sketches of the range, readers of several days count once. """
+        today = timezone.now().date()
+
+        for days_ago, keys in ((0, range(0, 100)), (1, range(50, 150)), (10, range(1000, 1100))):
+            for key in keys:
+                readers.buffer.add(self.article.pk, key, today - timedelta(days=days_ago))
+        readers.buffer.flush()
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertAlmostEqual(response.json()['readers'], 150, delta=5)
+        self.assertEqual(len(response.json()['days']), 2)
+
+        response = self.client.get(self.url, {'start': str(today - timedelta(days=30)),
+                                              'end': str(today)})
+        self.assertAlmostEqual(response.json()['readers'], 250, delta=8)
+
+    def test_readers_invalid_range(self):
+        """ Responds with 400 because the dates are invalid or reversed. """
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url, {'start': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {'start': str(date(2021, 2, 1)),
+                                              'end': str(date(2021, 1, 1))})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_readers_not_owner(self):
+        """ Responds with 404 because only the author sees the readers. """
+        self.client.force_authenticate(self.user_2)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
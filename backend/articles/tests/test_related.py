@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import related
+from ..models import Tag, Article, RelatedArticle
+from ..related import rebuild_related_articles
+
+
+User = get_user_model()
+
+
+class RelatedArticlesTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.python = Tag.objects.create(name='python')
+        self.django = Tag.objects.create(name='django')
+        self.vue = Tag.objects.create(name='vue')
+
+        self.article = Article.objects.create(title='article', content='a', user=self.user)
+        self.close = Article.objects.create(title='close', content='a', user=self.user)
+        self.far = Article.objects.create(title='far', content='a', user=self.user)
+        self.unrelated = Article.objects.create(title='unrelated', content='a', user=self.user)
+
+        self.close.tags.add(self.python, self.django)
+        self.far.tags.add(self.python, self.vue)
+        self.unrelated.tags.add(self.vue)
+
+        self.article.tags.add(self.python, self.django)
+
+    def test_related_ranked_by_shared_tags(self):
+        """ The article sharing the most tags comes first. """
+        related = RelatedArticle.objects.filter(article=self.article).order_by('-score')
+
+        self.assertEqual([r.related for r in related], [self.close, self.far])
+
+    def test_related_updated_incrementally(self):
+        """ The matches' lists are updated when the article's tags change. """
+        self.assertTrue(
+            RelatedArticle.objects.filter(article=self.close, related=self.article).exists()
+        )
+
+        self.article.tags.set([self.vue])
+
+        self.assertFalse(
+            RelatedArticle.objects.filter(article=self.close, related=self.article).exists()
+        )
+        self.assertTrue(
+            RelatedArticle.objects.filter(article=self.article, related=self.unrelated).exists()
+        )
+
+    def related_ids(self, article):
+        return set(RelatedArticle.objects.filter(article=article).values_list('related', flat=True))
+
+    def test_list_refilled(self):
+        """ A list the article drops out of is refilled from its other candidates. """
+        with mock.patch.object(related, 'TOP_N', 1):
+            rebuild_related_articles()
+            self.assertEqual(self.related_ids(self.close), {self.article.pk})
+
+            self.article.tags.set([self.vue])
+
+        self.assertEqual(self.related_ids(self.close), {self.far.pk})
+
+    def test_unchanged_entries_not_written(self):
+        """ Entries whose score didn't change aren't rewritten. """
+        entries = dict(RelatedArticle.objects.values_list('pk', 'score'))
+
+        related.refresh_related_articles(self.article)
+
+        self.assertEqual(dict(RelatedArticle.objects.values_list('pk', 'score')), entries)
+
+    def test_publish_and_unpublish(self):
+        """ Publishing a draft adds it to the related lists, unpublishing removes it. """
+        draft = Article.objects.create(title='draft', content='a', user=self.user, draft=True)
+        draft.tags.add(self.python, self.django)
+        url = reverse('article-detail', kwargs={'slug': draft.slug})
+
+        self.assertNotIn(draft.pk, self.related_ids(self.close))
+
+        self.client.force_authenticate(self.user)
+        self.client.patch(url, {'draft': False}, format='json')
+
+        self.assertIn(draft.pk, self.related_ids(self.close))
+        self.assertTrue(self.related_ids(draft))
+
+        self.client.patch(url, {'draft': True}, format='json')
+
+        self.assertNotIn(draft.pk, self.related_ids(self.close))
+        self.assertFalse(self.related_ids(draft))
+
+    def test_tag_cleared(self):
+        """ Clearing the articles of a tag refreshes the lists of those articles. """
+        self.assertEqual(self.related_ids(self.unrelated), {self.far.pk})
+
+        self.vue.articles.clear()
+
+        self.assertEqual(self.related_ids(self.unrelated), set())
+
+    def test_rebuild_related_articles(self):
+        """ The rebuild gives the same result as the incremental updates. """
+        before = set(RelatedArticle.objects.filter(article=self.article)
+                                           .values_list('related', flat=True))
+
+        RelatedArticle.objects.all().delete()
+        rebuild_related_articles()
+
+        after = set(RelatedArticle.objects.filter(article=self.article)
+                                          .values_list('related', flat=True))
+
+        self.assertEqual(before, after)
+
+    def test_list_related_articles(self):
+        """ Lists the related articles of an article. """
+        url = reverse('article-related', kwargs={'slug': self.article.slug})
+
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [article['slug'] for article in response.json()],
+            [self.close.slug, self.far.slug]
+        )
@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import SavedArticle
+
+from ..models import Article, ArticleLike, Comment, ArticleDailyStats, AuthorDailyStats
+from ..stats import reconcile_day
+
+
+User = get_user_model()
+
+
+class DailyStatsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.user_2 = User.objects.create_user(
+            username='User2',
+            email='user2@gmail.com',
+            password='12345'
+        )
+
+        self.article = Article.objects.create(title='first', content='content', user=self.user)
+        self.article_2 = Article.objects.create(title='second', content='content', user=self.user)
+
+        self.today = timezone.localdate()
+
+    def stats(self, article=None):
+        if article:
+            return ArticleDailyStats.objects.get(article=article, day=self.today)
+
+        return AuthorDailyStats.objects.get(user=self.user, day=self.today)
+
+    def test_events_counted(self):
+        """ Likes, comments & saves are added to the article's & author's stats of the day. """
+        ArticleLike.objects.create(user=self.user_2, article=self.article)
+        ArticleLike.objects.create(user=self.user_2, article=self.article, special_like=True)
+        Comment.objects.create(body='comment', article=self.article_2, user=self.user_2)
+        self.user_2.save_article(self.article)
+
+        stats = self.stats(self.article)
+        self.assertEqual((stats.likes, stats.special_likes, stats.saves), (1, 1, 1))
+        self.assertEqual(self.stats(self.article_2).comments, 1)
+
+        stats = self.stats()
+        self.assertEqual((stats.likes, stats.special_likes, stats.comments, stats.saves),
+                         (1, 1, 1, 1))
+
+    def test_events_undone(self):
+        """ Unliking & unsaving takes the event off the day it happened. """
+        ArticleLike.objects.create(user=self.user_2, article=self.article)
+        self.user_2.save_article(self.article)
+
+        ArticleLike.objects.filter(user=self.user_2).delete()
+        self.user_2.unsave_article(self.article)
+
+        stats = self.stats(self.article)
+        self.assertEqual((stats.likes, stats.saves), (0, 0))
+        self.assertEqual((self.stats().likes, self.stats().saves), (0, 0))
+
+    def test_reconcile(self):
+        """ Rebuilds the day's rows from the event tables. """
+        ArticleLike.objects.create(user=self.user_2, article=self.article)
+        Comment.objects.create(body='comment', article=self.article_2, user=self.user_2)
+
+        ArticleDailyStats.objects.update(likes=10, comments=10)
+        AuthorDailyStats.objects.update(likes=10, comments=10)
+
+        self.assertEqual(reconcile_day(self.today), 2)
+
+        self.assertEqual(self.stats(self.article).likes, 1)
+        self.assertEqual(self.stats(self.article_2).comments, 1)
+        self.assertEqual((self.stats().likes, self.stats().comments), (1, 1))
+
+    def test_events_without_time(self):
+        """ Likes & saves made before their time was recorded are left out of the stats. """
+        ArticleLike.objects.create(user=self.user_2, article=self.article)
+        self.user_2.save_article(self.article)
+
+        ArticleLike.objects.update(created_at=None)
+        SavedArticle.objects.update(saved_at=None)
+
+        self.assertEqual(reconcile_day(self.today), 0)
+        self.assertFalse(ArticleDailyStats.objects.exists())
+
+        # Undoing them doesn't take anything off today's stats.
+        ArticleLike.objects.create(user=self.user, article=self.article)
+        ArticleLike.objects.filter(user=self.user_2).delete()
+
+        self.assertEqual(self.stats(self.article).likes, 1)
+        self.assertEqual(self.stats().likes, 1)
+
+    def test_author_stats(self):
+        """ Returns a series with a row for every day of the range, in one query. """
+        ArticleLike.objects.create(user=self.user_2, article=self.article)
+        AuthorDailyStats.objects.create(user=self.user, day=self.today - timedelta(days=3),
+                                        comments=2)
+
+        self.client.force_authenticate(self.user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('author-stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        days = response.json()['days']
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[-1]['likes'], 1)
+        self.assertEqual(days[-4]['comments'], 2)
+        self.assertEqual(days[0]['likes'], 0)
+        self.assertEqual(response.json()['totals'], {
+            'likes': 1, 'special_likes': 0, 'comments': 2, 'saves': 0
+        })
+
+    def test_article_stats(self):
+        Comment.objects.create(body='comment', article=self.article, user=self.user_2)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('article-stats', kwargs={'slug': self.article.slug}),
+                                   {'start': str(self.today), 'end': str(self.today)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['days'][0]['comments'], 1)
+
+    def test_article_stats_not_owner(self):
+        """ Responds with 404 because only the author sees the stats. """
+        self.client.force_authenticate(self.user_2)
+        response = self.client.get(reverse('article-stats', kwargs={'slug': self.article.slug}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stats_invalid_range(self):
+        """ Responds with 400 because the range is reversed. """
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('author-stats'),
+                                   {'start': '2021-02-01', 'end': '2021-01-01'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
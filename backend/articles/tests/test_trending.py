@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Article, ArticleLike, Comment, TrendingScore
+from .. import trending
+
+
+User = get_user_model()
+
+
+class TrendingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.user_2 = User.objects.create_user(
+            username='User2',
+            email='user2@gmail.com',
+            password='12345'
+        )
+
+        self.liked = Article.objects.create(title='liked', content='a', user=self.user)
+        self.special_liked = Article.objects.create(title='special', content='a', user=self.user)
+        self.quiet = Article.objects.create(title='quiet', content='a', user=self.user)
+
+        ArticleLike.objects.create(user=self.user_2, article=self.liked)
+        ArticleLike.objects.create(user=self.user_2, article=self.special_liked, special_like=True)
+
+    def score(self, article):
+        return TrendingScore.objects.get(article=article).score
+
+    def test_events_update_scores(self):
+        """ Special likes weigh more than likes, comments & saves add to the score. """
+        self.assertGreater(self.score(self.special_liked), self.score(self.liked))
+        self.assertFalse(TrendingScore.objects.filter(article=self.quiet).exists())
+
+        before = self.score(self.liked)
+        Comment.objects.create(body='nice', user=self.user_2, article=self.liked)
+        self.user_2.saved_articles.add(self.liked)
+
+        self.assertGreater(self.score(self.liked), before)
+
+    def test_rebase_scales_scores(self):
+        """ Rebasing scales the scores down but keeps their order. """
+        before = self.score(self.liked)
+
+        trending.rebase_scores(trending.get_epoch().started_at + timedelta(hours=12))
+
+        self.assertAlmostEqual(self.score(self.liked), before / 2)
+        self.assertGreater(self.score(self.special_liked), self.score(self.liked))
+
+    def test_events_after_rebase(self):
+        """ Events recorded after a rebase use the new epoch. """
+        trending.rebase_scores(timezone.now())
+        before = self.score(self.liked)
+
+        ArticleLike.objects.create(user=self.user, article=self.liked)
+
+        self.assertAlmostEqual(self.score(self.liked), before + trending.LIKE_WEIGHT, places=3)
+
+    def test_list_trending(self):
+        """ Lists the articles by trending score. """
+        url = reverse('article-trending')
+
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [article['slug'] for article in response.json()],
+            [self.special_liked.slug, self.liked.slug]
+        )
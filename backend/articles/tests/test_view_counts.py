@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import view_counts
+from ..models import Article
+
+
+User = get_user_model()
+
+
+class ViewCountsTest(APITestCase):
+    def setUp(self):
+        view_counts.cache.clear()
+        view_counts.buffer.flush()
+
+        self.user = User.objects.create_user(
+            username='User1',
+            email='user1@gmail.com',
+            password='12345'
+        )
+
+        self.article = Article.objects.create(title='viewed', content='content', user=self.user)
+        self.url = reverse('article-detail', kwargs={'slug': self.article.slug})
+
+    def tearDown(self):
+        view_counts.buffer.flush()
+
+    def test_views_buffered(self):
+        """ Views are counted live but only written to the article when the buffer flushes. """
+        self.client.get(self.url)
+        response = self.client.get(self.url, REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['views_count'], 2)
+        self.assertEqual(Article.objects.get(pk=self.article.pk).views_count, 0)
+
+        self.assertEqual(view_counts.buffer.flush(), 2)
+        self.assertEqual(Article.objects.get(pk=self.article.pk).views_count, 2)
+
+        response = self.client.get(self.url, REMOTE_ADDR='10.0.0.3')
+        self.assertEqual(response.json()['views_count'], 3)
+
+    def test_views_deduplicated(self):
+        """ The same viewer counts once per window. """
+        self.client.force_authenticate(self.user)
+
+        for _ in range(3):
+            self.client.get(self.url)
+
+        self.assertEqual(view_counts.buffer.flush(), 1)
+
+    def test_flush_after_interval(self):
+        """ The buffer is flushed by the first view after FLUSH_INTERVAL. """
+        with mock.patch.object(view_counts, 'FLUSH_INTERVAL', 0):
+            self.client.get(self.url)
+
+        self.assertEqual(Article.objects.get(pk=self.article.pk).views_count, 1)
+
+    def test_batched_updates(self):
+        """ Articles with the same number of new views are updated together. """
+        articles = [
+            Article.objects.create(title=f'article {i}', content='content', user=self.user)
+            for i in range(4)
+        ]
+
+        for article in articles:
+            view_counts.buffer.add(article.pk)
+        view_counts.buffer.add(articles[0].pk)
+
+        with self.assertNumQueries(2):
+            view_counts.buffer.flush()
+
+        counts = dict(Article.objects.filter(pk__in=[a.pk for a in articles])
+                      .values_list('pk', 'views_count'))
+        self.assertEqual(sorted(counts.values()), [1, 1, 1, 2])
+
+    def test_pending_deleted_after_flush(self):
+        """ The pending count of an article is removed from the cache once it's written. """
+        view_counts.buffer.add(self.article.pk)
+        view_counts.buffer.flush()
+
+        self.assertIsNone(view_counts.cache.get(view_counts.pending_key(self.article.pk)))
+
+    def test_failed_flush(self):
+        """ A flush that can't write keeps the views for the next one. """
+        self.client.get(self.url)
+
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=DatabaseError):
+            with mock.patch.object(view_counts, 'FLUSH_INTERVAL', 0):
+                response = self.client.get(self.url, REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(view_counts.buffer.flush(), 2)
+        self.assertEqual(Article.objects.get(pk=self.article.pk).views_count, 2)
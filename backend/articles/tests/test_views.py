@@ -2,13 +2,15 @@ import random
 import os
 
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APITestCase
 import faker
 
-from ..models import Tag, Article, ArticleLike, Comment, CommentVote
+from ..models import Tag, Article, ArticleBody, ArticleLike, Comment, CommentVote
 from ..serializers.article_serializers import ArticleSerializer
 
 
@@ -66,6 +68,7 @@ class ArticleTagViewsTest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(self.article.tags.count(), 2)
+        self.assertCountEqual(response.json()['tags'], ['python', 'vue'])
 
     def test_maximum_tags_validation_on_create(self):
         """ Throws an error when trying to add more than 5 tags on creation. """
@@ -81,7 +84,20 @@ class ArticleTagViewsTest(APITestCase):
         response = self.client.post(url, data, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.json(), {'details': 'You can\'t assign more than five tags'})
+        self.assertEqual(response.json(), {'tags': ['You can\'t assign more than five tags']})
+
+    def test_unknown_tag_on_create(self):
+        """ Responds with 400 and creates nothing because a tag doesn't exist. """
+        url = reverse('article-list')
+
+        data = {'title': 'Test_123', 'content': 'Test_content123', 'tags': ['python', 'nope']}
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('nope', response.json()['tags'][0])
+        self.assertEqual(Article.objects.count(), 1)
 
     def test_maximum_tags_validation_on_put(self):
         """ Throws an error when trying to add more than 5 tags on update. """
@@ -95,7 +111,7 @@ class ArticleTagViewsTest(APITestCase):
         response = self.client.patch(url, data, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.json(), {'details': 'You can\'t assign more than five tags'})
+        self.assertEqual(response.json(), {'tags': ['You can\'t assign more than five tags']})
 
     def test_article_removed_from_tag_relationship(self):
         """ Articles gets removed from tag correctly when deleting. """
@@ -109,6 +125,19 @@ class ArticleTagViewsTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Tag.objects.get(pk=self.tags[1].id).articles.count(), 0)
 
+    def test_renamed_article_redirects(self):
+        """ The old slug of a renamed article answers with a 301 to the new one. """
+        old_url = reverse('article-detail', kwargs={'slug': self.article.slug})
+
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(old_url, {'title': 'Renamed article'}, format='json')
+        new_url = reverse('article-detail', kwargs={'slug': response.json()['slug']})
+
+        response = self.client.get(old_url)
+
+        self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertEqual(response['Location'], new_url)
+
 
 class ArticleViewsTest(APITestCase):
     def setUp(self):
@@ -229,6 +258,25 @@ class ArticleViewsTest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_list_articles_excerpt(self):
+        """ Lists carry the excerpt of the content, the detail the full content. """
+        article = Article.objects.create(title='long', content='word ' * 100, user=self.user)
+
+        response = self.client.get(reverse('article-list'), format='json')
+        listed = {a['slug']: a for a in response.json()}
+
+        self.assertEqual(listed[article.slug]['content'], article.excerpt)
+
+        url = reverse('article-detail', kwargs={'slug': article.slug})
+        self.assertEqual(self.client.get(url, format='json').json()['content'], article.content)
+
+    def test_list_articles_without_bodies(self):
+        """ Listing articles doesn't read the article bodies. """
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('article-list'), format='json')
+
+        self.assertFalse(any(ArticleBody._meta.db_table in q['sql'] for q in queries))
+
     def test_article_saved_count(self):
         """ Displays the total amount of saves the article has. """
         url = reverse('article-detail', kwargs={'slug': self.article.slug})
@@ -521,7 +569,10 @@ class ArticleLikeViewsTest(APITestCase):
         response = self.client.post(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.json(), {'details': 'Liked article.'})
+        self.assertEqual(
+            response.json(),
+            {'details': 'Liked article.', 'likes_count': 1, 'special_likes_count': 0}
+        )
 
         self.assertEqual(ArticleLike.objects.filter(special_like=False).count(), 1)
         self.assertEqual(ArticleLike.objects.get().user, self.user)
@@ -545,7 +596,10 @@ class ArticleLikeViewsTest(APITestCase):
         response = self.client.post(url, data, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.json(), {'details': 'Superliked article.'})
+        self.assertEqual(
+            response.json(),
+            {'details': 'Superliked article.', 'likes_count': 0, 'special_likes_count': 1}
+        )
 
         self.assertEqual(ArticleLike.objects.filter(special_like=True).count(), 1)
         self.assertEqual(ArticleLike.objects.get().user, self.user)
@@ -586,8 +640,8 @@ class ArticleLikeViewsTest(APITestCase):
 
         self.assertEqual(ArticleLike.objects.filter(special_like=True).count(), 0)
 
-    def test_cannot_like_twice(self):
-        """ Can't like an article twice. """
+    def test_like_twice(self):
+        """ Liking an article twice doesn't create a second like. """
         url = reverse('article-like', kwargs={'slug': self.article.slug})
 
         self.client.force_authenticate(self.user)
@@ -596,14 +650,17 @@ class ArticleLikeViewsTest(APITestCase):
         self.client.force_authenticate(self.user)
         response = self.client.post(url, format='json')
 
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.json(), {'details': 'Can\'t like twice.'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {'details': 'Already liked.', 'likes_count': 1, 'special_likes_count': 0}
+        )
 
         self.assertEqual(ArticleLike.objects.filter(special_like=False).count(), 1)
         self.assertEqual(ArticleLike.objects.get().user, self.user)
 
-    def test_cannot_special_like_twice(self):
-        """ Can't special like an article twice. """
+    def test_special_like_twice(self):
+        """ Special liking an article twice doesn't create a second special like. """
         url = reverse('article-like', kwargs={'slug': self.article.slug})
 
         data = {'special_like': True}
@@ -614,8 +671,11 @@ class ArticleLikeViewsTest(APITestCase):
         self.client.force_authenticate(self.user)
         response = self.client.post(url, data, format='json')
 
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.json(), {'details': 'Can\'t special like twice.'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {'details': 'Already superliked.', 'likes_count': 0, 'special_likes_count': 1}
+        )
 
         self.assertEqual(ArticleLike.objects.filter(special_like=True).count(), 1)
         self.assertEqual(ArticleLike.objects.get().user, self.user)
@@ -628,7 +688,8 @@ class ArticleLikeViewsTest(APITestCase):
         self.client.force_authenticate(self.user)
         response = self.client.delete(url, format='json')
 
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'likes_count': 0, 'special_likes_count': 0})
         self.assertEqual(ArticleLike.objects.filter(special_like=False).count(), 0)
 
     def test_cannot_unlike_unauthenticated(self):
@@ -650,9 +711,30 @@ class ArticleLikeViewsTest(APITestCase):
         self.client.force_authenticate(self.user)
         response = self.client.delete(url, data, format='json')
 
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(ArticleLike.objects.filter(special_like=True).count(), 0)
 
+    def test_unlike_without_liking(self):
+        """ Unliking an article that isn't liked is a no-op. """
+        url = reverse('article-unlike', kwargs={'slug': self.article.slug})
+
+        self.client.force_authenticate(self.user)
+        response = self.client.delete(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'likes_count': 0, 'special_likes_count': 0})
+
+    def test_like_is_per_article(self):
+        """ Liking another article doesn't count as already liked. """
+        url = reverse('article-like', kwargs={'slug': self.article.slug})
+        self.like_2.save()
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ArticleLike.objects.filter(article=self.article).count(), 1)
+
 
 class CommentViewsTest(APITestCase):
     def setUp(self):
@@ -831,6 +913,8 @@ class CommentVoteViewsTest(APITestCase):
 
         self.assertEqual(CommentVote.objects.filter(downvote=False).count(), 1)
         self.assertEqual(self.comment.comment_votes.count(), 1)
+
+        self.comment.refresh_from_db()
         self.assertEqual(self.comment.score, 1)
 
     def test_downvote_comment(self):
@@ -846,6 +930,8 @@ class CommentVoteViewsTest(APITestCase):
 
         self.assertEqual(CommentVote.objects.filter(downvote=True).count(), 1)
         self.assertEqual(self.comment.comment_votes.count(), 1)
+
+        self.comment.refresh_from_db()
         self.assertEqual(self.comment.score, -1)
 
     def test_delete_comment_vote(self):
@@ -860,16 +946,63 @@ class CommentVoteViewsTest(APITestCase):
 
         self.assertEqual(CommentVote.objects.filter(downvote=True).count(), 0)
         self.assertEqual(self.comment.comment_votes.count(), 0)
+
+        self.comment.refresh_from_db()
         self.assertEqual(self.comment.score, 0)
 
+    def test_switch_vote(self):
+        """ Switches an upvote to a downvote with a single request. """
+        url = reverse('comment-vote', kwargs={'pk': self.comment.id})
+        self.comment_vote.save()
+
+        self.client.force_authenticate(self.user)
+        response = self.client.put(url, {'vote': 'down'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['score'], -1)
+
+        self.assertEqual(CommentVote.objects.count(), 1)
+        self.assertTrue(CommentVote.objects.get().downvote)
+
+    def test_remove_vote(self):
+        """ Removes the vote with vote none. """
+        url = reverse('comment-vote', kwargs={'pk': self.comment.id})
+        self.comment_vote.save()
+
+        self.client.force_authenticate(self.user)
+        response = self.client.put(url, {'vote': 'none'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['score'], 0)
+        self.assertEqual(CommentVote.objects.count(), 0)
+
+    def test_invalid_vote(self):
+        """ The vote must be up, down or none. """
+        url = reverse('comment-vote', kwargs={'pk': self.comment.id})
+
+        self.client.force_authenticate(self.user)
+        response = self.client.put(url, {'vote': 'sideways'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.put(url, {'vote': ['up']}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_comment_score(self):
         """ Get a comments total score (upvotes - downvotes). """
         url = reverse('comment-detail', kwargs={'pk': self.comment.id})
 
-        for _ in range(5):
+        for i in range(5):
+            voter = User.objects.create_user(
+                username=f'voter_{i}',
+                email=f'voter_{i}@gmail.com',
+                password=fake.password()
+            )
+
             CommentVote.objects.create(
                 downvote=bool(random.getrandbits(1)),
-                user=self.user,
+                user=voter,
                 comment=self.comment
             )
 
@@ -0,0 +1,148 @@
+"""
+Incrementally maintained, time decayed trending scores.
+
+Every engagement event adds ``weight * e^((t - epoch) / DECAY_SECONDS)`` to the
+article's score. Scaling new events up instead of decaying the old ones means
+scores never have to be touched as time passes, and sorting by the stored score
+is the same as sorting by the decayed score.
+
+The added amounts grow exponentially, so rebase_trending_scores periodically
+moves the epoch forward and scales every score down by the same factor.
+Every score row remembers which epoch generation it belongs to and increments
+only apply to rows of the generation they were computed for, an increment that
+races a rebase is retried instead of being added with the wrong scale.
+"""
+import math
+
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Article, TrendingEpoch, TrendingScore
+
+
+LIKE_WEIGHT = 1
+SPECIAL_LIKE_WEIGHT = 3
+COMMENT_WEIGHT = 2
+SAVE_WEIGHT = 1.5
+
+# An event counts half as much after HALF_LIFE seconds.
+HALF_LIFE = 12 * 60 * 60
+DECAY_SECONDS = HALF_LIFE / math.log(2)
+
+# Scores that have decayed below this are dropped when rebasing.
+MIN_SCORE = 0.01
+
+TOP_N = 30
+CACHE_KEY = 'trending-articles'
+CACHE_TIMEOUT = 60
+
+
+_epoch = None
+
+
+def get_epoch(refresh=False):
+    """ Returns the current epoch, cached in-process until an increment misses. """
+    global _epoch
+
+    if _epoch is None or refresh:
+        _epoch, _ = TrendingEpoch.objects.get_or_create(
+            pk=1,
+            defaults={'started_at': timezone.now()}
+        )
+
+    return _epoch
+
+
+def scaled_weight(weight, epoch, now):
+    return weight * math.exp((now - epoch.started_at).total_seconds() / DECAY_SECONDS)
+
+
+def record_event(article_id, weight):
+    """ Adds an engagement event of the given weight to the article's score. """
+    global _epoch
+
+    now = timezone.now()
+    epoch = get_epoch()
+
+    for _ in range(3):
+        updated = TrendingScore.objects.filter(
+            article_id=article_id,
+            generation=epoch.generation
+        ).update(score=F('score') + scaled_weight(weight, epoch, now))
+
+        if updated:
+            return
+
+        try:
+            # First event of the article, the epoch row is locked so
+            # that a rebase can't happen between reading it and the insert.
+            with transaction.atomic():
+                epoch, _ = TrendingEpoch.objects.select_for_update().get_or_create(
+                    pk=1,
+                    defaults={'started_at': now}
+                )
+                TrendingScore.objects.create(
+                    article_id=article_id,
+                    score=scaled_weight(weight, epoch, now),
+                    generation=epoch.generation
+                )
+
+            _epoch = epoch
+            return
+
+        except IntegrityError:
+            # The row exists but belongs to another generation, the scores have been rebased.
+            epoch = get_epoch(refresh=True)
+
+
+def rebase_scores(now=None):
+    """
+    Moves the epoch to now and scales all scores down accordingly.
+    Returns the new epoch.
+    """
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        epoch, _ = TrendingEpoch.objects.select_for_update().get_or_create(
+            pk=1,
+            defaults={'started_at': now}
+        )
+
+        factor = math.exp(-(now - epoch.started_at).total_seconds() / DECAY_SECONDS)
+
+        TrendingScore.objects.filter(generation=epoch.generation).update(
+            score=F('score') * factor,
+            generation=epoch.generation + 1
+        )
+        TrendingScore.objects.filter(score__lt=MIN_SCORE).delete()
+
+        epoch.generation += 1
+        epoch.started_at = now
+        epoch.save()
+
+    get_epoch(refresh=True)
+    cache.delete(CACHE_KEY)
+
+    return epoch
+
+
+def get_trending_article_ids():
+    """ Returns the ids of the top trending published articles, cached briefly. """
+    article_ids = cache.get(CACHE_KEY)
+
+    if article_ids is None:
+        scores = TrendingScore.objects.filter(article__draft=False).order_by('-score')
+        article_ids = list(scores.values_list('article_id', flat=True)[:TOP_N])
+        cache.set(CACHE_KEY, article_ids, CACHE_TIMEOUT)
+
+    return article_ids
+
+
+def get_trending_articles():
+    article_ids = get_trending_article_ids()
+    articles = Article.objects.filter(pk__in=article_ids).select_related('user')
+    articles = {article.pk: article for article in articles.prefetch_related('tags')}
+
+    return [articles[pk] for pk in article_ids if pk in articles]
@@ -5,7 +5,11 @@ from rest_framework import routers
 from .views import (ArticleViewSet, CommentViewSet, LikeArticleView,
                     UnlikeArticleView, VoteCommentView, DeleteCommentVoteView,
                     SaveArticleView, UnsaveArticleView, ArticleFeedView, FollowTagView,
-                    UnfollowTagView, DraftArticlesView)
+                    UnfollowTagView, DraftArticlesView, RelatedArticlesView,
+                    TrendingArticlesView, AutosaveDraftView, ArticleRevisionsView,
+                    ArticleRevisionView, ImportArticlesView, ArticleReadersView,
+                    AuthorStatsView, ArticleStatsView, ArticleCommentsView,
+                    CommentRepliesView)
 
 
 router = routers.SimpleRouter()
@@ -16,8 +20,11 @@ router.register('comments', CommentViewSet)
 
 urlpatterns = [
     path('articles/drafts/', DraftArticlesView.as_view(), name='article-drafts'),
+    path('articles/import/', ImportArticlesView.as_view(), name='article-import'),
 
     path('feed/', ArticleFeedView.as_view(), name='article-feed'),
+    path('trending/', TrendingArticlesView.as_view(), name='article-trending'),
+    path('stats/', AuthorStatsView.as_view(), name='author-stats'),
 
     path(
         'tags/<str:slug>/follow',
@@ -41,6 +48,17 @@ urlpatterns = [
         name='article-unlike'
     ),
 
+    path(
+        'articles/<str:slug>/comments/',
+        ArticleCommentsView.as_view(),
+        name='article-comments'
+    ),
+    path(
+        'comments/<int:pk>/replies/',
+        CommentRepliesView.as_view(),
+        name='comment-replies'
+    ),
+
     path(
         'comments/<int:pk>/vote/',
         VoteCommentView.as_view(),
@@ -52,6 +70,41 @@ urlpatterns = [
         name='comment-vote-delete'
     ),
 
+    path(
+        'articles/<str:slug>/autosave/',
+        AutosaveDraftView.as_view(),
+        name='article-autosave'
+    ),
+
+    path(
+        'articles/<str:slug>/revisions/',
+        ArticleRevisionsView.as_view(),
+        name='article-revisions'
+    ),
+    path(
+        'articles/<str:slug>/revisions/<int:number>/',
+        ArticleRevisionView.as_view(),
+        name='article-revision'
+    ),
+
+    path(
+        'articles/<str:slug>/readers/',
+        ArticleReadersView.as_view(),
+        name='article-readers'
+    ),
+
+    path(
+        'articles/<str:slug>/stats/',
+        ArticleStatsView.as_view(),
+        name='article-stats'
+    ),
+
+    path(
+        'articles/<str:slug>/related/',
+        RelatedArticlesView.as_view(),
+        name='article-related'
+    ),
+
     path(
         'articles/<str:slug>/save/',
         SaveArticleView.as_view(),
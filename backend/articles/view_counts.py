@@ -0,0 +1,138 @@
+"""
+Buffered article view counting.
+
+Views are counted in an in-process buffer and written with a few batched
+UPDATEs every FLUSH_INTERVAL seconds (or once FLUSH_MAX_ARTICLES articles
+are pending) instead of one UPDATE of the article row per request, which
+would serialize the readers of a popular article on its row lock.
+
+A viewer counts once per article per DEDUPE_WINDOW, remembered in the
+counters cache. Pending increments are mirrored in the cache too, with a
+shared cache the live counts include the views still buffered by other
+processes. Pending keys expire after PENDING_TIMEOUT and are deleted once
+flushed. With the default per-process cache (see CACHES in the settings)
+a viewer can count once per process, and keys culled from a full cache
+are forgotten, so live counts are approximate until the next flush.
+
+A flush that fails puts its views back in the buffer for the next one.
+Buffered views are lost if the process is killed before it flushes.
+"""
+import atexit
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import caches
+from django.db import DatabaseError
+from django.db.models import F
+
+from .models import Article
+
+
+DEDUPE_WINDOW = 30 * 60
+
+FLUSH_INTERVAL = 10
+FLUSH_MAX_ARTICLES = 500
+
+# Bounds the pending keys of processes that died before flushing.
+PENDING_TIMEOUT = DEDUPE_WINDOW
+
+cache = caches['counters']
+
+
+def viewer_key(request):
+    """ Identifies the viewer, the user if logged in or the client's address. """
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def pending_key(article_id):
+    return f'article-views-pending:{article_id}'
+
+
+class ViewBuffer:
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def add(self, article_id):
+        with self.lock:
+            self.counts[article_id] += 1
+
+        # add() is a no-op when the key exists, incr() fails when it doesn't.
+        cache.add(pending_key(article_id), 0, PENDING_TIMEOUT)
+        try:
+            cache.incr(pending_key(article_id))
+        except ValueError:
+            pass
+
+        if (time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+                or len(self.counts) >= FLUSH_MAX_ARTICLES):
+            self.flush()
+
+    def flush(self):
+        """ Writes the buffered views, one UPDATE per distinct increment. """
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.last_flush = time.monotonic()
+
+        by_increment = defaultdict(list)
+        for article_id, count in counts.items():
+            by_increment[count].append(article_id)
+
+        flushed = 0
+
+        for count, article_ids in by_increment.items():
+            try:
+                Article._all_articles.filter(pk__in=article_ids).update(
+                    views_count=F('views_count') + count
+                )
+
+            except DatabaseError:
+                self.restore({article_id: count for article_id in article_ids})
+                continue
+
+            flushed += count * len(article_ids)
+
+            for article_id in article_ids:
+                self.forget_pending(article_id, count)
+
+        return flushed
+
+    def restore(self, counts):
+        """ Puts back the views of a failed flush, they're retried by the next one. """
+        with self.lock:
+            self.counts.update(counts)
+
+    def forget_pending(self, article_id, count):
+        try:
+            if cache.decr(pending_key(article_id), count) <= 0:
+                cache.delete(pending_key(article_id))
+        except ValueError:
+            pass
+
+
+buffer = ViewBuffer()
+
+
+@atexit.register
+def flush_at_exit():
+    try:
+        buffer.flush()
+    except DatabaseError:
+        # Nothing more can be done for the views of a process that's going away.
+        pass
+
+
+def record_view(article, request):
+    """ Counts the request as a view of the article unless the viewer was seen recently. """
+    if cache.add(f'article-view:{article.pk}:{viewer_key(request)}', 1, DEDUPE_WINDOW):
+        buffer.add(article.pk)
+
+
+def live_views_count(article):
+    """ The stored count plus the views waiting to be flushed, approximate. """
+    return article.views_count + max(cache.get(pending_key(article.pk), 0), 0)
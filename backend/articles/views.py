@@ -1,21 +1,40 @@
-from django.db.models import Q
+import difflib
+from datetime import date, timedelta
+
+from django.db import transaction, IntegrityError
+from django.db.models import F, Q
 from django.shortcuts import get_object_or_404
 from django.http import Http404
+from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework import viewsets, views, status, generics
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from .models import Tag, Article, ArticleLike, Comment, CommentVote
-from .serializers.article_serializers import ArticleSerializer, CommentSerializer
+from .models import (Tag, Article, ArticleLike, Comment, CommentVote, ArticleRevision,
+                     ArticleSlugRedirect, ArticleDailyStats, AuthorDailyStats)
+from .serializers.article_serializers import (ArticleSerializer, ArticleListSerializer,
+                                              CommentSerializer, CommentThreadSerializer,
+                                              AutosaveSerializer, ArticleRevisionSerializer)
 from .serializers.feed_serializers import (ArticleFeedSerializer,
                                            FollowedTagsSerializer,
                                            FollowedUsersSerializer)
 from .permissions import IsOwner
-from .pagination import FeedPagination
-
-
-class ArticleViewSet(viewsets.ModelViewSet):
+from .pagination import FeedPagination, CommentThreadPagination
+from .managers import CommentQuerySet
+from .trending import get_trending_articles
+from .viewer_state import ViewerStateMixin
+from .autosave import autosave, fold_patches, RevisionConflict
+from .history import record_revision, get_revision_content
+from .importer import import_articles
+from .view_counts import record_view
+from .readers import record_reader, estimate_readers, MAX_DAYS
+from .stats import get_series
+
+
+class ArticleViewSet(ViewerStateMixin, viewsets.ModelViewSet):
     """ Handles creation, updating & deletion of articles. """
     serializer_class = ArticleSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsOwner,)
@@ -31,6 +50,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
                 Will return articles that has the tags 'python' and/or 'backend'.
             )
         """
+        # Lists don't load the bodies, get_object joins the one being read.
         queryset = Article.objects.all()
 
         title = self.request.query_params.get('title', '')
@@ -49,35 +69,272 @@ class ArticleViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ArticleListSerializer
+
+        return ArticleSerializer
+
     def get_object(self):
         """
-        When the user tries to access a article,
-        check if the article is a draft and if the owner is the requesting user. If not,
-        keep going and do a normal get_object().
+        Returns the published article with the slug, or the draft if it's the requesting
+        user's, in a single query on the unique slug.
         """
-        slug = self.kwargs.get('slug', None)
         user = self.request.user
 
-        article = None
+        visible = Q(draft=False)
+        if user.is_authenticated:
+            visible |= Q(user=user)
 
         try:
-            article = Article.drafts.filter(user=user).get(slug=slug)
+            article = Article._all_articles.filter(visible).select_related('body').get(
+                slug=self.kwargs.get('slug', None)
+            )
 
-        except Exception:
-            article = None
+        except Article.DoesNotExist:
+            raise Http404
+
+        self.check_object_permissions(self.request, article)
+
+        if article.draft:
+            # The owner gets the draft with the pending autosaves applied.
+            content = fold_patches(article.pk)
+            if content is not None:
+                article.body.content = content
 
-        if article:
-            self.check_object_permissions(self.request, article)
-            return article
+        return article
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Old slugs of renamed articles are answered with a 301 to the current one.
+        Views & readers of published articles are counted, see articles.view_counts
+        and articles.readers.
+        """
         try:
-            article = Article.objects.get(slug=slug)
+            article = self.get_object()
 
-        except Article.DoesNotExist:
+        except Http404:
+            redirect = ArticleSlugRedirect.objects.filter(old_slug=kwargs['slug'],
+                                                          article__draft=False)
+            slug = redirect.values_list('article__slug', flat=True).first()
+
+            if slug is None:
+                raise
+
+            return Response(
+                status=status.HTTP_301_MOVED_PERMANENTLY,
+                headers={'Location': reverse('article-detail', kwargs={'slug': slug})}
+            )
+
+        if not article.draft:
+            record_view(article, request)
+            record_reader(article, request)
+
+        return Response(self.get_serializer(article).data)
+
+    def perform_create(self, serializer):
+        article = serializer.save()
+
+        if not article.draft:
+            record_revision(article)
+
+    def perform_update(self, serializer):
+        was_draft = serializer.instance.draft
+        previous_content = serializer.instance.content
+
+        # Autosaves made against the old content must not be applied to the new one.
+        article = serializer.save(revision=serializer.instance.revision + 1)
+
+        if article.draft:
+            return
+
+        if was_draft:
+            record_revision(article)
+
+        elif article.content != previous_content:
+            record_revision(article, previous_content)
+
+
+class AutosaveDraftView(views.APIView):
+    """ Handles autosaving of drafts with text patches (see articles.autosave). """
+    permission_classes = (IsAuthenticated,)
+
+    def patch(self, request, slug):
+        article = get_object_or_404(Article.drafts.only('id', 'revision'),
+                                    slug=slug, user=request.user)
+
+        serializer = AutosaveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            revision = autosave(article, **serializer.validated_data)
+
+        except RevisionConflict as e:
+            return Response(
+                {'details': 'The draft has changed.', 'revision': e.revision},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response({'revision': revision}, status=status.HTTP_200_OK)
+
+
+class ArticleRevisionsView(generics.ListAPIView):
+    """ Returns the revisions of a published article, newest first. """
+    serializer_class = ArticleRevisionSerializer
+
+    def get_queryset(self):
+        article = get_object_or_404(Article, slug=self.kwargs['slug'])
+
+        return ArticleRevision.objects.filter(article=article).defer('data').order_by('-number')
+
+
+# Longest range of the stats endpoints.
+STATS_MAX_DAYS = 5 * 366
+
+
+def get_date_range(query_params, max_days, default_days=7):
+    """
+    Returns the dates of ?start= & ?end= (YYYY-MM-DD), the last default_days days by default.
+    Raises ValidationError if they're invalid or cover more than max_days days.
+    """
+    end = timezone.localdate()
+    start = end - timedelta(days=default_days - 1)
+
+    try:
+        if 'start' in query_params:
+            start = date.fromisoformat(query_params['start'])
+        if 'end' in query_params:
+            end = date.fromisoformat(query_params['end'])
+
+    except ValueError:
+        raise ValidationError({'details': 'start and end must be dates (YYYY-MM-DD).'})
+
+    if not timedelta(0) <= end - start < timedelta(days=max_days):
+        raise ValidationError({'details': f'The range must cover 1 to {max_days} days.'})
+
+    return start, end
+
+
+class ArticleReadersView(views.APIView):
+    """
+    Returns the estimated distinct readers of the user's article, per day & for the whole range.
+    The range is given by ?start= & ?end= (YYYY-MM-DD), the last 7 days by default.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, slug):
+        article = get_object_or_404(Article._all_articles.only('id'), slug=slug,
+                                    user=request.user)
+        start, end = get_date_range(request.query_params, MAX_DAYS)
+
+        return Response(estimate_readers(article, start, end))
+
+
+class AuthorStatsView(views.APIView):
+    """
+    Returns the daily likes, special likes, comments & saves of all the user's articles
+    from ?start= to ?end= (YYYY-MM-DD, the last 7 days by default) and their totals.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        start, end = get_date_range(request.query_params, STATS_MAX_DAYS)
+        stats = AuthorDailyStats.objects.filter(user=request.user)
+
+        return Response(get_series(stats, start, end))
+
+
+class ArticleStatsView(views.APIView):
+    """ Same as AuthorStatsView for one of the user's articles. """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, slug):
+        article = get_object_or_404(Article._all_articles.only('id'), slug=slug,
+                                    user=request.user)
+        start, end = get_date_range(request.query_params, STATS_MAX_DAYS)
+        stats = ArticleDailyStats.objects.filter(article=article)
+
+        return Response(get_series(stats, start, end))
+
+
+class ArticleRevisionView(views.APIView):
+    """
+    Returns the content of a revision of a published article.
+    With ?diff=<number>, returns a unified diff from that revision to this one instead.
+    """
+
+    def get(self, request, slug, number):
+        article = get_object_or_404(Article.objects.only('id'), slug=slug)
+        diff = request.query_params.get('diff', None)
+
+        if diff is not None and not diff.isdigit():
+            return Response(
+                {'details': 'diff must be a revision number.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            content = get_revision_content(article, number)
+
+            if diff is None:
+                return Response({'number': number, 'content': content})
+
+            other = get_revision_content(article, int(diff))
+
+        except ArticleRevision.DoesNotExist:
             raise Http404
 
-        self.check_object_permissions(self.request, article)
-        return article
+        lines = difflib.unified_diff(
+            other.splitlines(),
+            content.splitlines(),
+            fromfile=f'revision {diff}',
+            tofile=f'revision {number}',
+            lineterm=''
+        )
+
+        return Response({'number': number, 'diff': '\n'.join(lines)})
+
+
+class ImportArticlesView(views.APIView):
+    """
+    Imports articles of the user from an NDJSON request body (see articles.importer).
+    The body is read line by line as it's being received.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        stream = request.stream
+
+        if stream is None:
+            return Response(
+                {'details': 'The request body must contain one article per line.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        summary = import_articles(stream, request.user)
+
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class RelatedArticlesView(ViewerStateMixin, generics.ListAPIView):
+    """ Returns the precomputed related articles of an article. """
+    serializer_class = ArticleFeedSerializer
+
+    def get_queryset(self):
+        article = get_object_or_404(Article, slug=self.kwargs['slug'])
+
+        queryset = Article.objects.filter(related_from__article=article)
+        queryset = queryset.select_related('user').prefetch_related('tags')
+
+        return queryset.order_by('-related_from__score')
+
+
+class TrendingArticlesView(ViewerStateMixin, generics.ListAPIView):
+    """ Returns the currently trending articles. """
+    serializer_class = ArticleFeedSerializer
+
+    def get_queryset(self):
+        return get_trending_articles()
 
 
 class DraftArticlesView(generics.ListAPIView):
@@ -87,7 +344,12 @@ class DraftArticlesView(generics.ListAPIView):
 
     def list(self, request):
         """ Returns all of the users draft articles. """
-        queryset = self.queryset.filter(user=request.user)
+        queryset = self.queryset.filter(user=request.user).select_related('body')
+
+        autosaved = queryset.filter(patches__isnull=False).distinct()
+        for article_id in autosaved.values_list('id', flat=True):
+            fold_patches(article_id)
+
         serializer = ArticleSerializer(queryset, many=True)
 
         return Response(serializer.data)
@@ -99,6 +361,25 @@ class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsOwner,)
 
+    def get_queryset(self):
+        """
+        Filters the queryset by:
+            article - only the top level comments of the given article id\n
+            sort - best (default), new or top, also applies to the replies
+        """
+        queryset = self.queryset
+        article = self.request.query_params.get('article', None)
+
+        if article and article.isdigit():
+            queryset = queryset.filter(article=article, parent__isnull=True)
+
+        return queryset.sorted(self.request.query_params.get('sort', None))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sort'] = self.request.query_params.get('sort', None)
+        return context
+
     def destroy(self, request, *args, **kwargs):
         try:
             comment = self.get_object()
@@ -112,6 +393,96 @@ class CommentViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class CommentThreadView(generics.ListAPIView):
+    """
+    Base of the paginated comment threads. Lists comments page by page, each with
+    its reply_count and its first ?replies= (REPLIES default) replies, fetched for
+    the whole page in one query. Deeper replies are loaded with comment-replies.
+    Sorted by ?sort= like CommentViewSet.
+    """
+    serializer_class = CommentThreadSerializer
+    pagination_class = CommentThreadPagination
+
+    REPLIES = 3
+    MAX_REPLIES = 20
+
+    def thread_queryset(self, comments):
+        """ Adds what the threads are serialized & paginated with to the comments. """
+        queryset = comments.select_related('user').with_reply_count()
+
+        if self.request.query_params.get('sort') == CommentQuerySet.TOP:
+            queryset = queryset.annotate(vote_score=F('upvotes_count') - F('downvotes_count'))
+
+        return queryset
+
+    def get_replies_limit(self):
+        limit = self.request.query_params.get('replies', '')
+
+        if not limit.isdigit():
+            return self.REPLIES
+
+        return min(int(limit), self.MAX_REPLIES)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['replies'] = getattr(self, 'replies', {})
+        return context
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        limit = self.get_replies_limit()
+
+        self.replies = replies = {}
+        if limit:
+            first_replies = Comment.objects.select_related('user').first_replies(
+                [comment.pk for comment in page], limit, request.query_params.get('sort')
+            )
+
+            for reply in first_replies:
+                replies.setdefault(reply.parent_id, []).append(reply)
+
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ArticleCommentsView(CommentThreadView):
+    """ The top level comments of a published article. """
+
+    def get_queryset(self):
+        article = get_object_or_404(Article.objects.only('id'), slug=self.kwargs['slug'])
+        return self.thread_queryset(Comment.objects.filter(article=article, parent__isnull=True))
+
+
+class CommentRepliesView(CommentThreadView):
+    """
+    The replies of a comment, the "load more replies" of a thread.
+    ?after=<reply id> continues after a reply, e.g. the last one embedded in the thread
+    (see CommentThreadSerializer.more_replies).
+    """
+
+    def get_queryset(self):
+        comment = get_object_or_404(Comment.objects.filter(article__draft=False).only('id'),
+                                    pk=self.kwargs['pk'])
+        queryset = self.thread_queryset(Comment.objects.filter(parent=comment))
+
+        after = self.request.query_params.get('after', '')
+        if not after:
+            return queryset
+
+        reply = queryset.filter(pk=after).first() if after.isdigit() else None
+        if reply is None:
+            raise ValidationError({'details': 'after must be the id of a reply of the comment.'})
+
+        # Every ordering is descending with the id breaking ties.
+        field = CommentThreadPagination.ordering_for(self.request.query_params.get('sort'))[0]
+        field = field.lstrip('-')
+        value = getattr(reply, field)
+
+        return queryset.filter(
+            Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': reply.pk})
+        )
+
+
 class SaveArticleView(views.APIView):
     """ Handles saving of articles. """
     permission_classes = (IsAuthenticated,)
@@ -127,7 +498,7 @@ class SaveArticleView(views.APIView):
 
         if not is_owner:
             if not user_has_saved:
-                user.saved_articles.add(article)
+                user.save_article(article)
 
                 return Response(
                     {'details': 'Saved article.'},
@@ -162,7 +533,7 @@ class UnsaveArticleView(views.APIView):
 
         if not is_owner:
             if user_has_saved:
-                user.saved_articles.remove(article)
+                user.unsave_article(article)
 
                 return Response(
                     status=status.HTTP_204_NO_CONTENT
@@ -187,52 +558,40 @@ class LikeArticleView(views.APIView):
     lookup_field = 'slug'
 
     def post(self, request, slug):
+        """
+        Likes (or special likes) the article. Liking twice is a no-op,
+        the unique constraint on ArticleLike makes the insert itself the check.
+        Responds with the new like counts.
+        """
         user = request.user
         article = get_object_or_404(Article, slug=slug)
 
-        is_owner = article.user.id == request.user.id
-
-        user_liked = ArticleLike.objects.filter(user=user, special_like=False)
-        user_special_liked = ArticleLike.objects.filter(user=user, special_like=True)
+        if article.user_id == user.id:
+            return Response(
+                {'details': 'Can\'t like your own post.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
 
-        if not is_owner:
-            if not user_special_liked:
-                special_like = request.data.get('special_like', False)
-                if special_like:
-                    ArticleLike.objects.create(
-                        user=user,
-                        article=article,
-                        special_like=True
-                    )
-
-                    return Response(
-                        {'details': 'Superliked article.'},
-                        status=status.HTTP_201_CREATED
-                    )
+        special_like = bool(request.data.get('special_like', False))
 
-            else:
-                return Response(
-                    {'details': 'Can\'t special like twice.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            if not user_liked:
-                ArticleLike.objects.create(
-                    user=user,
-                    article=article
-                )
+        try:
+            with transaction.atomic():
+                ArticleLike.objects.create(user=user, article=article, special_like=special_like)
+            created = True
 
-                return Response({'details': 'Liked article.'}, status=status.HTTP_201_CREATED)
+        except IntegrityError:
+            created = False
 
-            else:
-                return Response(
-                    {'details': 'Can\'t like twice.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        if created:
+            details = 'Superliked article.' if special_like else 'Liked article.'
+            response_status = status.HTTP_201_CREATED
+        else:
+            details = 'Already superliked.' if special_like else 'Already liked.'
+            response_status = status.HTTP_200_OK
 
         return Response(
-            {'details': 'Can\'t like your own post.'},
-            status=status.HTTP_403_FORBIDDEN
+            {'details': details, **article.get_like_counts()},
+            status=response_status
         )
 
 
@@ -242,75 +601,68 @@ class UnlikeArticleView(views.APIView):
     lookup_field = 'slug'
 
     def delete(self, request, slug):
+        """
+        Removes the like (or special like), unliking twice is a no-op.
+        Responds with the new like counts.
+        """
         user = request.user
         article = get_object_or_404(Article, slug=slug)
 
-        user_liked = ArticleLike.objects.filter(article=article,
-                                                user=user,
-                                                special_like=False)
+        special_like = bool(request.data.get('special_like', False))
 
-        user_special_liked = ArticleLike.objects.filter(article=article,
-                                                        user=user,
-                                                        special_like=True)
+        ArticleLike.objects.filter(article=article, user=user, special_like=special_like).delete()
 
-        if user_special_liked:
-            if request.data.get('special_like'):
-                user_special_liked.delete()
-                return Response(status=status.HTTP_204_NO_CONTENT)
-
-        if user_liked:
-            user_liked.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-
-        else:
-            return Response(
-                {'details': 'Can\'t unlike without liking.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return Response(article.get_like_counts(), status=status.HTTP_200_OK)
 
 
 class VoteCommentView(views.APIView):
-    """ Handles creation of comment votes. """
+    """ Handles voting on comments. """
     permission_classes = (IsAuthenticated,)
 
-    def post(self, request, pk):
-        user = request.user
-        comment = get_object_or_404(Comment, pk=pk)
+    VOTES = {
+        'up': False,
+        'down': True,
+        'none': None,
+    }
 
-        user_voted = CommentVote.objects.filter(user=user)
+    def put(self, request, pk):
+        """
+        Sets the user's vote to up, down or none (removes the vote).
+        Switching between up & down updates the vote in place.
+        Responds with the new score.
+        """
+        vote = request.data.get('vote')
 
-        if not comment.deleted:
-            if not user_voted:
-                if request.data.get('downvote'):
-                    CommentVote.objects.create(
-                        downvote=True,
-                        user=user,
-                        comment=comment
-                    )
+        if not isinstance(vote, str) or vote not in self.VOTES:
+            return Response(
+                {'details': 'The vote must be up, down or none.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-                else:
-                    CommentVote.objects.create(
-                        user=user,
-                        comment=comment
-                    )
+        return self.set_vote(request, pk, vote, status.HTTP_200_OK)
 
-                return Response(
-                    {'details': 'Voted on comment.'},
-                    status=status.HTTP_201_CREATED
-                )
+    def post(self, request, pk):
+        """ Same as a PUT with vote up, or down if downvote is set. """
+        vote = 'down' if request.data.get('downvote') else 'up'
 
-            else:
-                return Response(
-                    {'details': 'Can\'t vote twice.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        return self.set_vote(request, pk, vote, status.HTTP_201_CREATED)
 
-        else:
+    def set_vote(self, request, pk, vote, response_status):
+        comment = get_object_or_404(Comment, pk=pk)
+
+        if comment.deleted:
             return Response(
                 {'details': 'Can\'t vote on a deleted comment.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        comment.set_vote(request.user, self.VOTES[vote])
+
+        return Response(
+            {'details': 'Voted on comment.', 'vote': vote, 'score': comment.score},
+            status=response_status
+        )
+
 
 class DeleteCommentVoteView(views.APIView):
     """ Handles deletion of comment votes. """
@@ -333,7 +685,7 @@ class DeleteCommentVoteView(views.APIView):
             )
 
 
-class ArticleFeedView(generics.ListAPIView):
+class ArticleFeedView(ViewerStateMixin, generics.ListAPIView):
     serializer_class = ArticleFeedSerializer
     pagination_class = FeedPagination
 
@@ -0,0 +1,52 @@
+from django.db.models.signals import post_init
+
+from autoslug import AutoSlugField
+
+
+class SourceSlugField(AutoSlugField):
+    """
+    AutoSlugField that keeps the slug until the populate_from field changes.
+
+    AutoSlugField checks the slug's uniqueness on every save, even when it
+    isn't regenerated. This field remembers the source value the instance was
+    loaded with and only regenerates (and checks) the slug when it differs.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs['always_update'] = False
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop('always_update', None)
+        return name, path, args, kwargs
+
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        super().contribute_to_class(cls, name, *args, **kwargs)
+
+        if not cls._meta.abstract:
+            post_init.connect(self.remember_source, sender=cls, weak=False)
+
+    @property
+    def source_attname(self):
+        return f'_{self.name}_source'
+
+    def remember_source(self, instance, **kwargs):
+        # Read from __dict__ so that a deferred source field isn't loaded.
+        if self.populate_from in instance.__dict__:
+            setattr(instance, self.source_attname, instance.__dict__[self.populate_from])
+
+    def pre_save(self, instance, add):
+        value = self.value_from_object(instance)
+        source = instance.__dict__.get(self.populate_from)
+
+        if value and source == getattr(instance, self.source_attname, source):
+            return value
+
+        # Clearing the slug makes AutoSlugField generate a new one.
+        setattr(instance, self.name, None)
+        slug = super().pre_save(instance, add)
+
+        setattr(instance, self.source_attname, source)
+
+        return slug
@@ -47,7 +47,8 @@ INSTALLED_APPS = [
     'users',
     'articles',
     'moderation',
-    'notifications'
+    'notifications',
+    'taskqueue'
 ]
 
 
@@ -105,6 +106,30 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# The counters cache holds the view deduplication keys & pending view counts (see
+# articles.view_counts). The default is per process and holds COUNTERS_CACHE_MAX_ENTRIES
+# keys, point it at a shared cache (e.g. memcached) when the site runs in several processes.
+COUNTERS_CACHE_BACKEND = os.environ.get('COUNTERS_CACHE_BACKEND',
+                                        'django.core.cache.backends.locmem.LocMemCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'counters': {
+        'BACKEND': COUNTERS_CACHE_BACKEND,
+        'LOCATION': os.environ.get('COUNTERS_CACHE_LOCATION', 'counters'),
+    },
+}
+
+if COUNTERS_CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES['counters']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.environ.get('COUNTERS_CACHE_MAX_ENTRIES', 100000)),
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -154,6 +179,9 @@ SITE_ID = 1
 # Using this Email backend right now because I don't care about the email verification right now.
 EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
 
+# Prefixed to the article paths in emails, e.g. the weekly digest.
+DIGEST_BASE_URL = os.environ.get('DIGEST_BASE_URL', 'http://localhost:8000')
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -174,3 +202,13 @@ REST_AUTH_SERIALIZERS = {
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 MEDIA_URL = '/media/'
+
+
+# Background tasks, see taskqueue.worker
+TASK_WORKER_PROCESSES = int(os.environ.get('TASK_WORKER_PROCESSES', 2))
+TASK_POLL_INTERVAL = float(os.environ.get('TASK_POLL_INTERVAL', 1))
+
+# Seconds after which a running task is assumed to belong to a dead worker and queued again.
+TASK_LOCK_TIMEOUT = int(os.environ.get('TASK_LOCK_TIMEOUT', 600))
+# Seconds between the refreshes of a running task's lock, well below TASK_LOCK_TIMEOUT.
+TASK_HEARTBEAT_INTERVAL = int(os.environ.get('TASK_HEARTBEAT_INTERVAL', 60))
@@ -1,7 +1,8 @@
 from django.contrib import admin
 
 
-from .models import Notification
+from .models import Notification, DigestRun
 
 
 admin.site.register(Notification)
+admin.site.register(DigestRun)
@@ -0,0 +1,200 @@
+"""
+Batch generation of the weekly digest emails.
+
+Instead of running the feed query for every user, the articles published
+during the period are scored once from the daily stats rollups (see
+articles.stats) and the top CANDIDATES_PER_SOURCE of every tag & every
+author are kept. A user's digest is the best DIGEST_SIZE articles of the
+candidate lists of the tags & users they follow.
+
+Users are processed in id order, USER_CHUNK_SIZE at a time, and every chunk's
+emails are sent over one connection of the EMAIL_BACKEND. The DigestRun
+records the last user of every sent chunk, an interrupted run resumes after
+it. A chunk interrupted while sending can be sent twice.
+"""
+import heapq
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, FloatField, Q, Sum
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from articles.models import Tag, Article
+from articles import trending
+from users.models import UserFollowing
+
+from .models import DigestRun
+
+
+User = get_user_model()
+
+DIGEST_PERIOD = timedelta(days=7)
+DIGEST_SIZE = 10
+CANDIDATES_PER_SOURCE = 20
+USER_CHUNK_SIZE = 500
+
+# An unfinished run older than this is abandoned for a new one.
+RESUME_WINDOW = timedelta(days=1)
+
+
+class Candidates:
+    """ The scored articles of the period & the top ones of every tag and author. """
+
+    def __init__(self, period_start, period_end):
+        weights = (
+            F('daily_stats__likes') * trending.LIKE_WEIGHT
+            + F('daily_stats__special_likes') * trending.SPECIAL_LIKE_WEIGHT
+            + F('daily_stats__comments') * trending.COMMENT_WEIGHT
+            + F('daily_stats__saves') * trending.SAVE_WEIGHT
+        )
+
+        articles = Article.objects.filter(
+            created_at__gte=period_start,
+            created_at__lt=period_end
+        ).annotate(score=Coalesce(
+            Sum(weights, output_field=FloatField(), filter=Q(
+                daily_stats__day__gte=timezone.localdate(period_start),
+                daily_stats__day__lt=timezone.localdate(period_end)
+            )),
+            0.0
+        )).values('id', 'title', 'slug', 'user_id', 'user__display_name', 'score')
+
+        self.articles = {article['id']: article for article in articles}
+
+        by_author = defaultdict(list)
+        for article in self.articles.values():
+            by_author[article['user_id']].append(article['id'])
+
+        by_tag = defaultdict(list)
+        tags = Article.tags.through.objects.filter(article_id__in=self.articles)
+        for article_id, tag_id in tags.values_list('article_id', 'tag_id').iterator():
+            by_tag[tag_id].append(article_id)
+
+        self.by_author = {author: self.top(ids) for author, ids in by_author.items()}
+        self.by_tag = {tag: self.top(ids) for tag, ids in by_tag.items()}
+
+    def key(self, article_id):
+        # Newer articles first among equal scores.
+        return self.articles[article_id]['score'], article_id
+
+    def top(self, article_ids, n=CANDIDATES_PER_SOURCE):
+        return heapq.nlargest(n, article_ids, key=self.key)
+
+    def digest(self, user_id, tag_ids, author_ids):
+        """ Returns the ids of the best articles for the user, best first. """
+        candidates = set()
+
+        for tag_id in tag_ids:
+            candidates.update(self.by_tag.get(tag_id, ()))
+        for author_id in author_ids:
+            candidates.update(self.by_author.get(author_id, ()))
+
+        candidates = [pk for pk in candidates if self.articles[pk]['user_id'] != user_id]
+
+        return self.top(candidates, DIGEST_SIZE)
+
+
+def load_follows(user_ids):
+    """ Returns the followed tag ids & followed user ids of every user, in two queries. """
+    tags = defaultdict(list)
+    rows = Tag.followers.through.objects.filter(user_id__in=user_ids)
+    for user_id, tag_id in rows.values_list('user_id', 'tag_id'):
+        tags[user_id].append(tag_id)
+
+    authors = defaultdict(list)
+    rows = UserFollowing.objects.filter(user_follows_id__in=user_ids)
+    for user_id, followed_id in rows.values_list('user_follows_id', 'user_followed_id'):
+        authors[user_id].append(followed_id)
+
+    return tags, authors
+
+
+def render_digest(user, articles):
+    context = {
+        'user': user,
+        'base_url': settings.DIGEST_BASE_URL,
+        'articles': [
+            {
+                'title': article['title'],
+                'author': article['user__display_name'],
+                'url': reverse('article-detail', kwargs={'slug': article['slug']}),
+            }
+            for article in articles
+        ],
+    }
+
+    return EmailMessage(
+        subject='Your weekly digest',
+        body=render_to_string('notifications/weekly_digest.txt', context),
+        to=[user['email']],
+    )
+
+
+def get_run(now=None):
+    """ Returns the run to resume, or today's run, which is finished if it already ran. """
+    now = now or timezone.now()
+
+    run = DigestRun.objects.filter(
+        finished_at__isnull=True,
+        period_end__gte=now - RESUME_WINDOW
+    ).order_by('-period_end').first()
+
+    if run is None:
+        period_end = timezone.make_aware(datetime.combine(timezone.localdate(now), time.min))
+        run, _ = DigestRun.objects.get_or_create(period_end=period_end)
+
+    return run
+
+
+def send_digests(run, chunk_size=USER_CHUNK_SIZE, stdout=None):
+    """ Sends the digests of the run's remaining users, returns the number of emails sent. """
+    if run.finished_at:
+        return 0
+
+    candidates = Candidates(run.period_end - DIGEST_PERIOD, run.period_end)
+    users = User.objects.filter(is_active=True).order_by('id')
+    sent = 0
+
+    while True:
+        chunk = list(users.filter(id__gt=run.last_user_id).values(
+            'id', 'email', 'display_name'
+        )[:chunk_size])
+
+        if not chunk:
+            break
+
+        tags, authors = load_follows([user['id'] for user in chunk])
+
+        messages = []
+        for user in chunk:
+            article_ids = candidates.digest(user['id'], tags[user['id']], authors[user['id']])
+
+            if article_ids:
+                articles = [candidates.articles[pk] for pk in article_ids]
+                messages.append(render_digest(user, articles))
+
+        count = 0
+        if messages:
+            # One connection for the whole chunk.
+            count = get_connection().send_messages(messages) or 0
+        sent += count
+
+        run.last_user_id = chunk[-1]['id']
+        DigestRun.objects.filter(pk=run.pk).update(
+            last_user_id=run.last_user_id,
+            sent=F('sent') + count
+        )
+
+        if stdout:
+            stdout.write(f'Digests sent up to user {run.last_user_id}.')
+
+    run.finished_at = timezone.now()
+    DigestRun.objects.filter(pk=run.pk).update(finished_at=run.finished_at)
+
+    return sent
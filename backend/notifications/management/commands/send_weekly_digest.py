@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from notifications.digest import get_run, send_digests, USER_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Sends the weekly digest emails, resuming an interrupted run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=USER_CHUNK_SIZE,
+                            help='Number of users processed per chunk.')
+
+    def handle(self, *args, **options):
+        run = get_run()
+
+        if run.finished_at:
+            self.stdout.write(f'{run} already sent.')
+            return
+
+        sent = send_digests(run, chunk_size=options['chunk_size'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} digests.'))
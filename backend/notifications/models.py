@@ -115,3 +115,19 @@ class Notification(models.Model):
             self.receiver = self.user
 
         super(Notification, self).save(*args, **kwargs)
+
+
+class DigestRun(models.Model):
+    """ Progress of a weekly digest run, see notifications.digest. """
+    # The digest covers the DIGEST_PERIOD before period_end.
+    period_end = models.DateTimeField(unique=True)
+
+    # Users are processed in id order, the run resumes after this one.
+    last_user_id = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f'Digest of {self.period_end:%Y-%m-%d}'
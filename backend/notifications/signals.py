@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import waiters
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def wake_waiters(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: waiters.notify(instance.receiver_id))
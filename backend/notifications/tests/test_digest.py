@@ -0,0 +1,102 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+
+from articles.models import Tag, Article, ArticleLike, ArticleDailyStats
+
+from ..digest import get_run, send_digests, Candidates
+from ..models import DigestRun
+
+
+User = get_user_model()
+
+
+class WeeklyDigestTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'testuser_{i}',
+                email=f'test_{i}@gmail.com',
+                password='12345'
+            )
+            for i in range(4)
+        ]
+
+        self.tag = Tag.objects.create(name='python')
+        self.tag.followers.add(self.users[1])
+        self.users[2].follow(self.users[0])
+
+        self.popular = Article.objects.create(title='popular', content='content',
+                                              user=self.users[0])
+        self.popular.tags.add(self.tag)
+        self.other = Article.objects.create(title='other', content='content',
+                                            user=self.users[0])
+
+        ArticleLike.objects.create(user=self.users[3], article=self.popular)
+
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.run = DigestRun.objects.create(
+            period_end=timezone.make_aware(datetime.combine(tomorrow, time.min))
+        )
+
+    def test_candidates(self):
+        """ Articles of the period are ranked by their engagement per tag and author. """
+        candidates = Candidates(self.run.period_end - timedelta(days=7), self.run.period_end)
+
+        self.assertEqual(candidates.by_tag[self.tag.pk], [self.popular.pk])
+        self.assertEqual(candidates.by_author[self.users[0].pk], [self.popular.pk, self.other.pk])
+
+    def test_candidates_period(self):
+        """ Engagement after the end of the period doesn't count. """
+        period_end = self.run.period_end - timedelta(days=1)
+        self.other.created_at = period_end - timedelta(days=1)
+        self.other.save(update_fields=('created_at',))
+        ArticleDailyStats.objects.create(article=self.other, day=timezone.localdate(), likes=5)
+
+        candidates = Candidates(period_end - timedelta(days=7), period_end)
+
+        self.assertEqual(candidates.articles[self.other.pk]['score'], 0)
+
+    def test_digest_not_escaped(self):
+        """ The plain text email isn't HTML escaped. """
+        Article._all_articles.filter(pk=self.popular.pk).update(title="Tom's A&B")
+
+        send_digests(self.run)
+
+        self.assertIn("Tom's A&B", mail.outbox[0].body)
+
+    def test_send_digests(self):
+        """ Users get the top articles of what they follow, users following nothing get nothing. """
+        self.assertEqual(send_digests(self.run, chunk_size=2), 2)
+
+        recipients = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(set(recipients), {self.users[1].email, self.users[2].email})
+
+        body = recipients[self.users[2].email].body
+        self.assertTrue(body.index('popular') < body.index('other'))
+        self.assertNotIn('other', recipients[self.users[1].email].body)
+
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.sent, 2)
+        self.assertEqual(self.run.last_user_id, self.users[3].pk)
+        self.assertIsNotNone(self.run.finished_at)
+
+    def test_resume(self):
+        """ An interrupted run continues after the last user it checkpointed. """
+        DigestRun.objects.filter(pk=self.run.pk).update(last_user_id=self.users[1].pk)
+        self.run.refresh_from_db()
+
+        self.assertEqual(get_run(), self.run)
+        self.assertEqual(send_digests(self.run), 1)
+        self.assertEqual(mail.outbox[0].to, [self.users[2].email])
+
+    def test_finished_run(self):
+        """ A finished run isn't sent again. """
+        send_digests(self.run)
+        mail.outbox.clear()
+
+        self.assertEqual(send_digests(self.run), 0)
+        self.assertEqual(mail.outbox, [])
@@ -68,6 +68,13 @@ class NotificationModelTest(TestCase):
             f'{self.user_2.display_name} liked {self.article.title}'
         )
 
+    def test_like_notification_only_on_insert(self):
+        """ Saving an existing like again doesn't send another notification. """
+        self.article_like.save()
+        self.article_like.save()
+
+        self.assertEqual(Notification.objects.count(), 1)
+
     def test_create_special_like_notification_via_signal(self):
         """ Creates a special like notification via the signal. """
         self.special_article_like.save()
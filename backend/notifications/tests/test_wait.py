@@ -0,0 +1,166 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from .. import waiters
+from ..models import Notification
+
+
+User = get_user_model()
+
+
+class WaitersTest(SimpleTestCase):
+    def test_notify_wakes_waiter(self):
+        """ A waiter returns as soon as its user is notified. """
+        with waiters.subscribe(1) as subscription:
+            timer = threading.Timer(0.05, waiters.notify, args=(1,))
+            timer.start()
+
+            started = time.monotonic()
+            self.assertTrue(subscription.wait(5))
+            self.assertLess(time.monotonic() - started, 5)
+
+            timer.join()
+
+    def test_notify_other_user(self):
+        """ Times out because only another user was notified. """
+        with waiters.subscribe(1) as subscription:
+            waiters.notify(2)
+            self.assertFalse(subscription.wait(0.05))
+
+    def test_notified_before_wait(self):
+        """ A notification sent between the subscription and the wait isn't lost. """
+        with waiters.subscribe(1) as subscription:
+            waiters.notify(1)
+            self.assertTrue(subscription.wait(0))
+            self.assertFalse(subscription.wait(0))
+
+    def test_entry_dropped(self):
+        """ The user's entry is dropped once the last waiter leaves. """
+        with waiters.subscribe(1):
+            with waiters.subscribe(1):
+                pass
+
+            self.assertIn(1, waiters._waiters)
+
+        self.assertNotIn(1, waiters._waiters)
+
+
+class WaitNotificationsViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_user',
+            email='test_user@gmail.com',
+            password='12345'
+        )
+
+        self.user_2 = User.objects.create_user(
+            username='test_user_2',
+            email='test_user_2@gmail.com',
+            password='12345'
+        )
+
+        self.url = reverse('notification-wait')
+
+    def notify(self, receiver, sender):
+        return Notification.objects.create(
+            action=Notification.FOLLOW,
+            sender=sender,
+            receiver=receiver,
+            user=receiver
+        )
+
+    def test_wait_returns_newer(self):
+        """ Returns the notifications newer than after without waiting. """
+        old = self.notify(self.user, self.user_2)
+        new = self.notify(self.user, self.user_2)
+        self.notify(self.user_2, self.user)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {'after': old.id}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['last_id'], new.id)
+        self.assertEqual([n['id'] for n in response.json()['results']], [new.id])
+
+    def test_wait_timeout(self):
+        """ Responds with no notifications once the timeout expires. """
+        notification = self.notify(self.user, self.user_2)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {'after': notification.id, 'timeout': 0})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'last_id': notification.id, 'results': []})
+
+    def test_wait_without_after(self):
+        """ Without after only the notifications to come are returned. """
+        notification = self.notify(self.user, self.user_2)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {'timeout': 0})
+
+        self.assertEqual(response.json(), {'last_id': notification.id, 'results': []})
+
+    def test_wait_invalid_after(self):
+        """ Responds with 400 because after isn't a number. """
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {'after': 'abc'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_wait_not_authenticated(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class WaitNotificationsWakeUpTest(APITransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_user',
+            email='test_user@gmail.com',
+            password='12345'
+        )
+
+        self.user_2 = User.objects.create_user(
+            username='test_user_2',
+            email='test_user_2@gmail.com',
+            password='12345'
+        )
+
+    def send_notification(self):
+        # Waits for the request to subscribe so that the wake-up is tested, not the first query.
+        deadline = time.monotonic() + 5
+        while self.user.pk not in waiters._waiters and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        Notification.objects.create(
+            action=Notification.FOLLOW,
+            sender=self.user_2,
+            receiver=self.user,
+            user=self.user
+        )
+        connection.close()
+
+    def test_wait_woken_on_commit(self):
+        """ A committed notification wakes the waiting request before the re-check. """
+        thread = threading.Thread(target=self.send_notification)
+        thread.start()
+
+        self.client.force_authenticate(self.user)
+
+        started = time.monotonic()
+        response = self.client.get(reverse('notification-wait'), {'after': 0, 'timeout': 30})
+
+        thread.join()
+
+        self.assertLess(time.monotonic() - started, waiters.RECHECK_INTERVAL)
+        self.assertEqual(len(response.json()['results']), 1)
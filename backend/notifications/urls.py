@@ -1,9 +1,13 @@
 from django.urls import path
 
-from .views import ListNotificationsView, MarkAllNotifications, MarkNotification
+from .views import (
+    ListNotificationsView, MarkAllNotifications, MarkNotification,
+    WaitNotificationsView
+)
 
 urlpatterns = [
     path('notifications/', ListNotificationsView.as_view(), name='notification-list'),
     path('notifications/mark_all/', MarkAllNotifications.as_view(), name='notification-mark-all'),
     path('notifications/mark/<int:pk>/', MarkNotification.as_view(), name='notification-mark'),
+    path('notifications/wait/', WaitNotificationsView.as_view(), name='notification-wait'),
 ]
@@ -1,11 +1,22 @@
+import time
+
+from django.db import connection
+
 from rest_framework import status, generics, views
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from . import waiters
+from .models import Notification
 from .serializers import NotificationSerializer
 from .pagination import NotificationsPagination
 
 
+WAIT_TIMEOUT = 25
+MAX_WAIT_TIMEOUT = 30
+MAX_WAIT_RESULTS = 100
+
+
 class ListNotificationsView(generics.ListAPIView):
     """ Returns all the user's notification """
     serializer_class = NotificationSerializer
@@ -71,3 +82,62 @@ class MarkNotification(views.APIView):
             {'details': 'Coudln\'t find the notification.'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class WaitNotificationsView(views.APIView):
+    """
+    Long-poll for clients without WebSockets, holds the request until the user
+    has a notification newer than ?after=<id> or ?timeout= seconds pass.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get_int_param(self, name, default):
+        value = self.request.query_params.get(name, '')
+
+        if not value:
+            return default
+
+        if not value.isdigit():
+            raise ValueError(f'{name} must be a positive integer.')
+
+        return int(value)
+
+    def get(self, request):
+        try:
+            after = self.get_int_param('after', None)
+            timeout = min(self.get_int_param('timeout', WAIT_TIMEOUT), MAX_WAIT_TIMEOUT)
+
+        except ValueError as e:
+            return Response({'details': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Notification.objects.filter(receiver=request.user).select_related(
+            'sender', 'article', 'comment', 'user'
+        )
+
+        if after is None:
+            # Without a cursor the client only wants what comes next.
+            after = queryset.order_by('-id').values_list('id', flat=True).first() or 0
+
+        queryset = queryset.order_by('id')
+        deadline = time.monotonic() + timeout
+
+        with waiters.subscribe(request.user.pk) as subscription:
+            while True:
+                notifications = list(queryset.filter(id__gt=after)[:MAX_WAIT_RESULTS])
+                remaining = deadline - time.monotonic()
+
+                if notifications or remaining <= 0:
+                    break
+
+                if not connection.in_atomic_block:
+                    # Idle waiters shouldn't hold on to a database connection.
+                    connection.close()
+
+                subscription.wait(min(remaining, waiters.RECHECK_INTERVAL))
+
+        serializer = NotificationSerializer(notifications, many=True)
+
+        return Response({
+            'last_id': notifications[-1].id if notifications else after,
+            'results': serializer.data
+        }, status=status.HTTP_200_OK)
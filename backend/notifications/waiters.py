@@ -0,0 +1,77 @@
+"""
+In-process wake-ups for the notifications long-poll.
+
+Every user with a waiting request has a condition and a version number,
+notify() bumps the version once a new notification for the user is committed
+and wakes the user's waiters. Users nobody waits for cost nothing, their entry
+is dropped when the last waiter leaves.
+
+Only the requests served by the process that inserted the notification are
+woken, the waiters of other processes find it when they re-check the database
+every RECHECK_INTERVAL seconds.
+"""
+import threading
+
+
+RECHECK_INTERVAL = 10
+
+_lock = threading.Lock()
+_waiters = {}
+
+
+class _Entry:
+    def __init__(self):
+        self.condition = threading.Condition(_lock)
+        self.version = 0
+        self.count = 0
+
+
+class Subscription:
+    """ Waits for the notifications of a user, use it as a context manager. """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.entry = None
+        self.seen = 0
+
+    def __enter__(self):
+        with _lock:
+            self.entry = _waiters.setdefault(self.user_id, _Entry())
+            self.entry.count += 1
+            self.seen = self.entry.version
+
+        return self
+
+    def __exit__(self, *exc_info):
+        with _lock:
+            self.entry.count -= 1
+
+            if not self.entry.count:
+                del _waiters[self.user_id]
+
+    def wait(self, timeout):
+        """
+        Blocks until the user is notified or the timeout expires,
+        returns True if there was a notification since the last call.
+        """
+        with _lock:
+            notified = self.entry.condition.wait_for(
+                lambda: self.entry.version != self.seen, timeout
+            )
+            self.seen = self.entry.version
+
+        return notified
+
+
+def subscribe(user_id):
+    return Subscription(user_id)
+
+
+def notify(user_id):
+    """ Wakes the waiters of the user. """
+    with _lock:
+        entry = _waiters.get(user_id)
+
+        if entry is not None:
+            entry.version += 1
+            entry.condition.notify_all()
@@ -0,0 +1 @@
+default_app_config = "taskqueue.apps.TaskqueueConfig"
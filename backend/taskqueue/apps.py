@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TaskqueueConfig(AppConfig):
+    name = 'taskqueue'
+
+    def ready(self):
+        # Registers the @task functions of every app, workers don't import the views.
+        autodiscover_modules('tasks')
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from taskqueue.worker import run_workers
+
+
+class Command(BaseCommand):
+    help = 'Runs the background task workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.TASK_WORKER_PROCESSES,
+                            help='Number of worker processes.')
+        parser.add_argument('--poll-interval', type=float,
+                            default=settings.TASK_POLL_INTERVAL,
+                            help='Seconds an idle worker waits before looking for tasks again.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once there are no due tasks left.')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+
+        if processes > 1 and not connection.features.has_select_for_update_skip_locked:
+            # SQLite fails concurrent write transactions with "database is locked"
+            # instead of queueing them, one process is all it can serve.
+            self.stdout.write(self.style.WARNING(
+                f'{connection.vendor} has no SKIP LOCKED, running a single worker process.'
+            ))
+            processes = 1
+
+        self.stdout.write(f'Starting {processes} worker processes.')
+
+        run_workers(processes, options['poll_interval'], options['burst'])
+
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
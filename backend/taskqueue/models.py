@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A queued call of a registered task function, see taskqueue.registry.
+    Rows are deleted once the call succeeds, failed calls are kept for inspection.
+    """
+    QUEUED = 1
+    RUNNING = 2
+    FAILED = 3
+
+    STATUSES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed')
+    )
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+
+    status = models.IntegerField(choices=STATUSES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_claim_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task
+
+
+DEFAULT_MAX_RETRIES = 3
+
+# Seconds before the first retry, doubled for every further attempt.
+DEFAULT_RETRY_DELAY = 10
+
+registry = {}
+
+
+class TaskFunction:
+    """
+    A function that can be run by the workers, created by the @task decorator.
+    Calling it runs the function right away, delay() & friends queue it.
+    Arguments must be JSON serializable.
+    """
+
+    def __init__(self, func, name, max_retries, retry_delay):
+        self.func = func
+        self.name = name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self.__doc__ = func.__doc__
+        self.__name__ = func.__name__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, args=(), kwargs=None, run_at=None, countdown=None):
+        """
+        Queues a call of the task, in the current transaction if there is one,
+        so the task is only visible to the workers once (and if) it commits.
+
+        -- Params --
+        run_at: The time the task should run at, now by default.
+        countdown: Seconds to wait before running the task.
+        """
+        if run_at is None:
+            run_at = timezone.now() + timedelta(seconds=countdown or 0)
+
+        return Task.objects.create(name=self.name, args=list(args), kwargs=kwargs or {},
+                                   run_at=run_at)
+
+    def delay(self, *args, **kwargs):
+        """ Queues the task to run as soon as a worker is free. """
+        return self.enqueue(args, kwargs)
+
+    def delay_on_commit(self, *args, **kwargs):
+        """ Queues the task once the current transaction commits, nothing if it rolls back. """
+        transaction.on_commit(lambda: self.enqueue(args, kwargs))
+
+
+def task(func=None, *, name=None, max_retries=DEFAULT_MAX_RETRIES,
+         retry_delay=DEFAULT_RETRY_DELAY):
+    """
+    Registers a function as a task, used as @task or @task(max_retries=5).
+    Tasks are looked up by name, "<module>.<function>" by default.
+    """
+    def decorator(func):
+        task_function = TaskFunction(func, name or f'{func.__module__}.{func.__qualname__}',
+                                     max_retries, retry_delay)
+        registry[task_function.name] = task_function
+
+        return task_function
+
+    if func is not None:
+        return decorator(func)
+
+    return decorator
@@ -0,0 +1,190 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction, OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Task
+from ..registry import task, registry
+from .. import worker
+from ..worker import claim_task, run_task, run_pending, requeue_stale_tasks, Heartbeat
+
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_retries=1, retry_delay=60)
+def fail():
+    raise ValueError('Always fails')
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_register(self):
+        """ Tasks are registered by module & function name and can still be called directly. """
+        self.assertIs(registry[f'{__name__}.record'], record)
+
+        record(1)
+        self.assertEqual(calls, [1])
+
+    def test_delay(self):
+        """ A delayed task is run by the worker and deleted afterwards. """
+        record.delay('a')
+        record.delay('b')
+
+        self.assertEqual(calls, [])
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_delay_rolled_back(self):
+        """ A task queued in a transaction that rolls back is never run. """
+        try:
+            with transaction.atomic():
+                record.delay('a')
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertEqual(run_pending(), 0)
+
+    def test_delay_on_commit(self):
+        """ The task is only queued once the transaction commits. """
+        with mock.patch.object(transaction, 'on_commit') as on_commit:
+            record.delay_on_commit('a')
+
+            self.assertFalse(Task.objects.exists())
+            on_commit.call_args[0][0]()
+
+        self.assertEqual(Task.objects.get().args, ['a'])
+
+    def test_scheduled(self):
+        """ Tasks aren't claimed before their run_at. """
+        record.enqueue(['later'], countdown=60)
+        record.enqueue(['now'], run_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['now'])
+
+    def test_claim(self):
+        """ A claimed task is locked by the worker and can't be claimed again. """
+        record.delay('a')
+
+        task = claim_task('worker-1')
+        self.assertEqual(task.status, Task.RUNNING)
+        self.assertEqual(task.locked_by, 'worker-1')
+        self.assertEqual(task.attempts, 1)
+
+        self.assertIsNone(claim_task('worker-2'))
+
+    def test_claim_without_skip_locked(self):
+        """ Databases without SKIP LOCKED claim with a conditional update. """
+        record.delay('a')
+
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', False):
+            self.assertIsNotNone(claim_task('worker-1'))
+            self.assertIsNone(claim_task('worker-2'))
+
+    def test_retry_with_backoff(self):
+        """ A failed task is queued again later, then marked as failed once out of retries. """
+        fail.delay()
+
+        self.assertFalse(run_task(claim_task('worker')))
+
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertIn('Always fails', task.last_error)
+        self.assertTrue(task.run_at >= timezone.now() + timedelta(seconds=59))
+
+        Task.objects.update(run_at=timezone.now())
+        self.assertFalse(run_task(claim_task('worker')))
+
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+
+    def test_unknown_task(self):
+        """ Tasks nobody registered fail right away. """
+        Task.objects.create(name='missing.task')
+
+        run_pending()
+
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    @override_settings(TASK_LOCK_TIMEOUT=60)
+    def test_requeue_stale(self):
+        """ Tasks left running by a dead worker are queued again. """
+        record.delay('a')
+        claim_task('worker')
+
+        self.assertEqual(requeue_stale_tasks(), 0)
+
+        Task.objects.update(locked_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual(requeue_stale_tasks(), 1)
+
+        # Retried with the backoff of a failure.
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertTrue(task.run_at > timezone.now())
+
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        self.assertEqual(calls, ['a'])
+
+    @override_settings(TASK_LOCK_TIMEOUT=60)
+    def test_stale_out_of_retries(self):
+        """ A task whose worker keeps dying fails once its retries are used up. """
+        fail.delay()
+
+        for attempt in range(2):
+            Task.objects.update(run_at=timezone.now())
+            claim_task('worker')
+            Task.objects.update(locked_at=timezone.now() - timedelta(seconds=61))
+            self.assertEqual(requeue_stale_tasks(), 1)
+
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+        self.assertIn('stopped while running', task.last_error)
+
+    def test_lost_lock(self):
+        """ A run that lost its lock to another worker doesn't touch the other worker's claim. """
+        record.delay('a')
+        task = claim_task('worker')
+
+        # Requeued as stale and claimed again while the first run was still going.
+        Task.objects.update(locked_by='worker-2')
+
+        self.assertTrue(run_task(task))
+        self.assertEqual(Task.objects.get().locked_by, 'worker-2')
+
+    def test_heartbeat(self):
+        """ The heartbeat refreshes the lock of the running task. """
+        record.delay('a')
+        task = claim_task('worker')
+        Task.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+
+        heartbeat = Heartbeat(task, interval=1)
+        with mock.patch.object(heartbeat.stop, 'wait', side_effect=[False, True]):
+            heartbeat.beat()
+
+        self.assertTrue(Task.objects.get().locked_at > timezone.now() - timedelta(minutes=1))
+
+    def test_worker_survives_database_errors(self):
+        """ A database error while finishing a task doesn't stop the worker. """
+        record.delay('a')
+        record.delay('b')
+
+        with mock.patch.object(worker, 'run_task', side_effect=[OperationalError, True]) as run:
+            worker.work(threading.Event(), poll_interval=0, burst=True)
+
+        self.assertEqual(run.call_count, 2)
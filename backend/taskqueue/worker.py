@@ -0,0 +1,258 @@
+"""
+Workers of the database backed task queue.
+
+A worker claims the oldest due task, runs it outside of any transaction and
+deletes it on success. Failed tasks are queued again with an exponential
+backoff until their retries run out.
+
+Claiming uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports
+it, so concurrent workers never wait on each other's rows. On other
+databases (SQLite) a queued row is claimed with a conditional UPDATE, only
+the worker whose update matched a row gets the task.
+
+While a task runs, its worker refreshes the task's locked_at every
+TASK_HEARTBEAT_INTERVAL seconds so that long tasks aren't mistaken for the
+tasks of a dead worker. A task whose lock was lost anyway can run twice,
+the finishing update of the first run then matches nothing.
+"""
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction, DatabaseError, OperationalError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+from .registry import registry
+
+
+# Upper bound of the backoff between retries, in seconds.
+MAX_RETRY_DELAY = 3600
+
+# Candidates tried per claim on databases without SKIP LOCKED.
+CLAIM_CANDIDATES = 10
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def due_tasks():
+    return Task.objects.filter(status=Task.QUEUED, run_at__lte=timezone.now())
+
+
+def claim_task(worker_id):
+    """ Marks the oldest due task as running for the worker, returns it or None. """
+    claimed = {
+        'status': Task.RUNNING,
+        'attempts': F('attempts') + 1,
+        'locked_by': worker_id,
+        'locked_at': timezone.now(),
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            task = due_tasks().order_by('run_at', 'id').select_for_update(skip_locked=True).first()
+
+            if task is None:
+                return None
+
+            Task.objects.filter(pk=task.pk).update(**claimed)
+
+        task.refresh_from_db()
+        return task
+
+    candidates = due_tasks().order_by('run_at', 'id').values_list('pk', flat=True)
+    for pk in candidates[:CLAIM_CANDIDATES]:
+        if Task.objects.filter(pk=pk, status=Task.QUEUED).update(**claimed):
+            return Task.objects.get(pk=pk)
+
+    return None
+
+
+class Heartbeat:
+    """ Refreshes the lock of a running task from a thread, use it as a context manager. """
+
+    def __init__(self, task, interval=None):
+        self.task = task
+        self.interval = interval or settings.TASK_HEARTBEAT_INTERVAL
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.beat, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self.thread.join()
+
+    def beat(self):
+        try:
+            while not self.stop.wait(self.interval):
+                try:
+                    Task.objects.filter(
+                        pk=self.task.pk,
+                        status=Task.RUNNING,
+                        locked_by=self.task.locked_by
+                    ).update(locked_at=timezone.now())
+
+                except DatabaseError:
+                    # The next beat tries again, the lock only expires after TASK_LOCK_TIMEOUT.
+                    pass
+        finally:
+            # The thread's own connection.
+            connection.close()
+
+
+def retry_delay(task_function, attempts):
+    """ Exponential backoff with a little jitter so that failed tasks don't retry in lockstep. """
+    delay = min(task_function.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def run_task(task):
+    """ Runs a claimed task, returns True if it succeeded. """
+    task_function = registry.get(task.name)
+
+    try:
+        if task_function is None:
+            raise LookupError(f'No task is registered as {task.name}.')
+
+        with Heartbeat(task):
+            task_function(*task.args, **task.kwargs)
+
+    except Exception:
+        error = traceback.format_exc()
+        # Only while the worker still holds the task, it may have been requeued & claimed again.
+        claimed = Task.objects.filter(pk=task.pk, locked_by=task.locked_by)
+
+        if task_function is not None and task.attempts <= task_function.max_retries:
+            claimed.update(
+                status=Task.QUEUED,
+                run_at=timezone.now() + retry_delay(task_function, task.attempts),
+                locked_by='',
+                locked_at=None,
+                last_error=error
+            )
+        else:
+            claimed.update(status=Task.FAILED, last_error=error)
+
+        return False
+
+    Task.objects.filter(pk=task.pk, locked_by=task.locked_by).delete()
+    return True
+
+
+def requeue_stale_tasks():
+    """
+    Queues again the tasks whose worker died while running them, with the same backoff
+    as a failure. A task that has used up its retries is marked as failed instead,
+    so that a task killing its worker doesn't take one down on every retry.
+    Returns the number of tasks requeued or failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=cutoff)
+    count = 0
+
+    for task in stale.only('id', 'name', 'attempts', 'locked_by'):
+        task_function = registry.get(task.name)
+        # Only while it's still the same stale claim.
+        claimed = Task.objects.filter(pk=task.pk, status=Task.RUNNING, locked_by=task.locked_by,
+                                      locked_at__lt=cutoff)
+
+        if task_function is not None and task.attempts <= task_function.max_retries:
+            count += claimed.update(
+                status=Task.QUEUED,
+                run_at=timezone.now() + retry_delay(task_function, task.attempts),
+                locked_by='',
+                locked_at=None
+            )
+        else:
+            count += claimed.update(
+                status=Task.FAILED,
+                last_error=f'The worker {task.locked_by} stopped while running the task '
+                           f'(attempt {task.attempts}).'
+            )
+
+    return count
+
+
+def run_pending(worker_id=None, limit=None):
+    """ Runs due tasks until there are none left (or limit), returns the number run. """
+    worker_id = worker_id or worker_name()
+    count = 0
+
+    while limit is None or count < limit:
+        task = claim_task(worker_id)
+        if task is None:
+            break
+
+        run_task(task)
+        count += 1
+
+    return count
+
+
+def work(stop, poll_interval, burst=False):
+    """ The loop of a worker process, runs until stop is set. """
+    worker_id = worker_name()
+
+    try:
+        while not stop.is_set():
+            try:
+                task = claim_task(worker_id)
+
+                if task is not None:
+                    run_task(task)
+                    continue
+
+                if burst:
+                    break
+
+                requeue_stale_tasks()
+
+            except OperationalError:
+                # SQLite answers "database is locked" while another worker writes.
+                # A task whose bookkeeping failed is queued again once its lock times out.
+                connection.close_if_unusable_or_obsolete()
+
+            stop.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+
+def run_workers(processes, poll_interval, burst=False):
+    """ Runs a pool of worker processes until SIGINT / SIGTERM (or until idle with burst). """
+    stop = multiprocessing.Event()
+
+    def shutdown(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    if processes == 1:
+        work(stop, poll_interval, burst)
+        return
+
+    # Forked children must not share the parent's database connection.
+    connections.close_all()
+
+    pool = [
+        multiprocessing.Process(target=work, args=(stop, poll_interval, burst), daemon=True)
+        for _ in range(processes)
+    ]
+
+    for process in pool:
+        process.start()
+
+    for process in pool:
+        process.join()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import User, AccountDeletion
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -8,4 +8,11 @@ class UserAdmin(admin.ModelAdmin):
     readonly_fields = ('slug',)
 
 
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ('username', 'step', 'deleted_rows', 'requested_at', 'finished_at')
+    readonly_fields = ('user_id', 'username', 'step', 'deleted_rows', 'requested_at',
+                       'finished_at')
+
+
 admin.site.register(User, UserAdmin)
+admin.site.register(AccountDeletion, AccountDeletionAdmin)
@@ -0,0 +1,164 @@
+"""
+Background deletion of user accounts.
+
+Deleting a user in one go makes the cascade collector load every related row
+into memory and hold the locks for the whole delete. Instead the account is
+deactivated right away (request_account_deletion) and a background task
+(or the delete_accounts command) removes the dependent rows leaf-first, DELETE_CHUNK_SIZE rows per
+transaction, recording its progress on the AccountDeletion.
+By the time a parent table is reached its children are gone, so every
+chunk's cascade stays small.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from articles.models import (Tag, Article, ArticleBody, ArticleSlugRedirect, ArticleRevision,
+                             ArticleLike, ArticleReaderSketch, ArticleDailyStats,
+                             AuthorDailyStats, Comment, CommentVote, DraftPatch, RelatedArticle,
+                             TrendingScore)
+from moderation.models import Report
+from notifications.models import Notification
+
+from .models import (AccountDeletion, UserFollowing, SavedArticle, UnsavedArticle,
+                     FollowSuggestion, UserSlugRedirect)
+
+
+User = get_user_model()
+
+DELETE_CHUNK_SIZE = 1000
+
+
+def decrement_followers(pks):
+    User.objects.filter(followers__in=pks, followers_count__gt=0).update(
+        followers_count=F('followers_count') - 1
+    )
+
+
+def decrement_following(pks):
+    User.objects.filter(following__in=pks, following_count__gt=0).update(
+        following_count=F('following_count') - 1
+    )
+
+
+def tombstone_saves(pks):
+    UnsavedArticle.record_removed(SavedArticle.objects.filter(pk__in=pks))
+
+
+def deletion_steps(user_id):
+    """
+    Returns (name, queryset, callback) for every table to clear, leaf tables first.
+    The callback, if any, is called with the pks of every chunk before it's deleted.
+    """
+    articles = Q(article__user_id=user_id)
+    comments = Q(comment__user_id=user_id) | Q(comment__article__user_id=user_id)
+
+    return (
+        ('notifications', Notification.objects.filter(
+            Q(receiver_id=user_id) | Q(sender_id=user_id) | Q(user_id=user_id)
+            | articles | comments
+        ), None),
+        ('reports', Report.objects.filter(
+            Q(reported_by_id=user_id) | Q(user_id=user_id) | articles | comments
+        ), None),
+        ('comment_votes', CommentVote.objects.filter(Q(user_id=user_id) | comments), None),
+        ('comments', Comment.objects.filter(Q(user_id=user_id) | articles), None),
+        ('likes', ArticleLike.objects.filter(Q(user_id=user_id) | articles), None),
+        # Other users' saves of the user's articles leave tombstones for their clients.
+        ('saved_articles', SavedArticle.objects.filter(Q(user_id=user_id) | articles),
+         tombstone_saves),
+        ('unsaved_articles', UnsavedArticle.objects.filter(user_id=user_id), None),
+        ('article_tags', Article.tags.through.objects.filter(articles), None),
+        ('article_bodies', ArticleBody.objects.filter(articles), None),
+        ('draft_patches', DraftPatch.objects.filter(articles), None),
+        ('article_revisions', ArticleRevision.objects.filter(articles), None),
+        ('related_articles', RelatedArticle.objects.filter(
+            articles | Q(related__user_id=user_id)
+        ), None),
+        ('trending_scores', TrendingScore.objects.filter(articles), None),
+        ('reader_sketches', ArticleReaderSketch.objects.filter(articles), None),
+        ('article_stats', ArticleDailyStats.objects.filter(articles), None),
+        ('article_redirects', ArticleSlugRedirect.objects.filter(articles), None),
+        ('articles', Article._base_manager.filter(user_id=user_id), None),
+        ('following', UserFollowing.objects.filter(user_follows_id=user_id),
+         decrement_followers),
+        ('followers', UserFollowing.objects.filter(user_followed_id=user_id),
+         decrement_following),
+        ('follow_suggestions', FollowSuggestion.objects.filter(
+            Q(user_id=user_id) | Q(suggested_id=user_id)
+        ), None),
+        ('followed_tags', Tag.followers.through.objects.filter(user_id=user_id), None),
+        ('user_redirects', UserSlugRedirect.objects.filter(user_id=user_id), None),
+        ('author_stats', AuthorDailyStats.objects.filter(user_id=user_id), None),
+        ('user', User.objects.filter(pk=user_id), None),
+    )
+
+
+def request_account_deletion(user):
+    """ Deactivates the user at once and queues the deletion of the account. """
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        user.is_active = False
+
+        deletion, _ = AccountDeletion.objects.get_or_create(
+            user_id=user.pk,
+            defaults={'username': user.username}
+        )
+
+    return deletion
+
+
+def delete_in_chunks(deletion, queryset, callback=None, chunk_size=DELETE_CHUNK_SIZE):
+    """ Deletes the rows of the queryset, one short transaction per chunk. """
+    model = queryset.model
+    deleted = 0
+
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.order_by('-pk').values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return deleted
+
+            if callback:
+                callback(pks)
+
+            count, _ = model._base_manager.filter(pk__in=pks).delete()
+            deleted += count
+
+            AccountDeletion.objects.filter(pk=deletion.pk).update(
+                deleted_rows=F('deleted_rows') + count
+            )
+
+
+def delete_account(deletion, chunk_size=DELETE_CHUNK_SIZE, stdout=None):
+    """ Runs (or resumes) the deletion, returns the number of rows deleted by this run. """
+    steps = deletion_steps(deletion.user_id)
+    names = [name for name, _, _ in steps]
+    start = names.index(deletion.step) if deletion.step in names else 0
+
+    deleted = 0
+    for name, queryset, callback in steps[start:]:
+        AccountDeletion.objects.filter(pk=deletion.pk).update(step=name)
+
+        count = delete_in_chunks(deletion, queryset, callback, chunk_size)
+        deleted += count
+
+        if stdout and count:
+            stdout.write(f'{deletion}: {count} rows deleted from {name}.')
+
+    AccountDeletion.objects.filter(pk=deletion.pk).update(step='', finished_at=timezone.now())
+
+    return deleted
+
+
+def delete_pending_accounts(chunk_size=DELETE_CHUNK_SIZE, stdout=None):
+    """ Deletes every account waiting for deletion, returns the number of accounts deleted. """
+    pending = AccountDeletion.objects.filter(finished_at__isnull=True).order_by('requested_at')
+    total = 0
+
+    for deletion in pending.iterator():
+        delete_account(deletion, chunk_size, stdout)
+        total += 1
+
+    return total
@@ -0,0 +1,84 @@
+"""
+Streaming export of everything stored about a user.
+
+The export is NDJSON, one ``{"type": ..., "data": {...}}`` record per line.
+Every table is read with a server-side cursor (QuerySet.iterator), so only
+EXPORT_CHUNK_SIZE rows are held in memory at a time however big the account is.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from articles.models import Article, ArticleLike, Comment, CommentVote
+from notifications.models import Notification
+
+from .models import UserFollowing, SavedArticle
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_tables(user):
+    """ Returns (type, queryset of dicts) for every table of the export, in order. """
+    ArticleTags = Article.tags.through
+
+    return (
+        ('article', Article._all_articles.filter(user=user).order_by('id').values(
+            'id', 'title', 'slug', 'draft', 'created_at', 'updated_at',
+            content=F('body__content')
+        )),
+        ('article_tag', ArticleTags.objects.filter(article__user=user).order_by('id').values(
+            'article_id', tag_slug=F('tag__slug')
+        )),
+        ('comment', Comment.objects.filter(user=user).order_by('id').values(
+            'id', 'body', 'parent_id', 'created_at', 'updated_at',
+            article_slug=F('article__slug')
+        )),
+        ('like', ArticleLike.objects.filter(user=user).order_by('id').values(
+            'special_like', article_slug=F('article__slug')
+        )),
+        ('comment_vote', CommentVote.objects.filter(user=user).order_by('id').values(
+            'comment_id', 'downvote'
+        )),
+        ('saved_article', SavedArticle.objects.filter(user=user).order_by('id').values(
+            'saved_at', article_slug=F('article__slug')
+        )),
+        ('following', UserFollowing.objects.filter(user_follows=user).order_by('id').values(
+            'created', user_slug=F('user_followed__slug')
+        )),
+        ('follower', UserFollowing.objects.filter(user_followed=user).order_by('id').values(
+            'created', user_slug=F('user_follows__slug')
+        )),
+        ('notification', Notification.objects.filter(receiver=user).order_by('id').values(
+            'action', 'comment_id', 'preview_text', 'seen', 'created_at',
+            sender_slug=F('sender__slug'),
+            article_slug=F('article__slug'),
+            user_slug=F('user__slug')
+        )),
+    )
+
+
+def profile(user):
+    return {
+        'username': user.username,
+        'email': user.email,
+        'display_name': user.display_name,
+        'description': user.description,
+        'slug': user.slug,
+        'avatar': user.avatar.name,
+        'date_joined': user.date_joined,
+    }
+
+
+def record(record_type, data):
+    return json.dumps({'type': record_type, 'data': data}, cls=DjangoJSONEncoder) + '\n'
+
+
+def export_user_data(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """ Yields the NDJSON lines of the user's export. """
+    yield record('profile', profile(user))
+
+    for record_type, queryset in export_tables(user):
+        for row in queryset.iterator(chunk_size=chunk_size):
+            yield record(record_type, row)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users.recommendations import compute_follow_suggestions, TOP_K
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the "who to follow" suggestions for all users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K,
+                            help='Number of suggestions stored per user.')
+
+    def handle(self, *args, **options):
+        total = compute_follow_suggestions(top_k=options['top_k'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Stored {total} follow suggestions.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users.deletion import delete_pending_accounts, DELETE_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Deletes the accounts of the users who asked for it, in small chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DELETE_CHUNK_SIZE,
+                            help='Number of rows deleted per transaction.')
+
+    def handle(self, *args, **options):
+        total = delete_pending_accounts(chunk_size=options['chunk_size'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} accounts.'))
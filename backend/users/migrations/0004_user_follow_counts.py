@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserFollowing = apps.get_model('users', 'UserFollowing')
+
+    def count_subquery(field):
+        return Coalesce(Subquery(
+            UserFollowing.objects.filter(**{field: OuterRef('pk')})
+                                 .order_by()
+                                 .values(field)
+                                 .annotate(count=Count('pk'))
+                                 .values('count'),
+            output_field=IntegerField()
+        ), 0)
+
+    User.objects.update(
+        followers_count=count_subquery('user_followed'),
+        following_count=count_subquery('user_follows')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auto_20210228_2253'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
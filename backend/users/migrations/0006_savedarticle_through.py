@@ -0,0 +1,72 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_unique_comment_vote'),
+        ('users', '0005_followsuggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnsavedArticle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article_id', models.IntegerField()),
+                ('unsaved_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        # The existing auto created table (id, user_id, article_id) becomes
+        # the table of SavedArticle, only the saved_at column is new.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='SavedArticle',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='articles.article')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'users_user_saved_articles',
+                        'unique_together': {('user', 'article')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='user',
+                    name='saved_articles',
+                    field=models.ManyToManyField(blank=True, related_name='saves', through='users.SavedArticle', to='articles.Article'),
+                ),
+            ],
+        ),
+        # The existing saves are left without a time rather than all dated to the migration.
+        migrations.AddField(
+            model_name='savedarticle',
+            name='saved_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='savedarticle',
+            name='saved_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='unsavedarticle',
+            index=models.Index(fields=['user', 'unsaved_at'], name='unsaved_article_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='unsavedarticle',
+            constraint=models.UniqueConstraint(fields=('user', 'article_id'), name='unique_unsaved_article'),
+        ),
+        migrations.AddIndex(
+            model_name='savedarticle',
+            index=models.Index(fields=['user', '-id'], name='saved_article_user_idx'),
+        ),
+    ]
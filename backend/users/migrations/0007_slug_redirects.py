@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:00
+
+import cod.fields
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_savedarticle_through'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='slug',
+            field=cod.fields.SourceSlugField(default=None, editable=False, null=True, populate_from='username', unique=True),
+        ),
+        migrations.CreateModel(
+            name='UserSlugRedirect',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_slug', models.SlugField(max_length=60, unique=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slug_redirects', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_slug_redirects'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.PositiveIntegerField(unique=True)),
+                ('username', models.CharField(max_length=30)),
+                ('step', models.CharField(blank=True, default='', max_length=40)),
+                ('deleted_rows', models.PositiveIntegerField(default=0)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_accountdeletion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='savedarticle',
+            index=models.Index(fields=['saved_at'], name='saved_article_saved_at_idx'),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import AbstractBaseUser
 from django.urls import reverse
+from django.utils import timezone
 
-from autoslug import AutoSlugField
+from cod.fields import SourceSlugField
 
 from .managers import MyUserManager
 
@@ -24,25 +26,139 @@ class UserFollowing(models.Model):
         return f'{self.user_follows} follows {self.user_followed}'
 
 
+class SavedArticle(models.Model):
+    """ Through model of User.saved_articles, records when the article was saved. """
+    user = models.ForeignKey('User', on_delete=models.CASCADE)
+    article = models.ForeignKey('articles.Article', on_delete=models.CASCADE)
+    # Null for the saves made before it was recorded.
+    saved_at = models.DateTimeField(default=timezone.now, null=True)
+
+    class Meta:
+        # The table of the auto created through model this replaced.
+        db_table = 'users_user_saved_articles'
+        unique_together = [['user', 'article']]
+        indexes = [
+            models.Index(fields=['user', '-id'], name='saved_article_user_idx'),
+            models.Index(fields=['saved_at'], name='saved_article_saved_at_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.user} saved {self.article}'
+
+
+class UnsavedArticle(models.Model):
+    """
+    Tombstone of an unsaved article, lets clients sync unsaves since their last sync.
+    Removed again if the article is saved again.
+    """
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='+')
+    # Not a foreign key so that the tombstone outlives the article.
+    article_id = models.IntegerField()
+    unsaved_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'article_id'],
+                name='unique_unsaved_article'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user', 'unsaved_at'], name='unsaved_article_user_idx')
+        ]
+
+    @classmethod
+    def record_removed(cls, saves):
+        """
+        Writes the tombstones of SavedArticle rows that are about to be deleted
+        without an unsave, e.g. because the article is deleted.
+        """
+        now = timezone.now()
+
+        cls.objects.bulk_create([
+            cls(user_id=user_id, article_id=article_id, unsaved_at=now)
+            for user_id, article_id in saves.values_list('user_id', 'article_id')
+        ], ignore_conflicts=True)
+
+    def __str__(self):
+        return f'{self.user} unsaved {self.article_id}'
+
+
+class FollowSuggestion(models.Model):
+    """
+    A precomputed "who to follow" suggestion.
+    These are (re)generated in batch by the compute_follow_suggestions command.
+    """
+    user = models.ForeignKey('User', related_name='follow_suggestions', on_delete=models.CASCADE)
+    suggested = models.ForeignKey('User', related_name='+', on_delete=models.CASCADE)
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'suggested'],
+                name='unique_follow_suggestion'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user', '-score'], name='follow_suggestion_rank_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.suggested} suggested to {self.user}'
+
+
+class UserSlugRedirect(models.Model):
+    """ A slug the user had before their username changed. """
+    old_slug = models.SlugField(max_length=60, unique=True)
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='slug_redirects')
+
+    def __str__(self):
+        return f'{self.old_slug} -> {self.user_id}'
+
+
+class AccountDeletion(models.Model):
+    """
+    Progress of the background deletion of a deactivated account, see users.deletion.
+    Outlives the user, so user_id isn't a foreign key.
+    """
+    user_id = models.PositiveIntegerField(unique=True)
+    username = models.CharField(max_length=30)
+
+    # The step being worked on, a deletion resumes from it after an interruption.
+    step = models.CharField(max_length=40, blank=True, default='')
+    deleted_rows = models.PositiveIntegerField(default=0)
+
+    requested_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    def __str__(self):
+        return f'Deletion of {self.username}'
+
+
 class User(AbstractBaseUser):
     email = models.EmailField(verbose_name='email', max_length=60, unique=True)
     username = models.CharField(max_length=30, unique=True)
     display_name = models.CharField(max_length=30, blank=True, null=True)
     description = models.CharField(max_length=150, blank=True, null=True)
 
-    slug = AutoSlugField(
+    slug = SourceSlugField(
         null=True,
         default=None,
         unique=True,
-        populate_from='username',
-        always_update=True
+        populate_from='username'
     )
 
     avatar = models.ImageField(upload_to='uploads/avatars',
                                default='uploads/avatars/default_avatar.png')
 
     saved_articles = models.ManyToManyField('articles.Article', related_name='saves',
-                                            blank=True)
+                                            blank=True, through='SavedArticle')
+
+    # Denormalized follow counts, maintained by follow() & unfollow() so that
+    # profiles don't have to count (or serialize) the whole follow graph.
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     date_joined = models.DateField(verbose_name='date joined', auto_now_add=True)
 
@@ -78,12 +194,39 @@ class User(AbstractBaseUser):
             default_avatar_path = User._meta.get_field('avatar').get_default()
             self.avatar = default_avatar_path
 
+        adding = self._state.adding
+        old_slug = self.slug
+
         super(User, self).save(*args, **kwargs)
 
+        if old_slug and old_slug != self.slug:
+            # Keeps the old profile URLs working, see UserListRetrieveViewSet.retrieve.
+            UserSlugRedirect.objects.update_or_create(old_slug=old_slug,
+                                                      defaults={'user': self})
+
+        if adding or old_slug != self.slug:
+            UserSlugRedirect.objects.filter(old_slug=self.slug).delete()
+
     @property
     def reports_count(self):
         return self.reports.count()
 
+    def save_article(self, article):
+        """ Saves the given article & removes the unsave tombstone, if any. """
+        with transaction.atomic():
+            self.saved_articles.add(article)
+            UnsavedArticle.objects.filter(user=self, article_id=article.id).delete()
+
+    def unsave_article(self, article):
+        """ Unsaves the given article & records it for syncing clients. """
+        with transaction.atomic():
+            self.saved_articles.remove(article)
+            UnsavedArticle.objects.update_or_create(
+                user=self,
+                article_id=article.id,
+                defaults={'unsaved_at': timezone.now()}
+            )
+
     def get_all_notifications(self):
         return self.notifications.all()
 
@@ -108,10 +251,16 @@ class User(AbstractBaseUser):
         -- Params --
         user_to_follow: The user to follow.
         """
-        UserFollowing.objects.create(
-            user_follows=self,
-            user_followed=user_to_follow
-        )
+        with transaction.atomic():
+            UserFollowing.objects.create(
+                user_follows=self,
+                user_followed=user_to_follow
+            )
+
+            User.objects.filter(pk=self.pk).update(following_count=F('following_count') + 1)
+            User.objects.filter(pk=user_to_follow.pk).update(
+                followers_count=F('followers_count') + 1
+            )
 
     def unfollow(self, user_to_unfollow):
         """
@@ -120,14 +269,23 @@ class User(AbstractBaseUser):
         -- Params --
         user_to_unfollow: The user to unfollow.
         """
-        follow_obj = UserFollowing.objects.filter(user_followed=user_to_unfollow)
+        with transaction.atomic():
+            deleted, _ = UserFollowing.objects.filter(
+                user_follows=self,
+                user_followed=user_to_unfollow
+            ).delete()
 
-        if follow_obj:
-            user_to_unfollow.delete()
-            return True
+            if not deleted:
+                return False
 
-        else:
-            return False
+            User.objects.filter(pk=self.pk, following_count__gt=0).update(
+                following_count=F('following_count') - 1
+            )
+            User.objects.filter(pk=user_to_unfollow.pk, followers_count__gt=0).update(
+                followers_count=F('followers_count') - 1
+            )
+
+        return True
 
     def get_absolute_url(self):
         return reverse('user-detail', kwargs={'slug': self.slug})
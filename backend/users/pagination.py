@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FollowPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created', '-id',)
+
+
+class ReadingListPagination(CursorPagination):
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # The ids follow the order of the saves, the saves made before
+    # saved_at was recorded don't have one to sort on.
+    ordering = ('-id',)
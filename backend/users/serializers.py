@@ -5,7 +5,9 @@ from django.contrib.auth import password_validation
 from rest_framework import serializers
 from rest_framework.validators import ValidationError
 
-from .models import User, UserFollowing
+from articles.serializers.feed_serializers import ArticleFeedSerializer
+
+from .models import User, UserFollowing, FollowSuggestion, SavedArticle
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -50,52 +52,47 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
 
 class FollowingSerializer(serializers.ModelSerializer):
-    display_name = serializers.SerializerMethodField()
-    slug = serializers.SerializerMethodField()
+    display_name = serializers.ReadOnlyField(source='user_followed.display_name')
+    slug = serializers.ReadOnlyField(source='user_followed.slug')
 
     class Meta:
         model = UserFollowing
-        fields = ('id', 'slug', 'display_name',)
-
-    def get_display_name(self, obj):
-        return obj.user_followed.display_name
-
-    def get_slug(self, obj):
-        return obj.user_followed.slug
+        fields = ('id', 'slug', 'display_name', 'created',)
 
 
 class FollowersSerializer(serializers.ModelSerializer):
-    display_name = serializers.SerializerMethodField()
-    slug = serializers.SerializerMethodField()
+    display_name = serializers.ReadOnlyField(source='user_follows.display_name')
+    slug = serializers.ReadOnlyField(source='user_follows.slug')
 
     class Meta:
         model = UserFollowing
-        fields = ('id', 'slug', 'display_name',)
-
-    def get_display_name(self, obj):
-        return obj.user_follows.display_name
-
-    def get_slug(self, obj):
-        return obj.user_follows.slug
+        fields = ('id', 'slug', 'display_name', 'created',)
 
 
 class UserSerializer(serializers.ModelSerializer):
-    following = serializers.SerializerMethodField()
-    followers = serializers.SerializerMethodField()
-
     class Meta:
         model = User
         fields = ('username', 'display_name', 'description', 'avatar',
-                  'date_joined', 'slug', 'followers', 'following',)
+                  'date_joined', 'slug', 'followers_count', 'following_count',)
         lookup_field = 'slug'
 
-    def get_following(self, obj):
-        # Add count
-        return FollowingSerializer(obj.following.all(), many=True).data
 
-    def get_followers(self, obj):
-        # Add count
-        return FollowersSerializer(obj.followers.all(), many=True).data
+class FollowSuggestionSerializer(serializers.ModelSerializer):
+    display_name = serializers.ReadOnlyField(source='suggested.display_name')
+    slug = serializers.ReadOnlyField(source='suggested.slug')
+    avatar = serializers.ImageField(source='suggested.avatar', read_only=True)
+
+    class Meta:
+        model = FollowSuggestion
+        fields = ('slug', 'display_name', 'avatar', 'score',)
+
+
+class SavedArticleSerializer(serializers.ModelSerializer):
+    article = ArticleFeedSerializer(read_only=True)
+
+    class Meta:
+        model = SavedArticle
+        fields = ('saved_at', 'article',)
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
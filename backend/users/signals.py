@@ -1,9 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 
+from articles.models import Article
 from notifications.models import Notification
 
-from .models import UserFollowing
+from .models import UserFollowing, SavedArticle, UnsavedArticle
 
 
 @receiver(post_save, sender=UserFollowing)
@@ -13,3 +14,9 @@ def send_follow_notification(sender, instance, **kwargs):
         action=Notification.FOLLOW,
         user=instance.user_followed
     )
+
+
+@receiver(pre_delete, sender=Article)
+def tombstone_saves_of_deleted_article(sender, instance, **kwargs):
+    """ Syncing clients learn that the article left the reading lists it was on. """
+    UnsavedArticle.record_removed(SavedArticle.objects.filter(article=instance))
@@ -0,0 +1,13 @@
+from taskqueue.registry import task
+
+from .deletion import delete_account as run_deletion
+from .models import AccountDeletion
+
+
+@task(max_retries=5)
+def delete_account(deletion_id):
+    """ Deletes the account of a deactivated user, resuming an interrupted deletion. """
+    deletion = AccountDeletion.objects.filter(pk=deletion_id, finished_at__isnull=True).first()
+
+    if deletion is not None:
+        run_deletion(deletion)
@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from articles.models import Article, ArticleLike, Comment, CommentVote, Tag
+from moderation.models import Report
+from notifications.models import Notification
+
+from ..deletion import request_account_deletion, delete_account, delete_pending_accounts
+from ..models import AccountDeletion, UserFollowing, UnsavedArticle
+
+User = get_user_model()
+
+
+class AccountDeletionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@gmail.com',
+            password='12345'
+        )
+
+        self.user_2 = User.objects.create_user(
+            username='testuser_2',
+            email='test_2@gmail.com',
+            password='12345'
+        )
+
+        tag = Tag.objects.create(name='python')
+        tag.followers.add(self.user)
+
+        self.articles = [
+            Article.objects.create(title=f'article {i}', content='content', user=self.user)
+            for i in range(3)
+        ]
+        self.article_2 = Article.objects.create(title='other', content='content',
+                                                user=self.user_2)
+
+        comment = Comment.objects.create(body='comment', article=self.articles[0],
+                                         user=self.user_2)
+        Comment.objects.create(body='reply', article=self.article_2, user=self.user)
+        CommentVote.objects.create(user=self.user, comment=comment)
+        ArticleLike.objects.create(user=self.user_2, article=self.articles[1])
+        Report.objects.create(reason=Report.OTHER, article=self.article_2,
+                              reported_by=self.user)
+
+        self.user.follow(self.user_2)
+        self.user_2.follow(self.user)
+        self.user_2.save_article(self.articles[2])
+
+    def test_request_deactivates(self):
+        """ The account is deactivated right away but nothing is deleted yet. """
+        deletion = request_account_deletion(self.user)
+
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        self.assertEqual(deletion.user_id, self.user.pk)
+        self.assertIsNone(deletion.finished_at)
+        self.assertEqual(Article._all_articles.filter(user=self.user).count(), 3)
+
+    def test_delete_account(self):
+        """ Deletes everything the user owns or that depends on it, in small chunks. """
+        deletion = request_account_deletion(self.user)
+
+        self.assertTrue(delete_account(deletion, chunk_size=2) > 0)
+
+        deletion.refresh_from_db()
+        self.assertIsNotNone(deletion.finished_at)
+        self.assertEqual(deletion.step, '')
+        self.assertTrue(deletion.deleted_rows > 0)
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Article._all_articles.filter(user_id=self.user.pk).exists())
+        self.assertFalse(Comment.objects.filter(article__user_id=self.user.pk).exists())
+        self.assertFalse(Report.objects.exists())
+        self.assertFalse(ArticleLike.objects.exists())
+        self.assertFalse(CommentVote.objects.exists())
+        self.assertFalse(UserFollowing.objects.exists())
+        self.assertFalse(Notification.objects.filter(receiver_id=self.user.pk).exists())
+
+        user_2 = User.objects.get(pk=self.user_2.pk)
+        self.assertEqual(user_2.followers_count, 0)
+        self.assertEqual(user_2.following_count, 0)
+        self.assertTrue(Article.objects.filter(pk=self.article_2.pk).exists())
+
+        # user_2's saved article is gone, their clients sync it away.
+        self.assertTrue(
+            UnsavedArticle.objects.filter(user=self.user_2, article_id=self.articles[2].pk).exists()
+        )
+
+    def test_resume(self):
+        """ An interrupted deletion continues from the step it was at. """
+        deletion = request_account_deletion(self.user)
+        AccountDeletion.objects.filter(pk=deletion.pk).update(step='articles')
+        deletion.refresh_from_db()
+
+        delete_account(deletion)
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_delete_pending_accounts(self):
+        """ Only the unfinished deletions are run. """
+        request_account_deletion(self.user)
+
+        self.assertEqual(delete_pending_accounts(), 1)
+        self.assertEqual(delete_pending_accounts(), 0)
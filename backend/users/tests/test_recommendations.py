@@ -0,0 +1,64 @@
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from articles.models import Tag
+
+from ..models import FollowSuggestion
+from ..recommendations import compute_follow_suggestions
+
+User = get_user_model()
+
+
+class FollowSuggestionsTest(APITestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'testuser_{i}',
+                email=f'test_{i}@gmail.com',
+                password='12345'
+            )
+            for i in range(4)
+        ]
+
+        # 0 -> 1 -> 2 and 0 -> 1 -> 3, 3 shares a tag with 0.
+        self.users[0].follow(self.users[1])
+        self.users[1].follow(self.users[2])
+        self.users[1].follow(self.users[3])
+
+        tag = Tag.objects.create(name='python')
+        tag.followers.add(self.users[0], self.users[3])
+
+    def test_compute_suggestions(self):
+        """ Suggests friends of friends, ranked by shared followed tags. """
+        compute_follow_suggestions()
+
+        suggestions = FollowSuggestion.objects.filter(user=self.users[0]).order_by('-score')
+
+        self.assertEqual(
+            [suggestion.suggested for suggestion in suggestions],
+            [self.users[3], self.users[2]]
+        )
+        self.assertEqual(suggestions[0].score, 1.5)
+
+    def test_recompute_replaces_suggestions(self):
+        """ Running the job twice doesn't duplicate suggestions. """
+        compute_follow_suggestions()
+        compute_follow_suggestions()
+
+        self.assertEqual(FollowSuggestion.objects.filter(user=self.users[0]).count(), 2)
+
+    def test_list_suggestions(self):
+        """ Lists the suggestions, without users that have been followed since. """
+        compute_follow_suggestions()
+        self.users[0].follow(self.users[2])
+
+        url = reverse('user-suggestions')
+
+        self.client.force_authenticate(self.users[0])
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([s['slug'] for s in response.json()], [self.users[3].slug])
@@ -1,4 +1,6 @@
+import json
 import os
+from unittest import mock
 
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -9,7 +11,11 @@ from rest_framework.authtoken.models import Token
 
 import faker
 
-from ..models import UserFollowing
+from articles.models import Article
+from taskqueue.worker import run_pending
+
+from ..models import UserFollowing, UnsavedArticle
+from ..views import ReadingListView
 
 
 fake = faker.Faker('en')
@@ -262,6 +268,19 @@ class UserViewsTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.json()['username'], self.users[0].username)
 
+    def test_retrieve_user_old_slug(self):
+        """ Redirects the old slug of a renamed user to the current one. """
+        user = self.users[0]
+        old_slug = user.slug
+
+        user.username = 'renamed'
+        user.save()
+
+        response = self.client.get(reverse('user-detail', kwargs={'slug': old_slug}))
+
+        self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertEqual(response['Location'], reverse('user-detail', kwargs={'slug': 'renamed'}))
+
     def test_delete_user(self):
         """ Tests if the user delete endpoint works """
         url = reverse('user-delete')
@@ -271,7 +290,13 @@ class UserViewsTest(APITestCase):
         self.client.force_authenticate(user)
         response = self.client.delete(url, format='json')
 
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(User.objects.get(pk=user.id).is_active)
+
+        response = self.client.get(reverse('user-detail', kwargs={'slug': user.slug}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        run_pending()
         self.assertFalse(User.objects.filter(pk=user.id).exists())
 
     def test_update_user_profile(self):
@@ -349,9 +374,12 @@ class FollowViewsTest(APITestCase):
         self.assertEqual(UserFollowing.objects.get().user_follows, self.user)
         self.assertEqual(UserFollowing.objects.get().user_followed, self.user_2)
 
+        self.assertEqual(User.objects.get(pk=self.user.id).following_count, 1)
+        self.assertEqual(User.objects.get(pk=self.user_2.id).followers_count, 1)
+
     def test_unfollow_user(self):
         """ Unfollows a user. """
-        self.follow_obj.save()
+        self.user.follow(self.user_2)
         url = reverse('user-unfollow', kwargs={'slug': self.user_2.slug})
 
         self.client.force_authenticate(self.user)
@@ -360,6 +388,44 @@ class FollowViewsTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
         self.assertEqual(UserFollowing.objects.count(), 0)
+        self.assertTrue(User.objects.filter(pk=self.user_2.id).exists())
+
+        self.assertEqual(User.objects.get(pk=self.user.id).following_count, 0)
+        self.assertEqual(User.objects.get(pk=self.user_2.id).followers_count, 0)
+
+    def test_list_followers(self):
+        """ Lists the followers of a user, paginated with a cursor. """
+        self.user.follow(self.user_2)
+        url = reverse('user-followers', kwargs={'slug': self.user_2.slug})
+
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('next', response.json())
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(response.json()['results'][0]['slug'], self.user.slug)
+
+    def test_list_following(self):
+        """ Lists the users a user is following, paginated with a cursor. """
+        self.user.follow(self.user_2)
+        url = reverse('user-following', kwargs={'slug': self.user.slug})
+
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(response.json()['results'][0]['slug'], self.user_2.slug)
+
+    def test_profile_embeds_follow_counts(self):
+        """ The profile only contains the follow counts, not the follow graph. """
+        self.user.follow(self.user_2)
+        url = reverse('user-detail', kwargs={'slug': self.user_2.slug})
+
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.json()['followers_count'], 1)
+        self.assertEqual(response.json()['following_count'], 0)
+        self.assertNotIn('followers', response.json())
 
     def test_follow_self(self):
         """ Throws and error because you can't follow yourself. """
@@ -456,3 +522,185 @@ class FollowViewsTest(APITestCase):
             response.json(),
             {'detail': 'Authentication credentials were not provided.'}
         )
+
+
+class ReadingListViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username=fake.first_name(),
+            email=fake.email(),
+            password=fake.password()
+        )
+
+        self.user_2 = User.objects.create_user(
+            username=fake.first_name(),
+            email=fake.email(),
+            password=fake.password()
+        )
+
+        self.articles = [
+            Article.objects.create(title=fake.sentence(), content='a', user=self.user_2)
+            for _ in range(3)
+        ]
+
+        self.url = reverse('user-saved-articles')
+
+    def test_reading_list(self):
+        """ Lists the saved articles, most recently saved first. """
+        for article in self.articles:
+            self.user.save_article(article)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [saved['article']['slug'] for saved in response.json()['results']],
+            [article.slug for article in reversed(self.articles)]
+        )
+        self.assertIn('sync_token', response.json())
+
+    def test_reading_list_since(self):
+        """ Only returns the saves & unsaves made after the sync token was issued. """
+        self.user.save_article(self.articles[0])
+        self.user.save_article(self.articles[1])
+
+        self.client.force_authenticate(self.user)
+        sync_token = self.client.get(self.url, format='json').json()['sync_token']
+
+        self.user.unsave_article(self.articles[0])
+        self.user.save_article(self.articles[2])
+
+        response = self.client.get(self.url, {'since': sync_token}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Changes within the token's slack are returned again, saving twice is harmless.
+        self.assertEqual(
+            {saved['article']['slug'] for saved in response.json()['saved']},
+            {article.slug for article in self.articles[1:]}
+        )
+        self.assertEqual(response.json()['unsaved'], [self.articles[0].id])
+
+    def test_reading_list_since_deleted_article(self):
+        """ A deleted saved article is synced as unsaved. """
+        self.user.save_article(self.articles[0])
+
+        self.client.force_authenticate(self.user)
+        sync_token = self.client.get(self.url, format='json').json()['sync_token']
+
+        article_id = self.articles[0].id
+        Article._all_articles.filter(pk=article_id).delete()
+
+        response = self.client.get(self.url, {'since': sync_token}, format='json')
+
+        self.assertEqual(response.json()['unsaved'], [article_id])
+
+    def test_reading_list_since_paginated(self):
+        """ The changes are paginated, the unsaves & the next token come with the last page. """
+        self.client.force_authenticate(self.user)
+        sync_token = self.client.get(self.url, format='json').json()['sync_token']
+
+        for article in self.articles:
+            self.user.save_article(article)
+        self.user.unsave_article(self.articles[0])
+
+        late = Article.objects.create(title='late', content='content', user=self.user_2)
+
+        response = self.client.get(self.url, {'since': sync_token, 'page_size': 1})
+        pages = [response.json()]
+
+        while pages[-1]['next']:
+            self.assertIsNone(pages[-1]['sync_token'])
+            # Saves made while paging are left to the next sync.
+            self.user.save_article(late)
+
+            pages.append(self.client.get(pages[-1]['next']).json())
+
+        self.assertEqual(
+            [saved['article']['slug'] for page in pages for saved in page['saved']],
+            [article.slug for article in reversed(self.articles[1:])]
+        )
+        self.assertEqual(pages[-1]['unsaved'], [self.articles[0].id])
+        self.assertIsNotNone(pages[-1]['sync_token'])
+
+    def test_reading_list_since_too_many_changes(self):
+        """ Responds with 410 so that the client syncs the whole list again. """
+        self.client.force_authenticate(self.user)
+        sync_token = self.client.get(self.url, format='json').json()['sync_token']
+
+        for article in self.articles:
+            self.user.save_article(article)
+            self.user.unsave_article(article)
+
+        with mock.patch.object(ReadingListView, 'MAX_SYNC_UNSAVED', 2):
+            response = self.client.get(self.url, {'since': sync_token})
+
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_save_removes_tombstone(self):
+        """ Saving an article again removes it from the unsaved articles. """
+        self.user.save_article(self.articles[0])
+        self.user.unsave_article(self.articles[0])
+        self.user.save_article(self.articles[0])
+
+        self.assertFalse(UnsavedArticle.objects.filter(user=self.user).exists())
+
+    def test_reading_list_invalid_token(self):
+        """ Responds with 400 because the sync token can't be parsed. """
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {'since': 'yesterday'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {'since': '2024-13-45T00:00:00'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reading_list_unauthenticated(self):
+        """ Responds with 401 Unauthorized because the user isn't logged in."""
+        response = self.client.get(self.url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class UserDataExportViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username=fake.first_name(),
+            email=fake.email(),
+            password=fake.password()
+        )
+
+        self.user_2 = User.objects.create_user(
+            username=fake.first_name(),
+            email=fake.email(),
+            password=fake.password()
+        )
+
+        self.article = Article.objects.create(title='exported', content='body', user=self.user)
+        self.user.follow(self.user_2)
+        self.user_2.save_article(self.article)
+
+        self.url = reverse('user-export')
+
+    def test_export(self):
+        """ Streams the user's data as one JSON record per line. """
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        types = [record['type'] for record in records]
+
+        self.assertEqual(types, ['profile', 'article', 'following'])
+        self.assertEqual(records[0]['data']['username'], self.user.username)
+        self.assertEqual(records[1]['data']['content'], 'body')
+        self.assertEqual(records[2]['data']['user_slug'], self.user_2.slug)
+
+    def test_export_unauthenticated(self):
+        """ Responds with 401 Unauthorized because the user isn't logged in."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -6,7 +6,12 @@ from .views import (UserListRetrieveViewSet,
                     UserDestroyView,
                     UserProfileUpdateView,
                     FollowUserView,
-                    UnfollowUserView)
+                    UnfollowUserView,
+                    UserFollowersView,
+                    UserFollowingView,
+                    FollowSuggestionsView,
+                    ReadingListView,
+                    UserDataExportView)
 
 
 router = routers.SimpleRouter()
@@ -19,7 +24,17 @@ urlpatterns = [
     path('users/delete/', UserDestroyView.as_view(), name='user-delete'),
     # Update profile (update view for display_name, description and avatar)
     path('users/profile/', UserProfileUpdateView.as_view(), name="user-profile-update"),
+    # "Who to follow" suggestions for the logged in user
+    path('users/suggestions/', FollowSuggestionsView.as_view(), name="user-suggestions"),
+
+    # Everything stored about the logged in user
+    path('users/export/', UserDataExportView.as_view(), name="user-export"),
+    # Reading list of the logged in user
+    path('users/saved/', ReadingListView.as_view(), name="user-saved-articles"),
 
     path('users/<str:slug>/follow', FollowUserView.as_view(), name="user-follow"),
-    path('users/<str:slug>/unfollow', UnfollowUserView.as_view(), name="user-unfollow")
+    path('users/<str:slug>/unfollow', UnfollowUserView.as_view(), name="user-unfollow"),
+
+    path('users/<str:slug>/followers/', UserFollowersView.as_view(), name="user-followers"),
+    path('users/<str:slug>/following/', UserFollowingView.as_view(), name="user-following"),
 ] + router.urls
@@ -1,12 +1,32 @@
+from datetime import timedelta
+
 from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from rest_framework import status, viewsets, mixins, generics, exceptions, views
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import (User, UserFollowing, FollowSuggestion, SavedArticle, UnsavedArticle,
+                     UserSlugRedirect)
+from .serializers import (UserSerializer, UserProfileSerializer,
+                          FollowersSerializer, FollowingSerializer,
+                          FollowSuggestionSerializer, SavedArticleSerializer)
+from .pagination import FollowPagination, ReadingListPagination
+from .export import export_user_data
+from .deletion import request_account_deletion
+from .tasks import delete_account
+
 
-from .models import User
-from .serializers import UserSerializer, UserProfileSerializer
+# Saves & unsaves committed by transactions that started slightly before a sync
+# can become visible after it, the sync token is moved back by this much to
+# catch them. Clients may receive a few changes twice, applying them is idempotent.
+SYNC_TOKEN_SLACK = timedelta(seconds=5)
 
 
 class UserListRetrieveViewSet(viewsets.GenericViewSet,
@@ -21,7 +41,8 @@ class UserListRetrieveViewSet(viewsets.GenericViewSet,
         Filters the queryset by:
             q - filters users by username and display name, icontains (case insensitve, contains)
         """
-        queryset = User.objects.all()
+        # Accounts waiting for deletion are hidden right away.
+        queryset = User.objects.filter(is_active=True)
         q = self.request.query_params.get('q', None)
 
         if q:
@@ -31,9 +52,29 @@ class UserListRetrieveViewSet(viewsets.GenericViewSet,
 
         return queryset
 
+    def retrieve(self, request, *args, **kwargs):
+        """ Old slugs of renamed users are answered with a 301 to the current one. """
+        try:
+            return super().retrieve(request, *args, **kwargs)
+
+        except Http404:
+            redirect = UserSlugRedirect.objects.filter(old_slug=kwargs['slug'])
+            slug = redirect.values_list('user__slug', flat=True).first()
+
+            if slug is None:
+                raise
+
+            return Response(
+                status=status.HTTP_301_MOVED_PERMANENTLY,
+                headers={'Location': reverse('user-detail', kwargs={'slug': slug})}
+            )
+
 
 class UserDestroyView(generics.DestroyAPIView):
-    """ Handles the deletion of users. """
+    """
+    Handles the deletion of users.
+    The account is deactivated at once and deleted by a background task, see users.deletion.
+    """
     permission_classes = (IsAuthenticated,)
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -45,6 +86,13 @@ class UserDestroyView(generics.DestroyAPIView):
         except User.DoesNotExist:
             raise exceptions.NotFound()
 
+    def destroy(self, request, *args, **kwargs):
+        deletion = request_account_deletion(self.get_object())
+        delete_account.delay(deletion.pk)
+
+        return Response({'details': 'Your account will be deleted shortly.'},
+                        status=status.HTTP_202_ACCEPTED)
+
 
 class UserProfileUpdateView(generics.UpdateAPIView):
     """ User profile view. """
@@ -120,3 +168,140 @@ class UnfollowUserView(views.APIView):
                 {'details': 'Can\'t unfollow yourself.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class UserFollowersView(generics.ListAPIView):
+    """ Returns the users following the given user. """
+    serializer_class = FollowersSerializer
+    pagination_class = FollowPagination
+
+    def get_queryset(self):
+        user = get_object_or_404(User, slug=self.kwargs['slug'])
+
+        return UserFollowing.objects.filter(user_followed=user).select_related('user_follows')
+
+
+class UserFollowingView(generics.ListAPIView):
+    """ Returns the users the given user is following. """
+    serializer_class = FollowingSerializer
+    pagination_class = FollowPagination
+
+    def get_queryset(self):
+        user = get_object_or_404(User, slug=self.kwargs['slug'])
+
+        return UserFollowing.objects.filter(user_follows=user).select_related('user_followed')
+
+
+class FollowSuggestionsView(generics.ListAPIView):
+    """ Returns the precomputed "who to follow" suggestions for the user. """
+    serializer_class = FollowSuggestionSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        """
+        Suggestions are only refreshed by the batch job,
+        so users that have been followed since then are filtered out here.
+        """
+        user = self.request.user
+        following = user.following.values('user_followed')
+
+        queryset = FollowSuggestion.objects.filter(user=user).exclude(suggested__in=following)
+
+        return queryset.select_related('suggested').order_by('-score')
+
+
+def parse_sync_token(value):
+    """ Returns the time of a sync token, None if it can't be parsed. """
+    try:
+        return parse_datetime(value)
+
+    except ValueError:
+        # Well formed but not a real date, e.g. month 13.
+        return None
+
+
+class ReadingListView(generics.ListAPIView):
+    """
+    Returns the articles saved by the user, most recently saved first.
+
+    Every response carries a sync_token, passing it back as ?since= returns
+    only the saves & the ids of the articles unsaved after the token was issued.
+    The saves are paginated like the full list, the unsaved ids & the next
+    sync_token come with the last page. A client with more than
+    MAX_SYNC_UNSAVED unsaves to catch up on gets a 410 and syncs the whole list.
+    """
+    serializer_class = SavedArticleSerializer
+    pagination_class = ReadingListPagination
+    permission_classes = (IsAuthenticated,)
+
+    MAX_SYNC_UNSAVED = 1000
+
+    def get_queryset(self):
+        queryset = SavedArticle.objects.filter(user=self.request.user)
+
+        return queryset.select_related('article__user').prefetch_related('article__tags')
+
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get('since', None)
+
+        if since is None:
+            response = super().list(request, *args, **kwargs)
+            response.data['sync_token'] = (timezone.now() - SYNC_TOKEN_SLACK).isoformat()
+
+            return response
+
+        # Every page of a sync stops at the time of its first page, so that saves made
+        # while paging can't slip in before the cursor, they're part of the next sync.
+        until = request.query_params.get('until', None)
+        first_page = until is None
+
+        since = parse_sync_token(since)
+        until = timezone.now() if first_page else parse_sync_token(until)
+
+        if since is None or until is None:
+            return Response(
+                {'details': 'Invalid sync token.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        unsaved = UnsavedArticle.objects.filter(user=request.user, unsaved_at__gt=since,
+                                                unsaved_at__lte=until)
+
+        if first_page and unsaved[self.MAX_SYNC_UNSAVED:].exists():
+            return Response(
+                {'details': 'Too many changes since the sync token, sync the whole list.'},
+                status=status.HTTP_410_GONE
+            )
+
+        saved = self.get_queryset().filter(saved_at__gt=since, saved_at__lte=until)
+        page = self.paginate_queryset(saved)
+        next_link = self.paginator.get_next_link()
+
+        if next_link is not None:
+            return Response({
+                'next': replace_query_param(next_link, 'until', until.isoformat()),
+                'saved': self.get_serializer(page, many=True).data,
+                'unsaved': [],
+                'sync_token': None,
+            })
+
+        return Response({
+            'next': None,
+            'saved': self.get_serializer(page, many=True).data,
+            'unsaved': list(unsaved.values_list('article_id', flat=True)),
+            'sync_token': (until - SYNC_TOKEN_SLACK).isoformat(),
+        })
+
+
+class UserDataExportView(views.APIView):
+    """ Streams everything stored about the user as NDJSON (see users.export). """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        user = request.user
+
+        response = StreamingHttpResponse(export_user_data(user),
+                                         content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{user.slug}-export.ndjson"'
+
+        return response